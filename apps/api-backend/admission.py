@@ -0,0 +1,204 @@
+"""
+Admission control
+Requests are admitted per route class (cheap reads, availability
+computation, OAuth, webhooks), each with its own concurrency limit and a
+bounded FIFO wait queue, so an invite storm on one class cannot take every
+database connection. A request that would have to queue is shed with a
+fast 503 + Retry-After when the queue is full, when the oldest waiter has
+already waited half of ADMISSION_MAX_QUEUE_MS (the queue is not draining),
+or when the event loop is lagging; queued requests that wait the full
+ADMISSION_MAX_QUEUE_MS are shed too. Probes and metrics are never limited.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import metrics
+from health import loop_monitor
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# class=concurrency:queue; defaults keep the total under the DB pool (10 + 20 overflow)
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "default=16:64,availability=6:24,oauth=4:8,webhooks=4:32")
+ADMISSION_MAX_QUEUE_MS = float(os.getenv("ADMISSION_MAX_QUEUE_MS", "2000"))
+# New requests are shed instead of queued while the loop is this far behind
+LOAD_SHED_LOOP_LAG_MS = float(os.getenv("LOAD_SHED_LOOP_LAG_MS", "250"))
+MAX_RETRY_AFTER_SECONDS = 30
+
+# First matching path prefix decides the class; anything else is "default"
+ROUTE_CLASSES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("availability", ("/availability/", "/api/meetings/schedule-batch")),
+    ("oauth", ("/connect/",)),
+    ("webhooks", ("/webhooks/",)),
+]
+EXEMPT_PREFIXES = ("/health", "/ready", "/metrics", "/admin/")
+
+
+def parse_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """'class=concurrency:queue,...' into {class: (concurrency, queue)}"""
+    limits = {}
+    for item in value.split(","):
+        name, _, spec = item.strip().partition("=")
+        if name and spec:
+            concurrency, _, queue = spec.partition(":")
+            limits[name] = (max(1, int(concurrency)), max(0, int(queue or 0)))
+    return limits
+
+
+def route_class(path: str) -> Optional[str]:
+    """Admission class for a request path, None for exempt paths"""
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    for name, prefixes in ROUTE_CLASSES:
+        if path.startswith(prefixes):
+            return name
+    return "default"
+
+
+class Shed(Exception):
+    """Request rejected by admission control"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` requests in flight; up to `queue_size` more wait in FIFO
+    order for at most `max_queue` seconds. Slots are handed directly to the
+    next waiter on release. Service time is tracked (EWMA) to size
+    Retry-After.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, max_queue: float = ADMISSION_MAX_QUEUE_MS / 1000):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_queue = max_queue
+        self.active = 0
+        self.service_time = 0.05
+        self._waiters: deque = deque()
+
+    def _shed_reason(self) -> Optional[str]:
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+        if loop_monitor.current_ms() > LOAD_SHED_LOOP_LAG_MS:
+            return "loop_lag"
+        if self._waiters and time.monotonic() - self._waiters[0][1] > self.max_queue / 2:
+            return "queue_delay"
+        return None
+
+    def retry_after(self) -> int:
+        expected = (len(self._waiters) + 1) * self.service_time / self.limit
+        return max(1, min(MAX_RETRY_AFTER_SECONDS, math.ceil(expected)))
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns seconds spent queued, raises Shed"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return 0.0
+        reason = self._shed_reason()
+        if reason:
+            raise Shed(reason, self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, time.monotonic())
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(future, self.max_queue)
+        except asyncio.TimeoutError:
+            raise Shed("queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot that was granted in the meantime
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(entry)
+            except ValueError:
+                pass
+        return time.monotonic() - entry[1]
+
+    def release(self, service_time: Optional[float] = None):
+        if service_time is not None:
+            self.service_time += 0.1 * (service_time - self.service_time)
+        while self._waiters:
+            future, _ = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)  # the slot moves to the waiter
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "limit": self.limit,
+            "queued": len(self._waiters),
+            "queue_size": self.queue_size,
+            "service_ms": round(self.service_time * 1000, 1),
+        }
+
+
+limiters: Dict[str, ConcurrencyLimiter] = {
+    name: ConcurrencyLimiter(name, concurrency, queue)
+    for name, (concurrency, queue) in parse_limits(ADMISSION_LIMITS).items()
+}
+
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+async def _reject(send, route: str, shed: Shed):
+    body = json.dumps({"detail": "Server busy, please retry", "route_class": route, "reason": shed.reason}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(shed.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the per-route-class limiters"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route = route_class(scope["path"])
+        limiter = limiters.get(route) if route else None
+        if limiter is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            queued = await limiter.acquire()
+        except Shed as shed:
+            metrics.counter(f"admission.{route}.rejected").inc()
+            metrics.counter(f"admission.{route}.rejected.{shed.reason}").inc()
+            return await _reject(send, route, shed)
+
+        metrics.counter(f"admission.{route}.admitted").inc()
+        if queued:
+            metrics.summary(f"admission.{route}.queue_ms").observe(queued * 1000)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
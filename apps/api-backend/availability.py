@@ -0,0 +1,353 @@
+"""
+Meeting availability
+Computes ranked meeting slots from participants' merged busy time. Busy time
+comes from provider free/busy queries (Graph getSchedule, Google
+freeBusy.query), one call per group of participants that share an account,
+with event listing only for calendars free/busy cannot read. Per-user busy
+time is cached in AvailabilityCache until a webhook invalidates it.
+
+/availability/{meeting_id}/stream serves the same result as Server-Sent
+Events, re-ranking as each participant group arrives. Concurrent identical
+GET /availability/{meeting_id} requests are coalesced into one computation.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+import metrics
+from calendars import ParticipantGroups, fetch_busy_events, parse_provider_time
+from intervals import IntervalSet, count_free, from_minutes, to_minutes
+from models import AvailabilityCache, Meeting, User
+from packages.database import get_db, get_db_session
+from providers import ProviderError, client_for
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["availability"])
+
+# Coalesces concurrent identical GET /availability/{meeting_id} computations
+availability_flight = SingleFlight("availability")
+
+AVAILABILITY_WINDOW_DAYS = int(os.getenv("AVAILABILITY_WINDOW_DAYS", "7"))
+AVAILABILITY_CACHE_TTL = timedelta(minutes=int(os.getenv("AVAILABILITY_CACHE_TTL_MINUTES", "15")))
+SLOT_STEP = timedelta(minutes=30)
+WORKDAY_START_HOUR = 9
+WORKDAY_END_HOUR = 17
+MAX_PROPOSED_TIMES = 5
+
+# Graph schedule statuses that block a slot
+GRAPH_BUSY_STATUSES = {"busy", "oof", "tentative"}
+
+
+def availability_window(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Day-aligned UTC window, so cache keys stay stable for the whole day"""
+    now = now or datetime.utcnow()
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=AVAILABILITY_WINDOW_DAYS)
+
+
+def busy_cache_key(window_start: datetime, window_end: datetime) -> str:
+    return hashlib.sha256(f"busy:{window_start.isoformat()}:{window_end.isoformat()}".encode()).hexdigest()
+
+
+async def fetch_group_busy(db: Session, groups: ParticipantGroups, provider: str, reader, members: List[User],
+                           window_start: datetime, window_end: datetime) -> Dict[str, Any]:
+    """
+    Busy time for one participant group from a single free/busy query:
+    {user_id: IntervalSet | ProviderError}. Calendars free/busy cannot read
+    fall back to event listing.
+    """
+    results: Dict[str, Any] = {}
+    fallback: List[User] = []
+    by_address = {groups.address(user).lower(): user for user in members}
+    try:
+        if provider == "microsoft":
+            entries = await client_for(reader).get_schedule(list(by_address), window_start, window_end)
+            for entry in entries:
+                user = by_address.pop((entry.get("scheduleId") or "").lower(), None)
+                if user is None:
+                    continue
+                if entry.get("error"):
+                    fallback.append(user)
+                    continue
+                results[user.id] = IntervalSet.from_dicts(
+                    {"start": parse_provider_time(item.get("start")), "end": parse_provider_time(item.get("end"))}
+                    for item in entry.get("scheduleItems", [])
+                    if item.get("status") in GRAPH_BUSY_STATUSES
+                )
+        elif provider == "google":
+            calendars = await client_for(reader).free_busy(list(by_address), window_start, window_end)
+            for address, calendar in calendars.items():
+                user = by_address.pop(address.lower(), None)
+                if user is None:
+                    continue
+                if calendar.get("errors"):
+                    fallback.append(user)
+                    continue
+                results[user.id] = IntervalSet.from_dicts(
+                    {"start": parse_provider_time({"dateTime": busy["start"]}), "end": parse_provider_time({"dateTime": busy["end"]})}
+                    for busy in calendar.get("busy", [])
+                )
+    except ProviderError as e:
+        logger.warning(f"⚠️  {provider} free/busy query failed, listing events instead: {e}")
+    # Anything the provider did not answer for is listed individually
+    fallback.extend(by_address.values())
+
+    if fallback:
+        metrics.counter("availability.freebusy_fallbacks").inc(len(fallback))
+        listed = await fetch_busy_events(db, fallback, window_start, window_end)
+        results.update({
+            user_id: busy if isinstance(busy, ProviderError) else IntervalSet.from_dicts(busy)
+            for user_id, busy in listed.items()
+        })
+    return results
+
+
+def free_busy_tasks(db: Session, users: List[User], window_start: datetime, window_end: datetime) -> List[Awaitable[Dict[str, Any]]]:
+    """One fetch per participant group, to be awaited together"""
+    groups = ParticipantGroups(db, users)
+    return [
+        fetch_group_busy(db, groups, provider, reader, members, window_start, window_end)
+        for provider, reader, members in groups.items()
+    ]
+
+
+async def fetch_free_busy(db: Session, users: List[User], window_start: datetime, window_end: datetime) -> Dict[str, Any]:
+    """Busy time per user from free/busy queries, all groups concurrently"""
+    results: Dict[str, Any] = {}
+    for part in await asyncio.gather(*free_busy_tasks(db, users, window_start, window_end)):
+        results.update(part)
+    return results
+
+
+async def iter_busy_intervals(db: Session, users: List[User], window_start: datetime,
+                              window_end: datetime) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Busy time per user in increments: everything cached first, then each
+    participant group as its provider query completes. Fetched results are
+    written to AvailabilityCache once all groups are done, replacing the
+    users' earlier rows for the same window.
+    """
+    now = datetime.utcnow()
+    key = busy_cache_key(window_start, window_end)
+    cached = db.query(AvailabilityCache).filter(
+        AvailabilityCache.user_id.in_([user.id for user in users]),
+        AvailabilityCache.cache_key == key,
+        AvailabilityCache.expires_at > now
+    ).order_by(AvailabilityCache.user_id, AvailabilityCache.expires_at).all()
+    # Concurrent misses can each have written a row; the latest to expire wins
+    busy: Dict[str, Any] = {row.user_id: IntervalSet.from_cache(row.availability_data) for row in cached}
+    metrics.counter("availability.cache_hits").inc(len(busy))
+    if busy:
+        yield busy
+
+    missing = [user for user in users if user.id not in busy]
+    if not missing:
+        return
+    metrics.counter("availability.cache_misses").inc(len(missing))
+    for task in asyncio.as_completed(free_busy_tasks(db, missing, window_start, window_end)):
+        fetched = await task
+        fresh = [user_id for user_id, intervals in fetched.items() if not isinstance(intervals, ProviderError)]
+        if fresh:
+            db.query(AvailabilityCache).filter(
+                AvailabilityCache.user_id.in_(fresh),
+                AvailabilityCache.cache_key == key
+            ).delete(synchronize_session=False)
+        for user_id in fresh:
+            db.add(AvailabilityCache(
+                user_id=user_id,
+                cache_key=key,
+                availability_data=fetched[user_id].to_cache(),
+                expires_at=now + AVAILABILITY_CACHE_TTL
+            ))
+        yield fetched
+    db.commit()
+
+
+async def get_busy_intervals(db: Session, users: List[User], window_start: datetime, window_end: datetime) -> Dict[str, Any]:
+    """Busy time per user, served from AvailabilityCache where possible"""
+    busy: Dict[str, Any] = {}
+    async for part in iter_busy_intervals(db, users, window_start, window_end):
+        busy.update(part)
+    return busy
+
+
+def candidate_starts(window_start: datetime, window_end: datetime, duration_minutes: int, timezone: str = "UTC") -> List[int]:
+    """Slot starts (epoch minutes) on SLOT_STEP boundaries within working hours in the meeting's timezone"""
+    duration = timedelta(minutes=duration_minutes)
+    try:
+        zone = ZoneInfo(timezone or "UTC")
+    except (KeyError, ValueError):
+        zone = ZoneInfo("UTC")
+    utc = ZoneInfo("UTC")
+
+    starts = []
+    earliest = max(window_start, datetime.utcnow())
+    slot = earliest.replace(minute=0, second=0, microsecond=0)
+    while slot < earliest:
+        slot += SLOT_STEP
+    while slot + duration <= window_end:
+        local = slot.replace(tzinfo=utc).astimezone(zone)
+        local_end = (slot + duration).replace(tzinfo=utc).astimezone(zone)
+        if (
+            local.weekday() < 5
+            and local.hour >= WORKDAY_START_HOUR
+            and (local_end.hour, local_end.minute) <= (WORKDAY_END_HOUR, 0)
+            and local_end.date() == local.date()
+        ):
+            starts.append(to_minutes(slot))
+        slot += SLOT_STEP
+    return starts
+
+
+def score_slots(busy: Dict[str, Any], participant_count: int, starts: List[int], duration_minutes: int) -> List[Tuple[float, int]]:
+    """
+    (confidence, start) for each candidate, best first. Confidence = share of
+    known calendars that are free x share of participants whose calendars
+    are known.
+    """
+    if participant_count == 0:
+        return []
+    known = [intervals for intervals in busy.values() if isinstance(intervals, IntervalSet)]
+    coverage = len(known) / participant_count
+    scored = [
+        ((count_free(known, start, start + duration_minutes) / len(known) if known else 0.0) * coverage, start)
+        for start in starts
+    ]
+    scored.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+    return scored
+
+
+def format_slot(start: int, duration_minutes: int, confidence: float) -> Dict[str, Any]:
+    """A slot in the proposed_times shape"""
+    return {
+        "start": from_minutes(start).isoformat() + "Z",
+        "end": from_minutes(start + duration_minutes).isoformat() + "Z",
+        "confidence": round(confidence, 2),
+    }
+
+
+def rank_slots(busy: Dict[str, Any], participant_count: int, window_start: datetime, window_end: datetime,
+               duration_minutes: int, timezone: str = "UTC", limit: int = MAX_PROPOSED_TIMES) -> List[Dict[str, Any]]:
+    """Best candidate slots within working hours (in the meeting's timezone)"""
+    starts = candidate_starts(window_start, window_end, duration_minutes, timezone)
+    return [
+        format_slot(start, duration_minutes, confidence)
+        for confidence, start in score_slots(busy, participant_count, starts, duration_minutes)[:limit]
+    ]
+
+
+def meeting_attendees(meeting: Meeting) -> List[User]:
+    """Organizer plus participants, without duplicates"""
+    attendees = {user.id: user for user in meeting.participants}
+    if meeting.organizer:
+        attendees.setdefault(meeting.organizer.id, meeting.organizer)
+    return list(attendees.values())
+
+
+def availability_flight_key(meeting: Meeting, attendees: List[User], window_start: datetime,
+                            window_end: datetime) -> Tuple:
+    """Everything the ranked result depends on, so only identical queries share a computation"""
+    return (
+        meeting.id,
+        window_start,
+        window_end,
+        meeting.duration_minutes or 30,
+        meeting.timezone or "UTC",
+        tuple(sorted(user.id for user in attendees)),
+    )
+
+
+@router.get("/availability/{meeting_id}")
+async def get_meeting_availability(meeting_id: str, db=Depends(get_db)):
+    """Ranked candidate times for a meeting based on attendees' calendars"""
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    attendees = meeting_attendees(meeting)
+    window_start, window_end = availability_window()
+
+    async def compute() -> Dict[str, Any]:
+        with metrics.track_provider_usage() as usage:
+            busy = await get_busy_intervals(db, attendees, window_start, window_end)
+        metrics.summary("availability.provider_calls_per_meeting").observe(usage.calls)
+        metrics.summary("availability.payload_bytes_per_meeting").observe(usage.bytes)
+        logger.info("📊 Availability for meeting %s: %d provider call(s), %d bytes", meeting_id, usage.calls, usage.bytes)
+
+        return {
+            "meeting_id": meeting.id,
+            "emails": [user.email for user in attendees],
+            "proposed_times": rank_slots(busy, len(attendees), window_start, window_end, meeting.duration_minutes or 30, meeting.timezone),
+            "created_at": meeting.created_at,
+        }
+
+    # Invite recipients tend to open the link together; they share one computation
+    return await availability_flight.do(availability_flight_key(meeting, attendees, window_start, window_end), compute)
+
+
+def _sse(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+@router.get("/availability/{meeting_id}/stream")
+async def stream_meeting_availability(meeting_id: str, db=Depends(get_db)):
+    """
+    Progressive availability as Server-Sent Events: `provisional` once the
+    first participants' busy time is known, `refined` as more arrive, then
+    `final`. Every event carries the GET /availability/{meeting_id} body plus
+    how many attendees' calendars it reflects (known/total).
+    """
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    attendees = meeting_attendees(meeting)
+    duration = meeting.duration_minutes or 30
+    window_start, window_end = availability_window()
+    starts = candidate_starts(window_start, window_end, duration, meeting.timezone)
+    final_body = {
+        "meeting_id": meeting.id,
+        "emails": [user.email for user in attendees],
+        "created_at": meeting.created_at.isoformat() if meeting.created_at else None,
+    }
+
+    def ranked(busy: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            format_slot(start, duration, confidence)
+            for confidence, start in score_slots(busy, len(attendees), starts, duration)[:MAX_PROPOSED_TIMES]
+        ]
+
+    async def events():
+        busy: Dict[str, Any] = {}
+        # Own session: the stream outlives the request's dependency scope
+        with get_db_session() as stream_db, metrics.track_provider_usage() as usage:
+            async for part in iter_busy_intervals(stream_db, attendees, window_start, window_end):
+                event = "refined" if busy else "provisional"
+                busy.update(part)
+                yield _sse(event, {
+                    **final_body,
+                    "proposed_times": ranked(busy),
+                    "known": len(busy),
+                    "total": len(attendees),
+                })
+        metrics.summary("availability.provider_calls_per_meeting").observe(usage.calls)
+        metrics.summary("availability.payload_bytes_per_meeting").observe(usage.bytes)
+        yield _sse("final", {**final_body, "proposed_times": ranked(busy), "known": len(busy), "total": len(attendees)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,53 @@
+"""
+Calendar re-sync driven by provider change notifications
+Webhooks only enqueue a calendar.sync job; the job validates the notification
+and drops the user's cached availability so the next lookup reads fresh
+free/busy data.
+
+Change payloads are deliberately not fetched: a delta only carries an event's
+new times (and a deletion none at all), so it cannot tell which cached window
+the event moved out of. Availability comes from free/busy queries, so the
+notification alone is enough to invalidate.
+"""
+
+import asyncio
+import logging
+import secrets
+from datetime import datetime
+from typing import Optional
+
+from models import CalendarSubscription, invalidate_user_availability
+from packages.database import get_db_session
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_notification(provider: str, external_id: str, client_state: Optional[str]) -> Optional[int]:
+    with get_db_session() as db:
+        subscription = db.query(CalendarSubscription).filter(
+            CalendarSubscription.provider == provider,
+            CalendarSubscription.external_id == external_id
+        ).first()
+        if not subscription:
+            logger.warning(f"⚠️  Notification for unknown {provider} subscription {external_id}")
+            return None
+        if not client_state or not secrets.compare_digest(client_state, subscription.client_state):
+            logger.warning(f"⚠️  Rejected {provider} notification with bad client state for {external_id}")
+            return None
+
+        now = datetime.utcnow()
+        auth = subscription.calendar_auth
+        subscription.last_notification_at = now
+        auth.last_sync = now
+        removed = invalidate_user_availability(db, auth.user_id)
+        logger.info("🧹 Invalidated %d availability cache entries for user %s", removed, auth.user_id)
+        return removed
+
+
+async def sync_subscription(provider: str, external_id: str, client_state: Optional[str]) -> int:
+    """
+    Apply one change notification.
+    Returns the number of availability cache entries dropped.
+    """
+    removed = await asyncio.to_thread(_apply_notification, provider, external_id, client_state)
+    return removed or 0
@@ -0,0 +1,194 @@
+"""
+Participant calendar fan-out
+Groups a meeting's participants by the connected account that can read their
+calendars and fetches busy events for all of them. Microsoft participants who
+share a tenant are read through one token with Graph $batch
+(Calendars.Read.Shared); Google calendars are listed individually, with
+recurring series expanded locally (see recurrence.py). All groups are
+fetched concurrently.
+"""
+
+import asyncio
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import CalendarAuth, User
+from providers import ProviderError, client_for, email_domain, tenant_key
+from recurrence import occurrence_cache, series_from_google
+
+logger = logging.getLogger(__name__)
+
+
+def parse_provider_time(value: Dict[str, Any]) -> Optional[str]:
+    """Normalize a provider start/end object to a naive UTC ISO string"""
+    raw = (value or {}).get("dateTime") or (value or {}).get("date")
+    if not raw:
+        return None
+    # Graph returns 7 fractional digits; fromisoformat accepts at most 6
+    raw = re.sub(r"(\.\d{6})\d+", r"\1", raw.replace("Z", "+00:00"))
+    parsed = datetime.fromisoformat(raw)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def busy_from_graph(events: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Busy intervals from Graph calendarView events (times requested in UTC)"""
+    return [
+        {"start": parse_provider_time(event.get("start")), "end": parse_provider_time(event.get("end"))}
+        for event in events
+        if not event.get("isCancelled") and event.get("showAs", "busy") not in ("free", "workingElsewhere")
+    ]
+
+
+def busy_from_google(events: List[Dict[str, Any]], window_start: datetime, window_end: datetime) -> List[Dict[str, str]]:
+    """
+    Busy intervals from Google events listed with singleEvents=false:
+    recurring masters are expanded lazily over the window (memoized per
+    series), with their exception instances applied.
+    """
+    masters = {event["id"]: event for event in events if event.get("recurrence")}
+    exceptions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    busy = []
+    for event in events:
+        if event.get("recurringEventId") in masters:
+            exceptions[event["recurringEventId"]].append(event)
+        elif not event.get("recurrence") and event.get("status") != "cancelled" and event.get("transparency") != "transparent":
+            busy.append({"start": parse_provider_time(event.get("start")), "end": parse_provider_time(event.get("end"))})
+
+    for series_id, master in masters.items():
+        if master.get("status") == "cancelled" or master.get("transparency") == "transparent":
+            continue
+        try:
+            occurrences = occurrence_cache.expand(series_from_google(master, exceptions[series_id]), window_start, window_end)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"⚠️  Skipping unreadable recurring event {series_id}: {e}")
+            continue
+        busy.extend({"start": start.isoformat(), "end": end.isoformat()} for start, end in occurrences)
+    return busy
+
+
+# Personal-account domains: accounts here cannot read each other's calendars
+CONSUMER_DOMAINS = {"gmail.com", "googlemail.com", "outlook.com", "hotmail.com", "live.com"}
+
+GroupKey = Tuple[str, str]
+
+
+class ParticipantGroups:
+    """
+    Participants grouped by the connected account that can read their
+    calendars: one group per Microsoft tenant, per Google Workspace domain,
+    and per personal account. Participants without a connected calendar join
+    a group from their own organization when there is one.
+    """
+
+    def __init__(self, db: Session, users: List[User]):
+        auths = db.query(CalendarAuth).filter(
+            CalendarAuth.user_id.in_([user.id for user in users]),
+            CalendarAuth.is_active == True
+        ).all()
+        self.auth_by_user: Dict[str, CalendarAuth] = {auth.user_id: auth for auth in auths}
+        self.members: Dict[GroupKey, List[User]] = defaultdict(list)
+        self.readers: Dict[GroupKey, CalendarAuth] = {}
+        self.unreachable: List[User] = []
+
+        by_domain: Dict[str, GroupKey] = {}
+        for user in users:
+            auth = self.auth_by_user.get(user.id)
+            if auth is None:
+                continue
+            key = self._key(auth)
+            self.readers.setdefault(key, auth)
+            self.members[key].append(user)
+            domain = email_domain(auth.provider_email or user.email)
+            if domain not in CONSUMER_DOMAINS:
+                by_domain.setdefault(domain, key)
+
+        for user in users:
+            if user.id in self.auth_by_user:
+                continue
+            key = by_domain.get(email_domain(user.email))
+            if key:
+                self.members[key].append(user)
+            else:
+                self.unreachable.append(user)
+
+    @staticmethod
+    def _key(auth: CalendarAuth) -> GroupKey:
+        if auth.provider == "microsoft":
+            return ("microsoft", tenant_key(auth))
+        domain = email_domain(auth.provider_email)
+        if domain in CONSUMER_DOMAINS:
+            return (auth.provider, f"user:{auth.user_id}")
+        return (auth.provider, f"domain:{domain}")
+
+    def address(self, user: User) -> str:
+        """Mailbox / calendar id for a participant"""
+        auth = self.auth_by_user.get(user.id)
+        return (auth.provider_email if auth else None) or user.email
+
+    def items(self):
+        """(provider, reader auth, members) per group"""
+        for key, members in self.members.items():
+            yield key[0], self.readers[key], members
+
+
+async def fetch_busy_events(db: Session, users: List[User], window_start: datetime, window_end: datetime,
+                            groups: Optional[ParticipantGroups] = None) -> Dict[str, Any]:
+    """
+    Busy intervals per participant from event listing: {user_id: [{"start", "end"}]}.
+    Participants whose calendar could not be read map to a ProviderError;
+    participants with no reachable calendar are omitted.
+    """
+    groups = groups or ParticipantGroups(db, users)
+
+    async def fetch_microsoft(reader: CalendarAuth, members: List[User]) -> Dict[str, Any]:
+        emails = {user.id: groups.address(user) for user in members}
+        if len(members) > 1:
+            logger.info(f"📦 Batching {len(members)} Microsoft calendars through {reader.provider_email}")
+        try:
+            views = await client_for(reader).get_calendar_views(list(emails.values()), window_start, window_end)
+        except ProviderError as e:
+            views = {email: e for email in emails.values()}
+
+        # Calendars the reader may not see fall back to the owner's own token
+        for user_id, email in emails.items():
+            own = groups.auth_by_user.get(user_id)
+            if isinstance(views[email], ProviderError) and own is not None and own is not reader:
+                try:
+                    views.update(await client_for(own).get_calendar_views([email], window_start, window_end))
+                except ProviderError as e:
+                    views[email] = e
+
+        return {
+            user_id: views[email] if isinstance(views[email], ProviderError) else busy_from_graph(views[email])
+            for user_id, email in emails.items()
+        }
+
+    async def fetch_google(reader: CalendarAuth, user: User) -> Dict[str, Any]:
+        own = groups.auth_by_user.get(user.id)
+        try:
+            if own is not None:
+                events = await client_for(own).list_events(window_start, window_end, single_events=False)
+            else:
+                events = await client_for(reader).list_events(window_start, window_end, groups.address(user), single_events=False)
+            return {user.id: busy_from_google(events, window_start, window_end)}
+        except ProviderError as e:
+            return {user.id: e}
+
+    tasks = []
+    for provider, reader, members in groups.items():
+        if provider == "microsoft":
+            tasks.append(fetch_microsoft(reader, members))
+        elif provider == "google":
+            tasks.extend(fetch_google(reader, user) for user in members)
+
+    merged: Dict[str, Any] = {}
+    for result in await asyncio.gather(*tasks):
+        merged.update(result)
+    return merged
@@ -0,0 +1,159 @@
+"""
+Fake calendar provider for load testing
+An httpx transport that answers the Microsoft Graph, Google Calendar and
+OAuth token endpoints the provider clients call, serving the synthetic
+calendars from packages.database.synthetic (`manage.py db:seed --scale N`).
+Enabled with CALENDAR_PROVIDER_MODE=fake; the whole client stack above the
+transport (token buckets, breakers, retries, parsing) runs unchanged.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httpx
+
+from packages.database.synthetic import parse_synthetic_token, synthetic_busy, synthetic_email
+
+logger = logging.getLogger(__name__)
+
+# Added to every response, to model provider round trips
+FAKE_PROVIDER_LATENCY_MS = float(os.getenv("FAKE_PROVIDER_LATENCY_MS", "0"))
+# Seed for mailboxes when the access token is not a synthetic one
+FAKE_PROVIDER_SEED = int(os.getenv("FAKE_PROVIDER_SEED", "42"))
+
+GRAPH_HOST = "graph.microsoft.com"
+GOOGLE_HOST = "www.googleapis.com"
+
+
+def _time(value: str) -> datetime:
+    """Naive UTC from a provider query/body timestamp"""
+    parsed = datetime.fromisoformat(re.sub(r"(\.\d{6})\d+", r"\1", value.replace("Z", "+00:00")))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat() + "Z"
+
+
+class FakeProviderTransport(httpx.AsyncBaseTransport):
+    """Routes provider API calls to synthetic calendars"""
+
+    def __init__(self, latency_ms: float = FAKE_PROVIDER_LATENCY_MS, seed: int = FAKE_PROVIDER_SEED):
+        self.latency = latency_ms / 1000
+        self.seed = seed
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        url = urlsplit(str(request.url))
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        synthetic = parse_synthetic_token(token)
+        seed = synthetic[0] if synthetic else self.seed
+        body = json.loads(request.content) if request.content else {}
+
+        if url.path.endswith("/token"):
+            form = parse_qs(request.content.decode())
+            refresh = (form.get("refresh_token") or [""])[0]
+            return self._json({"access_token": refresh or "synthetic-token", "expires_in": 3600, "token_type": "Bearer"})
+        if url.netloc == GRAPH_HOST:
+            return self._graph(request.method, url, body, seed)
+        if url.netloc == GOOGLE_HOST:
+            owner = synthetic_email(*synthetic) if synthetic else None
+            return self._google(request.method, url, body, seed, owner)
+        return self._json({"error": "not found"}, status=404)
+
+    # Microsoft Graph
+
+    def _graph(self, method: str, url, body: Dict[str, Any], seed: int) -> httpx.Response:
+        path = url.path.removeprefix("/v1.0")
+        if method == "POST" and path == "/me/calendar/getSchedule":
+            start = _time(body["startTime"]["dateTime"])
+            end = _time(body["endTime"]["dateTime"])
+            return self._json({"value": [
+                {
+                    "scheduleId": email,
+                    "scheduleItems": [
+                        {
+                            "status": event["status"],
+                            "start": {"dateTime": event["start"].isoformat(), "timeZone": "UTC"},
+                            "end": {"dateTime": event["end"].isoformat(), "timeZone": "UTC"},
+                        }
+                        for event in synthetic_busy(seed, email, start, end)
+                    ],
+                }
+                for email in body.get("schedules", [])
+            ]})
+        if method == "POST" and path == "/$batch":
+            return self._json({"responses": [self._graph_sub_request(request, seed) for request in body.get("requests", [])]})
+        if path.startswith("/subscriptions"):
+            if method == "DELETE":
+                return httpx.Response(204)
+            return self._json({"id": path.rsplit("/", 1)[-1] if method == "PATCH" else "synthetic-subscription", **body})
+        return self._json({"error": {"code": "NotFound"}}, status=404)
+
+    def _graph_sub_request(self, request: Dict[str, Any], seed: int) -> Dict[str, Any]:
+        match = re.match(r"^/users/([^/]+)/calendarView\?(.*)$", request.get("url", ""))
+        if not match:
+            return {"id": request["id"], "status": 404, "body": {"error": {"code": "NotFound"}}}
+        query = parse_qs(match.group(2))
+        start, end = _time(query["startDateTime"][0]), _time(query["endDateTime"][0])
+        events = [
+            {
+                "start": {"dateTime": event["start"].isoformat(), "timeZone": "UTC"},
+                "end": {"dateTime": event["end"].isoformat(), "timeZone": "UTC"},
+                "showAs": event["status"],
+                "isCancelled": False,
+            }
+            for event in synthetic_busy(seed, unquote(match.group(1)), start, end)
+        ]
+        return {"id": request["id"], "status": 200, "body": {"value": events}}
+
+    # Google Calendar
+
+    def _google(self, method: str, url, body: Dict[str, Any], seed: int, owner: Optional[str]) -> httpx.Response:
+        path = url.path.removeprefix("/calendar/v3")
+        if method == "POST" and path == "/freeBusy":
+            start, end = _time(body["timeMin"]), _time(body["timeMax"])
+            return self._json({"calendars": {
+                item["id"]: {"busy": [
+                    {"start": _iso(event["start"]), "end": _iso(event["end"])}
+                    for event in synthetic_busy(seed, item["id"], start, end)
+                ]}
+                for item in body.get("items", [])
+            }})
+        match = re.match(r"^/calendars/([^/]+)/events(/watch)?$", path)
+        if match and match.group(2):
+            return self._json({
+                "id": body.get("id"), "resourceId": "synthetic-resource",
+                "expiration": str(int((datetime.utcnow() + timedelta(days=7)).timestamp() * 1000)),
+            })
+        if match and method == "GET":
+            calendar_id = unquote(match.group(1))
+            email = owner if calendar_id == "primary" else calendar_id
+            query = parse_qs(url.query)
+            if not email:
+                return self._json({"items": []})
+            start, end = _time(query["timeMin"][0]), _time(query["timeMax"][0])
+            items = [
+                {
+                    "id": event["id"], "etag": f'"{event["id"]}"', "status": "confirmed",
+                    "start": {"dateTime": _iso(event["start"])}, "end": {"dateTime": _iso(event["end"])},
+                }
+                for event in synthetic_busy(seed, email, start, end)
+            ]
+            return self._json({"items": items})
+        if path == "/channels/stop":
+            return httpx.Response(204)
+        return self._json({"error": {"code": 404, "message": "Not Found"}}, status=404)
+
+    @staticmethod
+    def _json(payload: Any, status: int = 200) -> httpx.Response:
+        return httpx.Response(status, json=payload)
@@ -0,0 +1,74 @@
+"""
+Sparse fieldsets for list endpoints
+`?fields=id,title,organizer` picks the keys of each item in a listing. The
+selection becomes column-level loading (load_only), so unrequested columns
+such as a meeting's description or proposed_times JSON are never selected or
+decoded, and relationships are loaded only when named.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, raiseload, selectinload
+
+
+class Projection:
+    """
+    Fields a list endpoint may return for `model`. `relations` maps a field
+    name to (relationship attribute, related column names); those are loaded
+    with one extra SELECT ... IN query and rendered as nested objects.
+    """
+
+    def __init__(self, model, columns: Sequence[str], default: Sequence[str],
+                 relations: Optional[Dict[str, Tuple[Any, Sequence[str]]]] = None):
+        self.model = model
+        self.columns = list(columns)
+        self.default = list(default)
+        self.relations = relations or {}
+
+    def select(self, fields: Optional[str]) -> List[str]:
+        """Requested field names in order; the endpoint's defaults when none are given"""
+        if not fields:
+            return self.default
+        selected = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        unknown = [field for field in selected if field not in self.columns and field not in self.relations]
+        if unknown:
+            raise HTTPException(status_code=400, detail={
+                "message": "Unknown fields",
+                "fields": unknown,
+                "allowed": self.columns + list(self.relations),
+            })
+        return selected or self.default
+
+    def options(self, selected: List[str]) -> list:
+        """Loader options selecting only the requested columns and relationships"""
+        # The primary key is always loaded for identity; raiseload turns an accidental lazy load into an error
+        names = {column.key for column in inspect(self.model).primary_key}
+        names.update(field for field in selected if field in self.columns)
+        relation_options = []
+        for field in selected:
+            if field in self.relations:
+                attribute, related_columns = self.relations[field]
+                # Many-to-one loads need the foreign key on the parent row
+                names.update(column.key for column in attribute.property.local_columns)
+                related = attribute.property.mapper.class_
+                relation_options.append(selectinload(attribute).load_only(
+                    *[getattr(related, column) for column in related_columns], raiseload=True
+                ))
+        columns = [getattr(self.model, name) for name in sorted(names)]
+        return [load_only(*columns, raiseload=True), *relation_options, raiseload("*")]
+
+    def serialize(self, row, selected: List[str]) -> Dict[str, Any]:
+        item = {}
+        for field in selected:
+            if field not in self.relations:
+                item[field] = getattr(row, field)
+                continue
+            _, related_columns = self.relations[field]
+            value = getattr(row, field)
+            if isinstance(value, list):
+                item[field] = [{column: getattr(related, column) for column in related_columns} for related in value]
+            else:
+                item[field] = {column: getattr(value, column) for column in related_columns} if value is not None else None
+        return item
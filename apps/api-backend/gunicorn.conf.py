@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration for the SmartMeet API in production.
+Every value can be overridden through the environment.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Make run.py and gunicorn_worker.py importable no matter where gunicorn was started from
+sys.path.insert(0, str(Path(__file__).parent))
+
+from run import default_worker_count  # noqa: E402
+
+# Binding
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Pending connections the kernel queues while all workers are busy
+backlog = int(os.getenv("BACKLOG", 2048))
+
+# Workers: async uvicorn workers, one per CPU unless WEB_CONCURRENCY is set
+workers = default_worker_count()
+worker_class = "gunicorn_worker.ProductionUvicornWorker"
+
+# Recycle workers after N requests (jittered so they don't restart together)
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+
+# Keep-alive must outlive the load balancer's idle timeout (60s on most LBs),
+# otherwise the LB reuses connections the worker has already closed.
+keepalive = int(os.getenv("KEEP_ALIVE", 75))
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+
+# Trust X-Forwarded-* from the load balancer
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "*")
+
+# Logging
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,12 @@
+"""
+Gunicorn worker class for production (see gunicorn.conf.py).
+Kept out of run.py because uvicorn.workers imports gunicorn, which the
+development server and platforms without gunicorn don't have.
+"""
+
+from uvicorn.workers import UvicornWorker
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """Gunicorn worker that pins uvicorn to uvloop and httptools"""
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "proxy_headers": True}
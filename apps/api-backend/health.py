@@ -0,0 +1,171 @@
+"""
+Readiness
+/health stays a liveness check; /ready reports whether this worker can take
+traffic: a bounded SELECT 1, database pool usage, outbound HTTP pool usage,
+provider circuit breakers, job-queue depth, cache hit rates, admission
+queues and event-loop lag. The report is cached for READINESS_CACHE_SECONDS
+and concurrent probes share one computation, so load-balancer polling adds
+no load. Provider outages are reported but do not fail readiness: every
+worker would be equally affected, and pulling them all out of rotation
+helps nobody.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+import metrics
+from packages.database import check_database_connection, database_pool_stats, get_db_session, queue_depth
+from providers import http_pool_stats
+from singleflight import SingleFlight
+from throttling import breaker_states
+
+logger = logging.getLogger(__name__)
+
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "2"))
+READINESS_DB_TIMEOUT_SECONDS = float(os.getenv("READINESS_DB_TIMEOUT_SECONDS", "1"))
+# Not ready while the event loop is this far behind
+READINESS_MAX_LOOP_LAG_MS = float(os.getenv("READINESS_MAX_LOOP_LAG_MS", "500"))
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "250"))
+
+# Counters reported as hit rates, by cache name
+CACHES = ("availability", "recurrence")
+
+router = APIRouter(tags=["health"])
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes a sleeping task: the time every
+    other coroutine waits behind CPU-bound work or blocking calls. Keeps the
+    latest value and the maximum over the last `window` seconds.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_MS / 1000, window: float = 10.0):
+        self.interval = interval
+        self.lag = 0.0
+        self._recent: deque = deque(maxlen=max(1, int(window / interval)))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - expected)
+            self._recent.append(self.lag)
+            metrics.summary("event_loop.lag_ms").observe(self.lag * 1000)
+
+    def current_ms(self) -> float:
+        return self.lag * 1000
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "lag_ms": round(self.lag * 1000, 1),
+            "max_lag_ms": round(max(self._recent, default=0.0) * 1000, 1),
+        }
+
+
+loop_monitor = LoopLagMonitor()
+
+_flight = SingleFlight("readiness")
+_cached: Optional[Dict[str, Any]] = None
+_cached_at = 0.0
+# A SELECT 1 stuck behind an exhausted pool keeps its thread; never start a second
+_db_probe: Optional[asyncio.Future] = None
+
+
+async def _check_database() -> Dict[str, Any]:
+    global _db_probe
+    if _db_probe is None or _db_probe.done():
+        _db_probe = asyncio.ensure_future(asyncio.to_thread(check_database_connection, False))
+    started = time.perf_counter()
+    try:
+        ok = await asyncio.wait_for(asyncio.shield(_db_probe), READINESS_DB_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"SELECT 1 took over {READINESS_DB_TIMEOUT_SECONDS:g}s"}
+    return {"ok": ok, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def _queued_jobs() -> Dict[str, int]:
+    with get_db_session() as db:
+        return queue_depth(db)
+
+
+async def _job_queue() -> Dict[str, Any]:
+    if _db_probe is not None and not _db_probe.done():
+        return {"ok": False, "error": "database probe still running"}
+    try:
+        depth = await asyncio.wait_for(asyncio.to_thread(_queued_jobs), READINESS_DB_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {"ok": True, "queued": sum(depth.values()), "by_type": depth}
+
+
+def _cache_hit_rates() -> Dict[str, Dict[str, Any]]:
+    snapshot = metrics.snapshot()
+    rates = {}
+    for name in CACHES:
+        hits, misses = snapshot.get(f"{name}.cache_hits", 0), snapshot.get(f"{name}.cache_misses", 0)
+        rates[name] = {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None}
+    leaders, coalesced = snapshot.get("availability.leaders", 0), snapshot.get("availability.coalesced", 0)
+    rates["availability_coalescing"] = {
+        "leaders": leaders, "coalesced": coalesced,
+        "hit_rate": round(coalesced / (leaders + coalesced), 3) if leaders + coalesced else None,
+    }
+    return rates
+
+
+def _admission() -> Dict[str, Any]:
+    from admission import admission_stats  # admission sheds on this module's loop lag
+    return admission_stats()
+
+
+async def readiness() -> Dict[str, Any]:
+    """Fresh readiness report; `ready` requires the database, a free pool slot and a responsive loop"""
+    database = await _check_database()
+    pools = database_pool_stats()
+    primary = pools["primary"]
+    capacity = primary.get("capacity")
+    pools["ok"] = capacity is None or primary["checked_out"] < capacity
+    event_loop = {**loop_monitor.snapshot(), "ok": loop_monitor.current_ms() < READINESS_MAX_LOOP_LAG_MS}
+    report = {
+        "database": database,
+        "database_pool": pools,
+        "event_loop": event_loop,
+        "http_pool": http_pool_stats(),
+        "circuits": breaker_states(),
+        "job_queue": await _job_queue(),
+        "caches": _cache_hit_rates(),
+        "admission": _admission(),
+    }
+    ready = database["ok"] and pools["ok"] and event_loop["ok"]
+    return {"status": "ready" if ready else "unavailable", "ready": ready, **report}
+
+
+async def cached_readiness() -> Dict[str, Any]:
+    """Readiness report at most READINESS_CACHE_SECONDS old"""
+
+    async def compute():
+        global _cached, _cached_at
+        report = await readiness()
+        _cached, _cached_at = {**report, "checked_at": time.time()}, time.monotonic()
+        if not report["ready"]:
+            logger.warning("⚠️  Not ready: %s", {name: check for name, check in report.items() if isinstance(check, dict) and check.get("ok") is False})
+        return _cached
+
+    if _cached is not None and time.monotonic() - _cached_at < READINESS_CACHE_SECONDS:
+        return _cached
+    return await _flight.do("readiness", compute)
+
+
+@router.get("/ready")
+async def ready():
+    """Readiness probe: 200 when this worker can serve traffic, 503 otherwise"""
+    report = await cached_readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
@@ -0,0 +1,139 @@
+"""
+Idempotent endpoints
+Wraps an endpoint body so repeated requests with the same key (a client
+Idempotency-Key header, or the OAuth authorization code) run it once.
+Duplicates on the same worker await the first request's result; duplicates
+on other workers find its claim in the idempotency_keys table and poll
+until the response is stored, then get it replayed (Idempotent-Replayed:
+true) for IDEMPOTENCY_TTL_SECONDS. Client errors are replayed too; server
+errors release the key so the request can be retried. The key store is
+read and written in a thread (asyncio.to_thread), off the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+import metrics
+from packages.database import (
+    claim_idempotency_key, complete_idempotency_key, get_db_session, idempotency_hash, release_idempotency_key
+)
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# How long a duplicate waits for the first request before answering 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Response headers kept with a stored response
+REPLAYED_HEADERS = ("content-type", "location", "retry-after")
+
+_flight = SingleFlight("idempotency")
+
+Stored = Dict[str, Any]
+
+
+def _from_result(result: Any) -> Stored:
+    if isinstance(result, Response):
+        headers = {name: value for name, value in result.headers.items() if name in REPLAYED_HEADERS}
+        return {"status": result.status_code, "headers": headers, "body": bytes(result.body).decode()}
+    return {"status": 200, "headers": {"content-type": "application/json"}, "body": json.dumps(jsonable_encoder(result))}
+
+
+def _from_http_exception(e: HTTPException) -> Stored:
+    headers = {"content-type": "application/json", **{name.lower(): value for name, value in (e.headers or {}).items()}}
+    return {"status": e.status_code, "headers": headers, "body": json.dumps(jsonable_encoder({"detail": e.detail}))}
+
+
+def _error(status: int, detail: str, **headers: str) -> Stored:
+    return {"status": status, "headers": {"content-type": "application/json", **headers}, "body": json.dumps({"detail": detail})}
+
+
+def _response(stored: Stored) -> Response:
+    headers = {name: value for name, value in stored["headers"].items() if name != "content-type"}
+    if stored.get("replayed"):
+        headers["idempotent-replayed"] = "true"
+    return Response(
+        content=stored["body"] or b"", status_code=stored["status"], headers=headers,
+        media_type=stored["headers"].get("content-type")
+    )
+
+
+def _claim(scope: str, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    with get_db_session() as db:
+        return claim_idempotency_key(db, scope, key, fingerprint)
+
+
+def _release(key: str):
+    with get_db_session() as db:
+        release_idempotency_key(db, key)
+
+
+def _finish(key: str, stored: Stored):
+    with get_db_session() as db:
+        if stored["status"] >= 500:
+            release_idempotency_key(db, key)
+        else:
+            complete_idempotency_key(db, key, stored["status"], stored["headers"], stored["body"])
+
+
+async def _run_once(scope: str, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]]) -> Stored:
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while True:
+        existing = await asyncio.to_thread(_claim, scope, key, fingerprint)
+        if existing is None:
+            break
+        if existing["fingerprint"] != fingerprint:
+            metrics.counter(f"idempotency.{scope}.mismatched").inc()
+            return _error(422, f"{IDEMPOTENCY_HEADER} was already used for a different request")
+        if existing["status"] == "completed":
+            metrics.counter(f"idempotency.{scope}.replayed").inc()
+            return {
+                "status": existing["response_status"], "headers": existing["response_headers"],
+                "body": existing["response_body"], "replayed": True,
+            }
+        if time.monotonic() > deadline:
+            return _error(409, "A request with this key is still in progress", **{"retry-after": "1"})
+        # In progress on another worker
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+    try:
+        stored = _from_result(await compute())
+    except HTTPException as e:
+        stored = _from_http_exception(e)
+    except BaseException:
+        await asyncio.to_thread(_release, key)
+        raise
+
+    await asyncio.to_thread(_finish, key, stored)
+    metrics.counter(f"idempotency.{scope}.executed").inc()
+    return stored
+
+
+async def idempotent(scope: str, key: Optional[str], request: Any, compute: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Run `compute` (an endpoint body returning a dict or Response, or raising
+    HTTPException) at most once per `key` within `scope`. `request` is
+    hashed to detect a key reused for a different request. Without a key
+    the body simply runs.
+    """
+    if not key:
+        try:
+            return _response(_from_result(await compute()))
+        except HTTPException as e:
+            return _response(_from_http_exception(e))
+
+    storage_key = idempotency_hash(scope, key)
+    fingerprint = idempotency_hash(json.dumps(jsonable_encoder(request), sort_keys=True))
+    stored = await _flight.do((storage_key, fingerprint), lambda: _run_once(scope, storage_key, fingerprint, compute))
+    return _response(stored)
@@ -0,0 +1,242 @@
+"""
+Compact busy-interval sets
+Sorted, non-overlapping intervals stored as epoch minutes in two array('q')
+buffers instead of lists of ISO-string dicts. Supports the set operations the
+slot finder needs and a compact binary form for AvailabilityCache.
+IntervalTree keeps intervals unmerged with a payload each, for "which of these
+commitments does [start, end) hit" conflict checks.
+"""
+
+import base64
+import heapq
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+EPOCH = datetime(1970, 1, 1)
+
+# AvailabilityCache.availability_data tag for the binary form
+CACHE_FORMAT = "intervals-v1"
+
+
+def to_minutes(value: datetime, round_up: bool = False) -> int:
+    """Epoch minutes for a naive-UTC (or aware) datetime"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    seconds = (value - EPOCH) // timedelta(seconds=1)
+    return -(-seconds // 60) if round_up else seconds // 60
+
+
+def from_minutes(minutes: int) -> datetime:
+    """Naive-UTC datetime for epoch minutes"""
+    return EPOCH + timedelta(minutes=minutes)
+
+
+class IntervalSet:
+    """
+    Half-open [start, end) minute intervals, sorted and merged.
+    Instances are immutable; operations return new sets.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: Optional[array] = None, ends: Optional[array] = None):
+        # Callers must pass already-normalized buffers; use from_pairs otherwise
+        self.starts = starts if starts is not None else array("q")
+        self.ends = ends if ends is not None else array("q")
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]]) -> "IntervalSet":
+        """Normalize arbitrary (start, end) minute pairs"""
+        return cls._merged(sorted(pair for pair in pairs if pair[1] > pair[0]))
+
+    @classmethod
+    def from_dicts(cls, intervals: Iterable[Any]) -> "IntervalSet":
+        """From [{"start": iso, "end": iso}] as returned by the provider parsers"""
+        return cls.from_pairs(
+            (to_minutes(datetime.fromisoformat(i["start"])), to_minutes(datetime.fromisoformat(i["end"]), round_up=True))
+            for i in intervals if i.get("start") and i.get("end")
+        )
+
+    @classmethod
+    def _merged(cls, pairs: Iterable[Tuple[int, int]]) -> "IntervalSet":
+        """Merge sorted pairs, coalescing overlapping and touching intervals"""
+        starts, ends = array("q"), array("q")
+        for start, end in pairs:
+            if ends and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        return cls(starts, ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, IntervalSet) and self.starts == other.starts and self.ends == other.ends
+
+    def __repr__(self) -> str:
+        return f"<IntervalSet({len(self)} intervals)>"
+
+    @property
+    def total_minutes(self) -> int:
+        return sum(self.ends) - sum(self.starts)
+
+    def union(self, *others: "IntervalSet") -> "IntervalSet":
+        """Merge with one or more sets (k-way merge, no re-sort)"""
+        return IntervalSet._merged(heapq.merge(self, *others))
+
+    def intersect(self, other: "IntervalSet") -> "IntervalSet":
+        starts, ends = array("q"), array("q")
+        i = j = 0
+        while i < len(self.starts) and j < len(other.starts):
+            start = max(self.starts[i], other.starts[j])
+            end = min(self.ends[i], other.ends[j])
+            if start < end:
+                starts.append(start)
+                ends.append(end)
+            if self.ends[i] < other.ends[j]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet(starts, ends)
+
+    def subtract(self, other: "IntervalSet") -> "IntervalSet":
+        starts, ends = array("q"), array("q")
+        j = 0
+        for start, end in self:
+            # Skip removals that end before this interval
+            while j < len(other.starts) and other.ends[j] <= start:
+                j += 1
+            k = j
+            while k < len(other.starts) and other.starts[k] < end:
+                if other.starts[k] > start:
+                    starts.append(start)
+                    ends.append(other.starts[k])
+                start = max(start, other.ends[k])
+                k += 1
+            if start < end:
+                starts.append(start)
+                ends.append(end)
+        return IntervalSet(starts, ends)
+
+    def clip(self, start: int, end: int) -> "IntervalSet":
+        return self.intersect(IntervalSet(array("q", [start]), array("q", [end])))
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Whether any interval overlaps [start, end)"""
+        # First interval ending after start is the only candidate
+        index = bisect_right(self.ends, start)
+        return index < len(self.starts) and self.starts[index] < end
+
+    def first_gap(self, minutes: int, start: int, end: int) -> Optional[int]:
+        """Start of the first gap of at least `minutes` within [start, end), or None"""
+        cursor = start
+        index = bisect_right(self.ends, start)
+        while cursor + minutes <= end:
+            if index >= len(self.starts) or self.starts[index] >= cursor + minutes:
+                return cursor
+            cursor = max(cursor, self.ends[index])
+            index += 1
+        return None
+
+    def gaps(self, start: int, end: int) -> "IntervalSet":
+        """Free time within [start, end)"""
+        return IntervalSet(array("q", [start]), array("q", [end])).subtract(self)
+
+    def to_dicts(self) -> List[dict]:
+        return [
+            {"start": from_minutes(start).isoformat(), "end": from_minutes(end).isoformat()}
+            for start, end in self
+        ]
+
+    def to_bytes(self) -> bytes:
+        """Little-endian int64 starts followed by ends"""
+        starts, ends = array("q", self.starts), array("q", self.ends)
+        if sys.byteorder == "big":
+            starts.byteswap()
+            ends.byteswap()
+        return starts.tobytes() + ends.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "IntervalSet":
+        values = array("q")
+        values.frombytes(data)
+        if sys.byteorder == "big":
+            values.byteswap()
+        half = len(values) // 2
+        return cls(values[:half], values[half:])
+
+    def to_cache(self) -> dict:
+        """JSON-safe value for AvailabilityCache.availability_data"""
+        return {"format": CACHE_FORMAT, "data": base64.b64encode(self.to_bytes()).decode("ascii")}
+
+    @classmethod
+    def from_cache(cls, value: Any) -> "IntervalSet":
+        """Read availability_data in either the binary form or the older list of dicts"""
+        if isinstance(value, dict) and value.get("format") == CACHE_FORMAT:
+            return cls.from_bytes(base64.b64decode(value["data"]))
+        return cls.from_dicts(value or [])
+
+
+def count_free(sets: Iterable[IntervalSet], start: int, end: int) -> int:
+    """How many of the sets have no interval overlapping [start, end)"""
+    return sum(1 for busy in sets if not busy.overlaps(start, end))
+
+
+T = TypeVar("T")
+
+
+class IntervalTree(Generic[T]):
+    """
+    Static interval tree over (start, end, value) in epoch minutes. Intervals
+    are sorted by start and the tree is implicit: the node for [lo, hi) is
+    the midpoint, augmented with the largest end in its range. Overlap
+    queries cost O(log n + k).
+    """
+
+    __slots__ = ("starts", "ends", "values", "max_ends")
+
+    def __init__(self, items: Iterable[Tuple[int, int, T]]):
+        ordered = sorted((item for item in items if item[1] > item[0]), key=lambda item: (item[0], item[1]))
+        self.starts = array("q", (start for start, _, _ in ordered))
+        self.ends = array("q", (end for _, end, _ in ordered))
+        self.values: List[T] = [value for _, _, value in ordered]
+        self.max_ends = array("q", self.ends)
+        self._augment(0, len(self.starts))
+
+    def _augment(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -sys.maxsize
+        mid = (lo + hi) // 2
+        self.max_ends[mid] = max(self.ends[mid], self._augment(lo, mid), self._augment(mid + 1, hi))
+        return self.max_ends[mid]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, start: int, end: int) -> List[T]:
+        """Values of intervals overlapping [start, end), in start order"""
+        found: List[int] = []
+        stack = [(0, len(self.starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_ends[mid] <= start:
+                continue
+            stack.append((lo, mid))
+            if self.starts[mid] < end:
+                if self.ends[mid] > start:
+                    found.append(mid)
+                # Right subtree starts at or after starts[mid]; only worth visiting while before `end`
+                stack.append((mid + 1, hi))
+        return [self.values[index] for index in sorted(found)]
@@ -0,0 +1,231 @@
+"""
+Logging setup
+Every record goes through a QueueHandler on the root logger, and a
+background QueueListener thread does the formatting and the writes, so
+request handlers never block on stdout. Records are queued unformatted:
+the message (%-style args), JSON encoding and tracebacks are rendered on
+the listener thread, which wakes every LOG_FLUSH_INTERVAL_MS and writes
+what has accumulated in one call (waking per record would hand the GIL back
+and forth with the event loop). High-volume loggers can be sampled below
+WARNING with LOG_SAMPLE_RATES, e.g. "uvicorn.access=0.1,availability=0.5".
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import metrics
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").upper()
+# "json" for one object per line, "text" for the classic console format
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# Records beyond this many waiting for the listener are dropped (and counted)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_FLUSH_INTERVAL_MS = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "50"))
+# How long stopping waits for room in a full queue before giving up on the listener
+LOG_STOP_TIMEOUT_SECONDS = 5.0
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Server loggers that install their own handlers; they are routed through the queue too
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "gunicorn.error", "gunicorn.access")
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional["BatchingQueueListener"] = None
+_lock = threading.Lock()
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """'logger=rate,...' into {logger: rate}"""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.strip().partition("=")
+        if name and rate:
+            rates[name] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; `extra` fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.name == "uvicorn.access" and isinstance(record.args, tuple) and len(record.args) == 5:
+            client, method, path, http_version, status = record.args
+            entry.update(client=client, method=method, path=path, http_version=http_version, status=status)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` share of sub-WARNING records per logger (longest matching prefix wins)"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        metrics.counter("logging.sampled_out").inc()
+        return False
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener and never blocks"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, on the caller's thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.counter("logging.queue_full").inc()
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """StreamHandler that can write a batch of records with one write and flush"""
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        lines = []
+        for record in records:
+            if record.levelno < self.level:
+                continue
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if lines:
+            with self.lock:
+                self.stream.write("".join(lines))
+                self.flush()
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that drains the queue in batches every `interval` seconds"""
+
+    def __init__(self, log_queue: queue.Queue, handler: BatchStreamHandler, interval: float = LOG_FLUSH_INTERVAL_MS / 1000):
+        super().__init__(log_queue, handler)
+        self.interval = interval
+
+    def _monitor(self):
+        while True:
+            records = [self.queue.get()]
+            if records[0] is not self._sentinel:
+                time.sleep(self.interval)
+            while records[-1] is not self._sentinel:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for handler in self.handlers:
+                handler.emit_batch([record for record in records if record is not self._sentinel])
+            if records[-1] is self._sentinel:
+                break
+
+    def enqueue_sentinel(self):
+        # The stock put_nowait raises queue.Full when stopping under load;
+        # the listener is still draining, so wait for room instead
+        self.queue.put(self._sentinel, timeout=LOG_STOP_TIMEOUT_SECONDS)
+
+    def stop(self):
+        try:
+            self.enqueue_sentinel()
+        except queue.Full:
+            # Listener wedged (e.g. a blocked stdout); its daemon thread is left behind
+            metrics.counter("logging.stop_timeout").inc()
+            self._thread = None
+            return
+        self._thread.join()
+        self._thread = None
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    sample_rates: Optional[Dict[str, float]] = None,
+    stream=None
+) -> LazyQueueHandler:
+    """
+    Route the root logger (and the server loggers) through a queue to a
+    listener thread writing to `stream` (stdout). Safe to call again; the
+    previous listener is flushed and replaced.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+
+        output = BatchStreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = LazyQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES) if sample_rates is None else sample_rates))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level.upper())
+        for name in SERVER_LOGGERS:
+            server_logger = logging.getLogger(name)
+            server_logger.handlers.clear()
+            server_logger.propagate = True
+
+        _listener = BatchingQueueListener(log_queue, output)
+        _listener.start()
+    return handler
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(stop_logging)
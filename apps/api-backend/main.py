@@ -4,28 +4,49 @@ FastAPI application for the SmartMeet meeting scheduling platform.
 """
 
 import os
+import sys
+import asyncio
 import logging
 import secrets
 import uuid
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from contextlib import asynccontextmanager
 from pydantic import BaseModel
 import httpx
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import Session
+
+# Add project root to Python path so the shared packages are importable
+# (on Vercel, packages/database ships with the function via includeFiles)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 # Import from shared packages
 from models import (
     Base, User, Meeting, CalendarAuth,
     create_user, create_meeting
 )
+from packages.database import get_db, get_read_db, init_database
+from providers import close_http_client
+from fieldsets import Projection
+from worker import worker, RUN_JOB_WORKER
+import webhooks
+import availability
+import search
+import scheduling
+import timeslots
+import metrics
+import profiling
+import health
+import admission
+from idempotency import idempotent
+from logging_config import configure_logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Structured logging through a background listener (LOG_FORMAT, LOG_SAMPLE_RATES)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # OAuth Configuration
@@ -41,22 +62,27 @@ FRONTEND_URL = os.getenv("FRONTEND_URL")
 if not FRONTEND_URL:
     raise ValueError("FRONTEND_URL environment variable is required")
 
-# # Database setup
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./smartmeet.db")
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def init_database():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+# Database sessions come from packages/database: get_db always uses the
+# primary, get_read_db may be served by a read replica (DATABASE_REPLICA_URLS).
 
-def get_db():
-    """Get database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Fields selectable with ?fields= on list endpoints (defaults keep the original response shape)
+USER_FIELDS = Projection(
+    User,
+    columns=["id", "email", "name", "avatar_url", "timezone", "is_active", "is_verified", "created_at", "updated_at", "last_login"],
+    default=["id", "email", "name", "created_at"],
+)
+MEETING_FIELDS = Projection(
+    Meeting,
+    columns=[
+        "id", "title", "description", "organizer_id", "status", "duration_minutes", "meeting_type", "location",
+        "meeting_url", "proposed_times", "selected_time", "timezone", "scheduled_at", "created_at", "updated_at",
+    ],
+    default=["id", "title", "description", "organizer_id", "status", "created_at"],
+    relations={
+        "organizer": (Meeting.organizer, ["id", "email", "name"]),
+        "participants": (Meeting.participants, ["id", "email", "name"]),
+    },
+)
 
 # Pydantic models
 class OAuthCallbackRequest(BaseModel):
@@ -71,8 +97,20 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting SmartMeet API...")
     init_database()
     logger.info("✅ Database initialized")
+
+    # Event-loop lag sampling for /ready
+    background_tasks = [asyncio.create_task(health.loop_monitor.run())]
+    # Background job worker (set RUN_JOB_WORKER=false when running worker.py separately)
+    if RUN_JOB_WORKER:
+        background_tasks.append(asyncio.create_task(worker.run()))
+
     yield
+
     logger.info("👋 Shutting down SmartMeet API...")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await close_http_client()
 
 # Create FastAPI app
 app = FastAPI(
@@ -82,6 +120,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Per-route-class concurrency limits and load shedding (inside CORS so 503s stay readable)
+if admission.ADMISSION_ENABLED:
+    app.add_middleware(admission.AdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -91,6 +133,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Signed per-request profiling (only when PROFILING_SECRET is set)
+if profiling.PROFILING_SECRET:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# Provider webhooks (calendar change notifications)
+app.include_router(webhooks.router)
+# Meeting availability (provider free/busy)
+app.include_router(availability.router)
+# Meeting and people search
+app.include_router(search.router)
+# Batch scheduling
+app.include_router(scheduling.router)
+# Time-range queries over proposed/selected slots
+app.include_router(timeslots.router)
+# Stored request profiles
+app.include_router(profiling.router)
+# Readiness probe with pool and dependency stats
+app.include_router(health.router)
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -98,9 +159,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness check endpoint (readiness with dependency stats is /ready)"""
     return {"status": "healthy", "service": "smartmeet-api"}
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process metrics for this worker"""
+    return metrics.snapshot()
+
 # OAuth Endpoints
 @app.get("/connect/microsoft")
 async def microsoft_oauth_start():
@@ -119,18 +185,17 @@ async def microsoft_oauth_start():
             f"response_mode=query"
         )
         
-        logger.info(f"🔗 Generated Microsoft OAuth URL with state: {state}")
+        logger.info("🔗 Generated Microsoft OAuth URL with state: %s", state)
         return {"auth_url": auth_url, "state": state}
     
     except Exception as e:
         logger.error(f"❌ Microsoft OAuth start error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to start OAuth: {str(e)}")
 
-@app.post("/connect/microsoft/callback")
-async def microsoft_oauth_callback(request: OAuthCallbackRequest, db=Depends(get_db)):
-    """Handle Microsoft OAuth callback"""
+async def complete_microsoft_oauth(request: OAuthCallbackRequest, db: Session):
+    """Exchange a Microsoft authorization code and store the calendar auth"""
     try:
-        logger.info(f"🔄 Processing Microsoft OAuth callback for code: {request.code[:20]}...")
+        logger.info("🔄 Processing Microsoft OAuth callback for code: %.20s...", request.code)
         
         # Exchange code for access token
         token_url = f"https://login.microsoftonline.com/{MICROSOFT_TENANT_ID}/oauth2/v2.0/token"
@@ -174,7 +239,7 @@ async def microsoft_oauth_callback(request: OAuthCallbackRequest, db=Depends(get
         user = db.query(User).filter(User.email == user_email).first()
         if not user:
             user = create_user(db, email=user_email, name=user_name)
-            logger.info(f"✅ Created new user: {user_email}")
+            logger.info("✅ Created new user: %s", user_email)
         
         # Create or update calendar auth
         calendar_auth = db.query(CalendarAuth).filter(
@@ -191,7 +256,7 @@ async def microsoft_oauth_callback(request: OAuthCallbackRequest, db=Depends(get
             calendar_auth.provider_email = user_email
             calendar_auth.is_active = True
             calendar_auth.updated_at = datetime.utcnow()
-            logger.info(f"🔄 Updated existing calendar auth for user: {user_email}")
+            logger.info("🔄 Updated existing calendar auth for user: %s", user_email)
         else:
             # Create new auth
             calendar_auth = CalendarAuth(
@@ -206,7 +271,7 @@ async def microsoft_oauth_callback(request: OAuthCallbackRequest, db=Depends(get
                 is_active=True
             )
             db.add(calendar_auth)
-            logger.info(f"✅ Created new calendar auth for user: {user_email}")
+            logger.info("✅ Created new calendar auth for user: %s", user_email)
         
         db.commit()
         
@@ -224,6 +289,15 @@ async def microsoft_oauth_callback(request: OAuthCallbackRequest, db=Depends(get
         db.rollback()
         raise HTTPException(status_code=500, detail=f"OAuth callback failed: {str(e)}")
 
+@app.post("/connect/microsoft/callback")
+async def microsoft_oauth_callback(request: OAuthCallbackRequest, idempotency_key: Optional[str] = Header(None),
+                                   db=Depends(get_db)):
+    """Handle Microsoft OAuth callback; a retried code gets the first response back"""
+    return await idempotent(
+        "oauth.microsoft", idempotency_key or request.code, request,
+        lambda: complete_microsoft_oauth(request, db)
+    )
+
 @app.get("/connect/google")
 async def google_oauth_start():
     """Start Google OAuth flow"""
@@ -242,18 +316,17 @@ async def google_oauth_start():
             f"prompt=consent"
         )
         
-        logger.info(f"🔗 Generated Google OAuth URL with state: {state}")
+        logger.info("🔗 Generated Google OAuth URL with state: %s", state)
         return {"auth_url": auth_url, "state": state}
     
     except Exception as e:
         logger.error(f"❌ Google OAuth start error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to start OAuth: {str(e)}")
 
-@app.get("/connect/google/callback")
-async def google_oauth_callback(code: str, state: str, db=Depends(get_db)):
-    """Handle Google OAuth callback"""
+async def complete_google_oauth(code: str, db: Session):
+    """Exchange a Google authorization code and store the calendar auth"""
     try:
-        logger.info(f"🔄 Processing Google OAuth callback for code: {code[:20]}...")
+        logger.info("🔄 Processing Google OAuth callback for code: %.20s...", code)
         
         # Exchange code for access token
         token_url = "https://oauth2.googleapis.com/token"
@@ -297,7 +370,7 @@ async def google_oauth_callback(code: str, state: str, db=Depends(get_db)):
         user = db.query(User).filter(User.email == user_email).first()
         if not user:
             user = create_user(db, email=user_email, name=user_name)
-            logger.info(f"✅ Created new user: {user_email}")
+            logger.info("✅ Created new user: %s", user_email)
         
         # Create or update calendar auth
         calendar_auth = db.query(CalendarAuth).filter(
@@ -314,7 +387,7 @@ async def google_oauth_callback(code: str, state: str, db=Depends(get_db)):
             calendar_auth.provider_email = user_email
             calendar_auth.is_active = True
             calendar_auth.updated_at = datetime.utcnow()
-            logger.info(f"🔄 Updated existing calendar auth for user: {user_email}")
+            logger.info("🔄 Updated existing calendar auth for user: %s", user_email)
         else:
             # Create new auth
             calendar_auth = CalendarAuth(
@@ -329,7 +402,7 @@ async def google_oauth_callback(code: str, state: str, db=Depends(get_db)):
                 is_active=True
             )
             db.add(calendar_auth)
-            logger.info(f"✅ Created new calendar auth for user: {user_email}")
+            logger.info("✅ Created new calendar auth for user: %s", user_email)
         
         db.commit()
         
@@ -341,15 +414,25 @@ async def google_oauth_callback(code: str, state: str, db=Depends(get_db)):
         db.rollback()
         return RedirectResponse(f"{FRONTEND_URL}/connect/google/callback?error=callback_failed")
 
+@app.get("/connect/google/callback")
+async def google_oauth_callback(code: str, state: str, db=Depends(get_db)):
+    """Handle Google OAuth callback; a reloaded callback gets the first redirect back"""
+    return await idempotent(
+        "oauth.google", code, {"code": code, "state": state},
+        lambda: complete_google_oauth(code, db)
+    )
+
 # User endpoints
 @app.get("/api/users")
-async def get_users(db=Depends(get_db)):
+async def get_users(fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+                    db=Depends(get_read_db)):
     """Get all users"""
-    users = db.query(User).all()
-    return [{"id": u.id, "email": u.email, "name": u.name, "created_at": u.created_at} for u in users]
+    selected = USER_FIELDS.select(fields)
+    users = db.query(User).options(*USER_FIELDS.options(selected)).all()
+    return [USER_FIELDS.serialize(u, selected) for u in users]
 
 @app.get("/api/users/{user_id}")
-async def get_user(user_id: str, db=Depends(get_db)):
+async def get_user(user_id: str, db=Depends(get_read_db)):
     """Get user by ID"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -358,23 +441,15 @@ async def get_user(user_id: str, db=Depends(get_db)):
 
 # Meeting endpoints
 @app.get("/api/meetings")
-async def get_meetings(db=Depends(get_db)):
+async def get_meetings(fields: Optional[str] = Query(None, description="Comma-separated fields to return; organizer and participants load the related users"),
+                       db=Depends(get_read_db)):
     """Get all meetings"""
-    meetings = db.query(Meeting).all()
-    return [
-        {
-            "id": m.id,
-            "title": m.title,
-            "description": m.description,
-            "organizer_id": m.organizer_id,
-            "status": m.status,
-            "created_at": m.created_at
-        }
-        for m in meetings
-    ]
+    selected = MEETING_FIELDS.select(fields)
+    meetings = db.query(Meeting).options(*MEETING_FIELDS.options(selected)).all()
+    return [MEETING_FIELDS.serialize(m, selected) for m in meetings]
 
 @app.get("/api/meetings/{meeting_id}")
-async def get_meeting(meeting_id: str, db=Depends(get_db)):
+async def get_meeting(meeting_id: str, db=Depends(get_read_db)):
     """Get meeting by ID"""
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
@@ -395,7 +470,7 @@ async def get_meeting(meeting_id: str, db=Depends(get_db)):
 
 # Calendar authentication endpoints
 @app.get("/api/auth/calendar/{user_id}")
-async def get_calendar_auths(user_id: str, db=Depends(get_db)):
+async def get_calendar_auths(user_id: str, db=Depends(get_read_db)):
     """Get calendar authentications for a user"""
     auths = db.query(CalendarAuth).filter(CalendarAuth.user_id == user_id).all()
     return [
@@ -410,11 +485,6 @@ async def get_calendar_auths(user_id: str, db=Depends(get_db)):
     ]
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+    # Same launcher as run.py: reload in development, gunicorn workers in production
+    from run import main as run_server
+    run_server()
@@ -0,0 +1,105 @@
+"""
+In-process metrics
+Counters and summaries kept per worker process and exposed at /metrics.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> int:
+        return self.value
+
+
+class Summary:
+    """Count / sum / max of observed values"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+_registry: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+
+
+def _get(name: str, kind):
+    metric = _registry.get(name)
+    if metric is None:
+        with _registry_lock:
+            metric = _registry.setdefault(name, kind())
+    return metric
+
+
+def counter(name: str) -> Counter:
+    return _get(name, Counter)
+
+
+def summary(name: str) -> Summary:
+    return _get(name, Summary)
+
+
+def snapshot() -> Dict[str, Any]:
+    """All metrics, by name"""
+    return {name: metric.snapshot() for name, metric in sorted(_registry.items())}
+
+
+class ProviderUsage:
+    """Provider calls and response bytes attributed to one unit of work"""
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+
+
+_provider_usage: contextvars.ContextVar[Optional[ProviderUsage]] = contextvars.ContextVar("provider_usage", default=None)
+
+
+@contextmanager
+def track_provider_usage():
+    """Attribute provider calls made inside the block (including child tasks) to one ProviderUsage"""
+    usage = ProviderUsage()
+    token = _provider_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _provider_usage.reset(token)
+
+
+def record_provider_response(provider: str, size: int):
+    """Called by provider clients for every HTTP response"""
+    counter(f"provider.{provider}.calls").inc()
+    counter(f"provider.{provider}.bytes").inc(size)
+    usage = _provider_usage.get()
+    if usage is not None:
+        usage.calls += 1
+        usage.bytes += size
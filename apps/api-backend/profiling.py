@@ -0,0 +1,318 @@
+"""
+On-demand request profiling
+A request carrying a signed X-Profile header (or __profile query flag) is
+profiled on its own: a sampling thread records, every PROFILE_INTERVAL_MS,
+where the request is - the running stack when it (or a task it started)
+holds the event loop, or the await chain of its deepest pending task while
+it waits. The samples are kept as a collapsed-stack profile (flamegraph.pl / speedscope)
+rooted at sqlalchemy, httpx, python or waiting, and fetched from
+/admin/profiles/{id}. The middleware is only installed when
+PROFILING_SECRET is set; unsigned requests pass straight through.
+
+Sign a request with:
+
+    python profiling.py GET /availability/<meeting_id>
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Profiling is disabled (and the middleware not installed) without a secret
+PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# Sampling stops after this long even if the request has not finished
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+# Finished profiles kept in memory per worker
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+# Optional directory to also write <id>.folded files to
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_FLAG = "__profile"
+
+# Stacks are rooted at the first of these found walking from the leaf
+PROFILE_CATEGORIES = (
+    ("sqlalchemy", ("sqlalchemy", "psycopg2", "sqlite3")),
+    ("httpx", ("httpx", "httpcore", "h11", "h2")),
+)
+
+router = APIRouter(tags=["profiling"])
+
+_profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_profiles_lock = threading.Lock()
+# One profile at a time per worker: the sampler competes for the GIL
+_active = threading.Lock()
+
+
+def _signature(method: str, path: str, expires: int) -> str:
+    message = f"{expires}:{method.upper()}:{path}".encode()
+    return hmac.new(PROFILING_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_profile_request(method: str, path: str, ttl_seconds: int = 300) -> str:
+    """Token profiling `method path` until ttl_seconds from now"""
+    if not PROFILING_SECRET:
+        raise ValueError("PROFILING_SECRET is not set")
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_signature(method, path, expires)}"
+
+
+def verify_profile_token(token: str, method: str, path: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not PROFILING_SECRET or not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(method, path, int(expires)))
+
+
+# Stack capture
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _coroutine_frames(coro) -> List[Any]:
+    """Frames of a suspended coroutine chain, outermost first"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def _thread_frames(thread_id: int) -> List[Any]:
+    """Running stack of the loop thread from the current task's coroutine down"""
+    frame = sys._current_frames().get(thread_id)
+    frames = []
+    while frame is not None:
+        if frame.f_code.co_name == "_run" and frame.f_globals.get("__name__") == "asyncio.events":
+            break
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _category(labels: List[str], waiting: bool) -> str:
+    for label in reversed(labels):
+        module = label.split(".", 1)[0].split(":", 1)[0]
+        for category, modules in PROFILE_CATEGORIES:
+            if module in modules:
+                return category
+    return "waiting" if waiting else "python"
+
+
+class RequestSampler(threading.Thread):
+    """
+    Samples one request task, and the tasks it creates, until stopped.
+    Weights are elapsed microseconds. While sampling, a loop task factory
+    records child tasks with the creator's stack as their prefix.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task, interval: float = PROFILE_INTERVAL_MS / 1000):
+        super().__init__(name="request-profiler", daemon=True)
+        self.loop = loop
+        self.interval = interval
+        self.loop_thread = threading.get_ident()
+        self.tasks: Dict[asyncio.Task, List[str]] = {task: []}
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._finished = threading.Event()
+        self._previous_factory = None
+
+    def _task_factory(self, loop, coro, **kwargs):
+        previous = self._previous_factory
+        task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+        creator = asyncio.current_task(loop)
+        if creator in self.tasks:
+            self.tasks[task] = self.tasks[creator] + [_label(frame) for frame in _thread_frames(self.loop_thread)]
+        return task
+
+    def start(self):
+        self._previous_factory = self.loop.get_task_factory()
+        self.loop.set_task_factory(self._task_factory)
+        super().start()
+
+    def run(self):
+        deadline = time.perf_counter() + PROFILE_MAX_SECONDS
+        last = time.perf_counter()
+        while not self._finished.wait(self.interval):
+            now = time.perf_counter()
+            if now > deadline:
+                break
+            try:
+                self.sample(int((now - last) * 1_000_000))
+            except Exception as e:  # the request must never fail because of the profiler
+                logger.debug(f"Profiler sample failed: {e}")
+            last = now
+
+    def sample(self, weight: int):
+        current = asyncio.current_task(self.loop)
+        tasks = list(self.tasks.items())
+        prefix = self.tasks.get(current)
+        if prefix is not None:
+            labels = prefix + [_label(frame) for frame in _thread_frames(self.loop_thread)]
+            waiting = False
+        else:
+            # Suspended: attribute to the deepest task still pending (the one doing the waiting)
+            pending = [(task, prefix) for task, prefix in tasks if not task.done()] or tasks[:1]
+            task, prefix = max(pending, key=lambda item: len(item[1]))
+            labels = prefix + [_label(frame) for frame in _coroutine_frames(task.get_coro())] + ["[await]"]
+            waiting = True
+        self.stacks[";".join([_category(labels, waiting)] + labels)] += weight
+        self.samples += 1
+
+    def stop(self):
+        self._finished.set()
+        self.join()
+        if self.loop.get_task_factory() == self._task_factory:
+            self.loop.set_task_factory(self._previous_factory)
+
+
+# Storage
+
+
+def _store(profile: Dict[str, Any]):
+    with _profiles_lock:
+        _profiles[profile["id"]] = profile
+        while len(_profiles) > PROFILE_STORE_SIZE:
+            _profiles.popitem(last=False)
+    if PROFILE_DIR:
+        try:
+            path = Path(PROFILE_DIR)
+            path.mkdir(parents=True, exist_ok=True)
+            (path / f"{profile['id']}.folded").write_text(collapsed(profile))
+        except OSError as e:
+            logger.warning(f"⚠️  Could not write profile {profile['id']}: {e}")
+
+
+def collapsed(profile: Dict[str, Any]) -> str:
+    """Brendan Gregg collapsed-stack format, one `frame;frame;... weight` line per stack"""
+    return "\n".join(f"{stack} {weight}" for stack, weight in profile["stacks"].most_common()) + "\n"
+
+
+def summary(profile: Dict[str, Any], top: int = 20) -> Dict[str, Any]:
+    categories: Counter = Counter()
+    for stack, weight in profile["stacks"].items():
+        categories[stack.split(";", 1)[0]] += weight
+    total = sum(categories.values()) or 1
+    return {
+        **{key: value for key, value in profile.items() if key != "stacks"},
+        "unit": "us",
+        "categories": {name: {"us": weight, "share": round(weight / total, 3)} for name, weight in categories.most_common()},
+        "top_stacks": [{"stack": stack.split(";"), "us": weight} for stack, weight in profile["stacks"].most_common(top)],
+    }
+
+
+# Middleware
+
+
+def _profile_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1")
+    query = scope.get("query_string", b"")
+    if PROFILE_QUERY_FLAG.encode() in query:
+        values = parse_qs(query.decode("latin-1")).get(PROFILE_QUERY_FLAG)
+        return values[0] if values else None
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling individually signed requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        token = _profile_token(scope) if scope["type"] == "http" else None
+        if token is None:
+            return await self.app(scope, receive, send)
+
+        method, path = scope["method"], scope["path"]
+        if not verify_profile_token(token, method, path):
+            metrics.counter("profiling.rejected").inc()
+            logger.warning(f"⚠️  Ignoring invalid profile token for {method} {path}")
+            return await self.app(scope, receive, send)
+        if not _active.acquire(blocking=False):
+            metrics.counter("profiling.busy").inc()
+            return await self.app(scope, receive, send)
+
+        profile_id = secrets.token_urlsafe(12)
+        status = {"code": None}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = RequestSampler(asyncio.get_running_loop(), asyncio.current_task())
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            _active.release()
+            duration = time.perf_counter() - started
+            _store({
+                "id": profile_id,
+                "method": method,
+                "path": path,
+                "status": status["code"],
+                "started_at": started_at.isoformat() + "Z",
+                "duration_ms": round(duration * 1000, 1),
+                "interval_ms": PROFILE_INTERVAL_MS,
+                "samples": sampler.samples,
+                "stacks": sampler.stacks,
+            })
+            metrics.counter("profiling.requests").inc()
+            logger.info(f"🔬 Profiled {method} {path} in {duration * 1000:.0f}ms ({sampler.samples} samples): {profile_id}")
+
+
+@router.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("folded", pattern="^(folded|json)$")):
+    """A stored request profile: collapsed stacks for flame graph tools, or a JSON summary"""
+    with _profiles_lock:
+        profile = _profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "json":
+        return summary(profile)
+    return PlainTextResponse(collapsed(profile))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sign a request for profiling")
+    parser.add_argument("method")
+    parser.add_argument("path", help="Request path without the query string")
+    parser.add_argument("--ttl", type=int, default=300, help="Seconds the token stays valid")
+    args = parser.parse_args()
+    print(f"X-Profile: {sign_profile_request(args.method, args.path, args.ttl)}")
@@ -0,0 +1,421 @@
+"""
+Calendar provider clients
+Thin async wrappers around Microsoft Graph and Google Calendar that share one
+pooled httpx client for the whole process.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+from urllib.parse import urlsplit
+
+import httpx
+
+import metrics
+from metrics import record_provider_response
+from throttling import PROVIDER_MAX_RETRIES, backoff_delay, breaker_for, bucket_for, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+GRAPH_BATCH_LIMIT = 20  # Max sub-requests per $batch call
+GRAPH_BATCH_RETRIES = 3
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Longest Retry-After a request will sleep through before giving up
+PROVIDER_MAX_RETRY_AFTER_SECONDS = float(os.getenv("PROVIDER_MAX_RETRY_AFTER_SECONDS", "30"))
+GRAPH_SCHEDULE_LIMIT = 20  # Schedules per getSchedule call
+GOOGLE_FREEBUSY_LIMIT = 50  # Calendars per freeBusy query
+GOOGLE_CALENDAR_BASE_URL = "https://www.googleapis.com/calendar/v3"
+# "fake" serves synthetic calendars in-process (fake_provider.py) for load tests
+CALENDAR_PROVIDER_MODE = os.getenv("CALENDAR_PROVIDER_MODE", "live").lower()
+
+# OAuth clients used to refresh access tokens
+OAUTH_CLIENTS = {
+    "microsoft": {
+        "token_url": f"https://login.microsoftonline.com/{os.getenv('MICROSOFT_TENANT_ID')}/oauth2/v2.0/token",
+        "client_id": os.getenv("MICROSOFT_CLIENT_ID"),
+        "client_secret": os.getenv("MICROSOFT_CLIENT_SECRET"),
+    },
+    "google": {
+        "token_url": "https://oauth2.googleapis.com/token",
+        "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+        "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
+    },
+}
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide outbound HTTP client (connection pooling + keep-alive)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        transport = None
+        if CALENDAR_PROVIDER_MODE == "fake":
+            from fake_provider import FakeProviderTransport
+            transport = FakeProviderTransport()
+            logger.warning("⚠️  CALENDAR_PROVIDER_MODE=fake: provider calls are served by synthetic calendars")
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            transport=transport,
+        )
+    return _http_client
+
+
+def http_pool_stats() -> Dict[str, Any]:
+    """Connection usage of the shared client's pool (empty before the first request)"""
+    if _http_client is None or _http_client.is_closed:
+        return {"open": 0, "active": 0, "idle": 0, "waiting": 0}
+    pool = getattr(_http_client._transport, "_pool", None)
+    if pool is None:
+        return {"transport": type(_http_client._transport).__name__}
+    connections = list(pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "open": len(connections),
+        "active": len(connections) - idle,
+        "idle": idle,
+        # Requests queued for a connection because the pool is at max_connections
+        "waiting": sum(1 for request in list(getattr(pool, "_requests", [])) if request.connection is None),
+        "max_connections": getattr(pool, "_max_connections", None),
+    }
+
+
+async def close_http_client():
+    """Close the shared HTTP client (called on application shutdown)"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+class ProviderError(Exception):
+    """A calendar provider returned an error response"""
+
+    def __init__(self, provider: str, status_code: int, message: str):
+        super().__init__(f"{provider} API error {status_code}: {message}")
+        self.provider = provider
+        self.status_code = status_code
+
+
+class CircuitOpenError(ProviderError):
+    """The provider host's circuit breaker is open; the request was not sent"""
+
+    def __init__(self, provider: str, host: str):
+        super().__init__(provider, 503, f"circuit open for {host}")
+        self.host = host
+
+
+def email_domain(email: Optional[str]) -> str:
+    return (email or "").rsplit("@", 1)[-1].lower()
+
+
+def tenant_key(auth) -> str:
+    """
+    Tenant a CalendarAuth belongs to, for grouping and rate limiting: the
+    token's tenant id when the access token is a readable JWT, otherwise the
+    mailbox domain.
+    """
+    try:
+        claims = auth.access_token.split(".")[1]
+        claims += "=" * (-len(claims) % 4)
+        tid = json.loads(base64.urlsafe_b64decode(claims)).get("tid")
+        if tid:
+            return f"tid:{tid}"
+    except (IndexError, ValueError, AttributeError):
+        pass
+    return f"domain:{email_domain(auth.provider_email)}"
+
+
+async def refresh_access_token(provider: str, refresh_token: str) -> Dict[str, Any]:
+    """Exchange a refresh token for a new access token (token endpoint JSON)"""
+    oauth = OAUTH_CLIENTS[provider]
+    response = await get_http_client().post(oauth["token_url"], data={
+        "client_id": oauth["client_id"],
+        "client_secret": oauth["client_secret"],
+        "refresh_token": refresh_token,
+        "grant_type": "refresh_token",
+    })
+    if response.status_code != 200:
+        raise ProviderError(provider, response.status_code, response.text)
+    return response.json()
+
+
+def _isoformat(value: datetime) -> str:
+    return value.replace(microsecond=0).isoformat() + "Z"
+
+
+class ProviderClient:
+    """
+    Authenticated requests against one provider API.
+    Every request takes a token from the (provider, tenant) bucket and passes
+    the host's circuit breaker. 429 and transient 5xx responses are retried
+    after Retry-After (pausing the whole bucket) or jittered backoff.
+    """
+
+    provider = ""
+    base_url = ""
+
+    def __init__(self, access_token: str, http: Optional[httpx.AsyncClient] = None, tenant: str = "default"):
+        self.access_token = access_token
+        self.http = http or get_http_client()
+        self.bucket = bucket_for(self.provider, tenant)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if not url.startswith("http"):
+            url = f"{self.base_url}{url}"
+        headers = {"Authorization": f"Bearer {self.access_token}", **kwargs.pop("headers", {})}
+        host = urlsplit(url).netloc
+        breaker = breaker_for(host)
+
+        for attempt in range(PROVIDER_MAX_RETRIES + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(self.provider, host)
+            # allow() only passes a half-open breaker by handing this call the trial
+            trial = breaker.state == "half-open"
+            try:
+                await self.bucket.acquire()
+                response = await self.http.request(method, url, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                # Only retry when the request cannot have reached the server, or is a read
+                if attempt == PROVIDER_MAX_RETRIES or not (isinstance(e, httpx.ConnectError) or method == "GET"):
+                    raise ProviderError(self.provider, 0, f"{type(e).__name__}: {e}") from e
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            except BaseException:
+                # Cancelled (client disconnect, single-flight leader cancelled) or failed before a response
+                if trial:
+                    breaker.abandon_trial()
+                raise
+
+            record_provider_response(self.provider, len(response.content))
+            if response.status_code not in RETRYABLE_STATUSES:
+                breaker.record_success()
+                if response.status_code >= 400:
+                    raise ProviderError(self.provider, response.status_code, response.text)
+                return response
+
+            # Throttling is the provider working as intended; only 5xx count against the host
+            if response.status_code == 429:
+                metrics.counter(f"provider.{self.provider}.throttled").inc()
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            if delay is not None:
+                # Hold the whole tenant for the full Retry-After, even when this call gives up
+                self.bucket.pause(delay)
+            if attempt == PROVIDER_MAX_RETRIES or (delay or 0) > PROVIDER_MAX_RETRY_AFTER_SECONDS:
+                raise ProviderError(self.provider, response.status_code, response.text)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            metrics.counter(f"provider.{self.provider}.retries").inc()
+            logger.info("🔁 %s returned %d, retrying in %.1fs", self.provider, response.status_code, delay)
+            await asyncio.sleep(delay)
+
+
+class GraphClient(ProviderClient):
+    """Microsoft Graph calendar operations for a single user"""
+
+    provider = "microsoft"
+    base_url = GRAPH_BASE_URL
+
+    async def create_subscription(self, notification_url: str, client_state: str, expires_at: datetime) -> Dict[str, Any]:
+        """Subscribe to change notifications for the user's events"""
+        response = await self._request("POST", "/subscriptions", json={
+            "changeType": "created,updated,deleted",
+            "notificationUrl": notification_url,
+            "resource": "me/events",
+            "expirationDateTime": _isoformat(expires_at),
+            "clientState": client_state,
+        })
+        return response.json()
+
+    async def renew_subscription(self, subscription_id: str, expires_at: datetime) -> Dict[str, Any]:
+        """Extend an existing subscription"""
+        response = await self._request("PATCH", f"/subscriptions/{subscription_id}", json={
+            "expirationDateTime": _isoformat(expires_at),
+        })
+        return response.json()
+
+    async def delete_subscription(self, subscription_id: str):
+        """Remove a subscription"""
+        await self._request("DELETE", f"/subscriptions/{subscription_id}")
+
+    async def batch(self, requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run sub-requests through JSON $batch, GRAPH_BATCH_LIMIT per call.
+        Each request needs a unique "id"; returns {id: sub-response}. Throttled
+        or transient sub-requests are retried on their own (after the largest
+        Retry-After they reported); the final response is kept for the rest.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = list(requests)
+
+        for attempt in range(GRAPH_BATCH_RETRIES + 1):
+            retry, retry_after = [], 0.0
+            chunks = [pending[i:i + GRAPH_BATCH_LIMIT] for i in range(0, len(pending), GRAPH_BATCH_LIMIT)]
+            pages = await asyncio.gather(*[
+                self._request("POST", "/$batch", json={"requests": chunk}) for chunk in chunks
+            ])
+            by_id = {request["id"]: request for request in pending}
+            for page in pages:
+                for response in page.json().get("responses", []):
+                    results[response["id"]] = response
+                    if response.get("status") in RETRYABLE_STATUSES and attempt < GRAPH_BATCH_RETRIES:
+                        retry.append(by_id[response["id"]])
+                        headers = response.get("headers") or {}
+                        delay = parse_retry_after(headers.get("Retry-After"))
+                        retry_after = max(retry_after, backoff_delay(attempt) if delay is None else delay)
+            if not retry:
+                break
+            logger.info("🔁 Retrying %d throttled Graph batch sub-request(s) in %.0fs", len(retry), retry_after)
+            self.bucket.pause(retry_after)
+            await asyncio.sleep(retry_after)
+            pending = retry
+
+        return results
+
+    async def get_calendar_views(self, emails: List[str], window_start: datetime, window_end: datetime) -> Dict[str, Any]:
+        """
+        Events for several mailboxes in one tenant, batched.
+        Returns {email: [events]} or {email: ProviderError} per mailbox.
+        """
+        query = (
+            f"startDateTime={_isoformat(window_start)}&endDateTime={_isoformat(window_end)}"
+            "&$select=start,end,showAs,isCancelled&$top=500"
+        )
+        requests = [
+            {
+                "id": str(index),
+                "method": "GET",
+                "url": f"/users/{email}/calendarView?{query}",
+                "headers": {"Prefer": 'outlook.timezone="UTC"'},
+            }
+            for index, email in enumerate(emails)
+        ]
+        responses = await self.batch(requests)
+
+        results: Dict[str, Any] = {}
+        for index, email in enumerate(emails):
+            response = responses.get(str(index), {})
+            status = response.get("status", 0)
+            if status >= 400 or not status:
+                results[email] = ProviderError(self.provider, status, str(response.get("body")))
+                continue
+            body = response.get("body") or {}
+            events = list(body.get("value", []))
+            next_link = body.get("@odata.nextLink")
+            while next_link:
+                page = (await self._request("GET", next_link, headers={"Prefer": 'outlook.timezone="UTC"'})).json()
+                events.extend(page.get("value", []))
+                next_link = page.get("@odata.nextLink")
+            results[email] = events
+        return results
+
+    async def get_schedule(self, emails: List[str], window_start: datetime, window_end: datetime) -> List[Dict[str, Any]]:
+        """
+        Merged free/busy for many mailboxes via getSchedule.
+        Returns the raw scheduleInformation entries (scheduleId, scheduleItems
+        or error), GRAPH_SCHEDULE_LIMIT mailboxes per call, calls concurrent.
+        """
+        async def query(chunk: List[str]) -> List[Dict[str, Any]]:
+            response = await self._request(
+                "POST", "/me/calendar/getSchedule",
+                headers={"Prefer": 'outlook.timezone="UTC"'},
+                json={
+                    "schedules": chunk,
+                    "startTime": {"dateTime": window_start.replace(microsecond=0).isoformat(), "timeZone": "UTC"},
+                    "endTime": {"dateTime": window_end.replace(microsecond=0).isoformat(), "timeZone": "UTC"},
+                    "availabilityViewInterval": 15,
+                },
+            )
+            return response.json().get("value", [])
+
+        chunks = [emails[i:i + GRAPH_SCHEDULE_LIMIT] for i in range(0, len(emails), GRAPH_SCHEDULE_LIMIT)]
+        pages = await asyncio.gather(*[query(chunk) for chunk in chunks])
+        return [entry for page in pages for entry in page]
+
+
+
+class GoogleCalendarClient(ProviderClient):
+    """Google Calendar operations for a single user's primary calendar"""
+
+    provider = "google"
+    base_url = GOOGLE_CALENDAR_BASE_URL
+
+    async def create_subscription(self, notification_url: str, client_state: str, expires_at: datetime, channel_id: str) -> Dict[str, Any]:
+        """Open a watch channel on the primary calendar's events"""
+        response = await self._request("POST", "/calendars/primary/events/watch", json={
+            "id": channel_id,
+            "type": "web_hook",
+            "address": notification_url,
+            "token": client_state,
+            "expiration": int(expires_at.replace(tzinfo=timezone.utc).timestamp() * 1000),
+        })
+        return response.json()
+
+    async def delete_subscription(self, channel_id: str, resource_id: str):
+        """Stop a watch channel"""
+        await self._request("POST", "/channels/stop", json={"id": channel_id, "resourceId": resource_id})
+
+    async def free_busy(self, calendar_ids: List[str], window_start: datetime, window_end: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        Merged busy intervals for many calendars via freeBusy.query.
+        Returns {calendar_id: {"busy": [...], "errors": [...]}},
+        GOOGLE_FREEBUSY_LIMIT calendars per call, calls concurrent.
+        """
+        async def query(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+            response = await self._request("POST", "/freeBusy", json={
+                "timeMin": _isoformat(window_start),
+                "timeMax": _isoformat(window_end),
+                "items": [{"id": calendar_id} for calendar_id in chunk],
+            })
+            return response.json().get("calendars", {})
+
+        chunks = [calendar_ids[i:i + GOOGLE_FREEBUSY_LIMIT] for i in range(0, len(calendar_ids), GOOGLE_FREEBUSY_LIMIT)]
+        results: Dict[str, Dict[str, Any]] = {}
+        for page in await asyncio.gather(*[query(chunk) for chunk in chunks]):
+            results.update(page)
+        return results
+
+    async def list_events(self, window_start: datetime, window_end: datetime, calendar_id: str = "primary",
+                          single_events: bool = True) -> List[Dict[str, Any]]:
+        """
+        Events in a window. With single_events=False recurring series come
+        back as one master event (recurrence rules) plus their exceptions,
+        for expansion on our side.
+        """
+        params: Dict[str, Any] = {
+            "singleEvents": "true" if single_events else "false",
+            "timeMin": _isoformat(window_start),
+            "timeMax": _isoformat(window_end),
+            "maxResults": 2500,
+            "fields": (
+                "items(start,end,status,transparency),nextPageToken" if single_events else
+                "items(id,etag,start,end,status,transparency,recurrence,recurringEventId,originalStartTime),nextPageToken"
+            ),
+        }
+        events: List[Dict[str, Any]] = []
+        while True:
+            page = (await self._request("GET", f"/calendars/{calendar_id}/events", params=params)).json()
+            events.extend(page.get("items", []))
+            if not page.get("nextPageToken"):
+                return events
+            params["pageToken"] = page["nextPageToken"]
+
+
+
+def client_for(calendar_auth) -> Any:
+    """Provider client for a CalendarAuth row"""
+    if calendar_auth.provider == "microsoft":
+        return GraphClient(calendar_auth.access_token, tenant=tenant_key(calendar_auth))
+    if calendar_auth.provider == "google":
+        return GoogleCalendarClient(calendar_auth.access_token, tenant=tenant_key(calendar_auth))
+    raise ValueError(f"Unsupported calendar provider: {calendar_auth.provider}")
@@ -0,0 +1,168 @@
+"""
+Recurring event expansion
+Expands a recurring series (RRULE/EXDATE/RDATE lines) lazily, only over the
+window being queried, applying cancelled and moved instances. Expanded
+windows are memoized per series in a bounded LRU keyed by the series version,
+so an edited series is re-expanded on its next use.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrulestr
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+RECURRENCE_CACHE_SIZE = int(os.getenv("RECURRENCE_CACHE_SIZE", "2048"))
+
+Occurrence = Tuple[datetime, datetime]
+
+
+def _to_utc(value: datetime) -> datetime:
+    """Naive UTC for an aware datetime; naive values are assumed UTC already"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class RecurringSeries:
+    """
+    One recurring event. `start` is the first occurrence, aware in the
+    series' own timezone so wall-clock times survive DST changes.
+    `cancelled` and `overrides` are keyed by an instance's original start
+    (naive UTC); overrides hold the moved (start, end).
+    """
+
+    __slots__ = ("series_id", "version", "start", "duration", "rules", "cancelled", "overrides")
+
+    def __init__(self, series_id: str, start: datetime, duration: timedelta, rules: List[str], version: str = "",
+                 cancelled: Optional[Set[datetime]] = None, overrides: Optional[Dict[datetime, Occurrence]] = None):
+        self.series_id = series_id
+        self.version = version
+        self.start = start
+        self.duration = duration
+        self.rules = rules
+        self.cancelled = cancelled or set()
+        self.overrides = overrides or {}
+
+    def _ruleset(self):
+        """The parsed rule set and the zone it expands in (None: naive UTC)"""
+        rules = "\n".join(self.rules)
+        try:
+            return rrulestr(rules, dtstart=self.start, forceset=True, unfold=True), self.start.tzinfo
+        except ValueError:
+            # Floating UNTIL values (all-day series) cannot mix with an aware start
+            return rrulestr(rules, dtstart=_to_utc(self.start), forceset=True, unfold=True), None
+
+    def occurrences(self, window_start: datetime, window_end: datetime) -> Iterator[Occurrence]:
+        """
+        Lazily yield (start, end) in naive UTC for every instance overlapping
+        [window_start, window_end). Nothing past window_end is generated.
+        """
+        ruleset, zone = self._ruleset()
+        # Instances starting up to one duration before the window still overlap it
+        after = window_start - self.duration
+        if zone is not None:
+            after = after.replace(tzinfo=timezone.utc).astimezone(zone)
+
+        for occurrence in ruleset.xafter(after, inc=False):
+            start = _to_utc(occurrence)
+            if start >= window_end:
+                break
+            if start in self.cancelled or start in self.overrides:
+                continue
+            yield start, start + self.duration
+
+        # Moved instances can land in the window from outside it
+        for start, end in self.overrides.values():
+            if start < window_end and end > window_start:
+                yield start, end
+
+
+class OccurrenceCache:
+    """Bounded LRU of expanded windows per series version"""
+
+    def __init__(self, max_entries: int = RECURRENCE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[Occurrence, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def expand(self, series: RecurringSeries, window_start: datetime, window_end: datetime) -> Tuple[Occurrence, ...]:
+        key = (series.series_id, series.version, window_start, window_end)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                metrics.counter("recurrence.cache_hits").inc()
+                return cached
+
+        metrics.counter("recurrence.cache_misses").inc()
+        expanded = tuple(series.occurrences(window_start, window_end))
+        with self._lock:
+            self._entries[key] = expanded
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return expanded
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+occurrence_cache = OccurrenceCache()
+
+
+def _google_time(value: Dict[str, Any]) -> datetime:
+    """Aware datetime for a Google start/end object, in the event's own timezone"""
+    if value.get("date"):
+        # All-day: midnight in the calendar's zone when known, else UTC
+        parsed = datetime.fromisoformat(value["date"])
+    else:
+        parsed = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+    try:
+        zone = ZoneInfo(value["timeZone"]) if value.get("timeZone") else None
+    except ZoneInfoNotFoundError:
+        zone = None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=zone or timezone.utc)
+    return parsed.astimezone(zone) if zone else parsed
+
+
+def series_from_google(master: Dict[str, Any], exceptions: List[Dict[str, Any]]) -> RecurringSeries:
+    """
+    Build a series from a Google master event (singleEvents=false) and its
+    exception instances (events carrying recurringEventId/originalStartTime).
+    Cancelled or transparent exceptions free their slot.
+    """
+    start = _google_time(master["start"])
+    duration = _google_time(master["end"]) - start
+    cancelled: Set[datetime] = set()
+    overrides: Dict[datetime, Occurrence] = {}
+    for instance in exceptions:
+        original = _to_utc(_google_time({**instance["originalStartTime"], "timeZone": master["start"].get("timeZone")}))
+        if instance.get("status") == "cancelled" or instance.get("transparency") == "transparent":
+            cancelled.add(original)
+        else:
+            overrides[original] = (_to_utc(_google_time(instance["start"])), _to_utc(_google_time(instance["end"])))
+    # Editing one instance leaves the master untouched, so exceptions are part of the version
+    fingerprint = hashlib.sha1("|".join(sorted(
+        f"{instance.get('id')}:{instance.get('etag') or instance.get('updated', '')}" for instance in exceptions
+    )).encode()).hexdigest()
+    return RecurringSeries(
+        series_id=master["id"],
+        version=f"{master.get('etag') or master.get('updated', '')}:{fingerprint}",
+        start=start,
+        duration=duration,
+        rules=list(master.get("recurrence", [])),
+        cancelled=cancelled,
+        overrides=overrides,
+    )
@@ -1,31 +1,103 @@
 #!/usr/bin/env python3
 """
-SmartMeet API Backend Development Server
-Simple script to run the FastAPI development server.
+SmartMeet API Backend Server
+Runs the FastAPI app with auto-reload in development, or under gunicorn with
+multiple uvicorn workers (uvloop + httptools) in production.
+
+Usage:
+    python run.py                 # development server (reload enabled)
+    python run.py --production    # production server (see gunicorn.conf.py)
+
+The mode can also be selected with ENVIRONMENT=production.
 """
 
 import uvicorn
 import os
 import sys
+import argparse
+import shutil
 from pathlib import Path
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-if __name__ == "__main__":
-    # Get port from environment or default to 8000
-    port = int(os.getenv("PORT", 8000))
-    
-    print(f"🚀 Starting SmartMeet API on port {port}")
+API_DIR = Path(__file__).parent
+GUNICORN_CONFIG = API_DIR / "gunicorn.conf.py"
+
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
+
+
+def default_worker_count() -> int:
+    """Worker count for production: WEB_CONCURRENCY, else one per CPU"""
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return max(1, os.cpu_count() or 1)
+
+
+def run_development(port: int):
+    """Single-process server with auto-reload"""
+    print(f"🚀 Starting SmartMeet API on port {port} (development)")
     print(f"📁 Project root: {project_root}")
     print(f"🌐 API will be available at: http://localhost:{port}")
     print(f"📖 API docs available at: http://localhost:{port}/docs")
-    
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
         reload=True,
         log_level="info"
-    ) 
\ No newline at end of file
+    )
+
+
+def run_production(port: int):
+    """Multi-worker server managed by gunicorn"""
+    os.environ["PORT"] = str(port)
+    # Jobs run in the dedicated worker process (Procfile `worker`), not in every web worker
+    os.environ.setdefault("RUN_JOB_WORKER", "false")
+    gunicorn = shutil.which("gunicorn")
+
+    if gunicorn:
+        print(f"🚀 Starting SmartMeet API on port {port} (production, {default_worker_count()} workers)")
+        os.chdir(API_DIR)
+        os.execv(gunicorn, [gunicorn, "-c", str(GUNICORN_CONFIG), "main:app"])
+
+    # Fallback for platforms without gunicorn: uvicorn's own process manager
+    # does not respawn workers, so request-count recycling is left disabled.
+    print("⚠️  gunicorn not found - falling back to uvicorn multi-process mode")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=default_worker_count(),
+        loop="uvloop",
+        http="httptools",
+        backlog=int(os.getenv("BACKLOG", 2048)),
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE", 75)),
+        proxy_headers=True,
+        log_level=os.getenv("LOG_LEVEL", "info").lower()
+    )
+
+
+def main():
+    """Select the server mode and start it"""
+    parser = argparse.ArgumentParser(description="SmartMeet API Server")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--production', action='store_true', help='Run the multi-worker production server')
+    mode.add_argument('--development', action='store_true', help='Run the auto-reloading development server')
+    args = parser.parse_args()
+
+    # Get port from environment or default to 8000
+    port = int(os.getenv("PORT", 8000))
+
+    production = args.production or (ENVIRONMENT == "production" and not args.development)
+    if production:
+        run_production(port)
+    else:
+        run_development(port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Batch scheduling
+Places many meetings at once: everyone's busy time is loaded in one pass,
+then meetings are assigned in priority order, each one reserving its slot
+for its attendees so later meetings in the batch cannot collide with it.
+Results are written to proposed_times/selected_time in a single transaction.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+import metrics
+from availability import (
+    MAX_PROPOSED_TIMES, availability_window, candidate_starts, format_slot,
+    get_busy_intervals, meeting_attendees, score_slots,
+)
+from idempotency import idempotent
+from intervals import IntervalSet
+from models import Meeting
+from packages.database import get_db
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/meetings", tags=["scheduling"])
+
+SCHEDULE_BATCH_MAX_MEETINGS = int(os.getenv("SCHEDULE_BATCH_MAX_MEETINGS", "500"))
+# Wall-clock budget for the solver; meetings not reached are reported as deferred
+SCHEDULE_BATCH_TIME_BUDGET_SECONDS = float(os.getenv("SCHEDULE_BATCH_TIME_BUDGET_SECONDS", "5"))
+
+# Meetings in these states keep their current times
+FINAL_STATUSES = {"scheduled", "cancelled", "completed"}
+
+
+class BatchScheduleRequest(BaseModel):
+    meeting_ids: List[str] = Field(..., min_length=1)
+    # Higher goes first; unlisted meetings default to 0
+    priorities: Dict[str, int] = Field(default_factory=dict)
+
+
+def schedule_order(meetings: List[Meeting], priorities: Dict[str, int]) -> List[Meeting]:
+    """Priority first, then the hardest to place (most attendees, longest), then oldest"""
+    return sorted(meetings, key=lambda meeting: (
+        -priorities.get(meeting.id, 0),
+        -len(meeting_attendees(meeting)),
+        -(meeting.duration_minutes or 30),
+        meeting.created_at or datetime.min,
+    ))
+
+
+def solve(meetings: List[Meeting], busy: Dict[str, Any], window_start, window_end,
+          deadline: float) -> Tuple[Dict[str, List[Tuple[float, int]]], Dict[str, str]]:
+    """
+    Greedy joint assignment in the given order. Slots already taken by an
+    attendee within this batch are excluded outright; calendar conflicts only
+    lower a slot's confidence. Returns ({meeting_id: ranked (confidence,
+    start)}, {meeting_id: reason}) for the meetings that could not be placed.
+    """
+    reserved: Dict[str, IntervalSet] = {}
+    starts_cache: Dict[Tuple[int, str], List[int]] = {}
+    placed: Dict[str, List[Tuple[float, int]]] = {}
+    unplaced: Dict[str, str] = {}
+
+    for meeting in meetings:
+        if time.monotonic() > deadline:
+            unplaced[meeting.id] = "deferred"
+            continue
+
+        duration = meeting.duration_minutes or 30
+        attendees = meeting_attendees(meeting)
+        key = (duration, meeting.timezone or "UTC")
+        if key not in starts_cache:
+            starts_cache[key] = candidate_starts(window_start, window_end, duration, meeting.timezone)
+
+        taken = [reserved[user.id] for user in attendees if user.id in reserved]
+        starts = [
+            start for start in starts_cache[key]
+            if not any(intervals.overlaps(start, start + duration) for intervals in taken)
+        ]
+        ranked = score_slots({user.id: busy.get(user.id) for user in attendees}, len(attendees), starts, duration)
+        if not ranked:
+            unplaced[meeting.id] = "no_slot"
+            continue
+
+        placed[meeting.id] = ranked[:MAX_PROPOSED_TIMES]
+        selected = ranked[0][1]
+        booking = IntervalSet.from_pairs([(selected, selected + duration)])
+        for user in attendees:
+            reserved[user.id] = reserved[user.id].union(booking) if user.id in reserved else booking
+
+    return placed, unplaced
+
+
+async def schedule_meetings(request: BatchScheduleRequest, db: Session) -> Dict[str, Any]:
+    """Jointly place many meetings and store their proposed and selected times"""
+    meeting_ids = list(dict.fromkeys(request.meeting_ids))
+    if len(meeting_ids) > SCHEDULE_BATCH_MAX_MEETINGS:
+        raise HTTPException(status_code=400, detail=f"At most {SCHEDULE_BATCH_MAX_MEETINGS} meetings per batch")
+
+    meetings = db.query(Meeting).options(
+        selectinload(Meeting.participants),
+        joinedload(Meeting.organizer)
+    ).filter(Meeting.id.in_(meeting_ids)).all()
+    found = {meeting.id for meeting in meetings}
+    missing = [meeting_id for meeting_id in meeting_ids if meeting_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail={"message": "Meetings not found", "meeting_ids": missing})
+
+    skipped = {meeting.id: meeting.status for meeting in meetings if meeting.status in FINAL_STATUSES}
+    pending = [meeting for meeting in meetings if meeting.id not in skipped]
+
+    # Everyone's busy time in one pass (cache + grouped free/busy queries)
+    users = {user.id: user for meeting in pending for user in meeting_attendees(meeting)}
+    window_start, window_end = availability_window()
+    with metrics.track_provider_usage() as usage:
+        busy = await get_busy_intervals(db, list(users.values()), window_start, window_end)
+
+    ordered = schedule_order(pending, request.priorities)
+    started = time.monotonic()
+    placed, unplaced = solve(ordered, busy, window_start, window_end, deadline=started + SCHEDULE_BATCH_TIME_BUDGET_SECONDS)
+    solve_ms = (time.monotonic() - started) * 1000
+    metrics.summary("scheduling.batch_meetings").observe(len(pending))
+    metrics.summary("scheduling.solve_ms").observe(solve_ms)
+
+    scheduled = []
+    try:
+        for meeting in ordered:
+            if meeting.id not in placed:
+                continue
+            duration = meeting.duration_minutes or 30
+            proposed = [format_slot(start, duration, confidence) for confidence, start in placed[meeting.id]]
+            meeting.proposed_times = proposed
+            meeting.selected_time = proposed[0]
+            if meeting.status == "draft":
+                meeting.status = "proposed"
+            scheduled.append({"meeting_id": meeting.id, "selected_time": proposed[0], "proposed_times": proposed})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(
+        f"🗓️  Batch scheduled {len(scheduled)}/{len(pending)} meetings in {solve_ms:.0f}ms "
+        f"({usage.calls} provider call(s))"
+    )
+    return {
+        "scheduled": scheduled,
+        "unscheduled": [{"meeting_id": meeting_id, "reason": reason} for meeting_id, reason in unplaced.items()],
+        "skipped": [{"meeting_id": meeting_id, "status": status} for meeting_id, status in skipped.items()],
+        "solve_ms": round(solve_ms, 1),
+    }
+
+
+@router.post("/schedule-batch")
+async def schedule_batch(request: BatchScheduleRequest, idempotency_key: Optional[str] = Header(None),
+                         db=Depends(get_db)):
+    """Batch scheduling; retries with the same Idempotency-Key get the first result back"""
+    return await idempotent("scheduling.batch", idempotency_key, request, lambda: schedule_meetings(request, db))
@@ -0,0 +1,27 @@
+"""
+Search API
+Fuzzy lookup of meetings and people for the add-in and web portal, ranked by
+similarity (pg_trgm on PostgreSQL, LIKE on SQLite).
+"""
+
+from fastapi import APIRouter, Depends, Query
+
+from packages.database import get_read_db, search_meetings, search_users
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    type: str = Query("all", pattern="^(all|meetings|users)$"),
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_read_db),
+):
+    """Meetings (title/description) and users (email/name) matching q, best match first"""
+    results = {"query": q}
+    if type in ("all", "meetings"):
+        results["meetings"] = search_meetings(db, q, limit)
+    if type in ("all", "users"):
+        results["users"] = search_users(db, q, limit)
+    return results
@@ -0,0 +1,64 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-progress computation
+instead of each running it. Nothing is cached: once the leader finishes, the
+next call for the key computes afresh.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Per-process map of key -> in-flight future. The first caller for a key
+    (the leader) runs the computation; callers arriving while it runs await
+    its result or exception. Counts are published as `<name>.leaders` and
+    `<name>.coalesced`.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            metrics.counter(f"{self.name}.coalesced").inc()
+            try:
+                # Shielded so a follower disconnecting cannot cancel the leader's work
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader's request was cancelled; take over as the next leader
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        metrics.counter(f"{self.name}.leaders").inc()
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Followers re-raise it; mark it retrieved when nobody was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,196 @@
+"""
+Provider push-subscription management
+Creates a Graph subscription or Google watch channel for every active
+CalendarAuth and renews it before it expires. Each calendar is handled with
+a short read, the provider calls with no connection held, then a short
+conditional write. A unique (calendar_auth_id, provider) index keeps
+concurrent reconcilers in several workers from subscribing a calendar
+twice; the loser stops the subscription it created.
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+
+from models import CalendarAuth, CalendarSubscription
+from packages.database import get_db_session
+from providers import client_for, ProviderError
+
+logger = logging.getLogger(__name__)
+
+# Public HTTPS base URL providers deliver notifications to; subscriptions are
+# disabled when unset (e.g. local development without a tunnel)
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL")
+
+# Provider maximums: Graph event subscriptions ~70.5h, Google channels ~7 days
+SUBSCRIPTION_LIFETIME = {
+    "microsoft": timedelta(minutes=4200),
+    "google": timedelta(days=7),
+}
+RENEWAL_MARGIN = timedelta(minutes=int(os.getenv("SUBSCRIPTION_RENEWAL_MARGIN_MINUTES", "720")))
+RENEWAL_INTERVAL_SECONDS = int(os.getenv("SUBSCRIPTION_RENEWAL_INTERVAL_SECONDS", "900"))
+
+
+def _notification_url(provider: str) -> str:
+    return f"{WEBHOOK_BASE_URL.rstrip('/')}/webhooks/{provider}"
+
+
+def _due_auth_ids(renew_before: datetime) -> List[str]:
+    """Active calendars with no subscription, or one expiring before renew_before"""
+    with get_db_session() as db:
+        rows = db.query(CalendarAuth.id).outerjoin(CalendarSubscription, and_(
+            CalendarSubscription.calendar_auth_id == CalendarAuth.id,
+            CalendarSubscription.provider == CalendarAuth.provider
+        )).filter(
+            CalendarAuth.is_active == True,
+            CalendarAuth.provider.in_(list(SUBSCRIPTION_LIFETIME)),
+            or_(CalendarSubscription.id.is_(None), CalendarSubscription.expires_at <= renew_before)
+        ).all()
+    return [auth_id for (auth_id,) in rows]
+
+
+def _snapshot(auth_id: str) -> Optional[Dict[str, Any]]:
+    """What one calendar's upkeep needs, read in a short session"""
+    with get_db_session() as db:
+        auth = db.get(CalendarAuth, auth_id)
+        if not auth or not auth.is_active:
+            return None
+        subscription = db.query(CalendarSubscription).filter(
+            CalendarSubscription.calendar_auth_id == auth_id,
+            CalendarSubscription.provider == auth.provider
+        ).first()
+        return {
+            "provider": auth.provider,
+            "user_id": auth.user_id,
+            "client": client_for(auth),
+            "subscription": subscription and {
+                "id": subscription.id,
+                "external_id": subscription.external_id,
+                "resource_id": subscription.resource_id,
+                "client_state": subscription.client_state,
+                "expires_at": subscription.expires_at,
+            },
+        }
+
+
+def _insert_subscription(auth_id: str, provider: str, **values) -> bool:
+    """False when another worker already subscribed this calendar"""
+    try:
+        with get_db_session() as db:
+            db.add(CalendarSubscription(calendar_auth_id=auth_id, provider=provider, **values))
+    except IntegrityError:
+        return False
+    return True
+
+
+def _update_subscription(subscription_id: str, external_id: str, values: Dict[str, Any]) -> bool:
+    """Apply values unless another worker replaced the subscription since it was read"""
+    with get_db_session() as db:
+        updated = db.query(CalendarSubscription).filter(
+            CalendarSubscription.id == subscription_id,
+            CalendarSubscription.external_id == external_id
+        ).update(values, synchronize_session=False)
+    return bool(updated)
+
+
+class SubscriptionManager:
+    """Keeps one live push subscription per active CalendarAuth"""
+
+    async def _create(self, client, provider: str, client_state: str, expires_at: datetime) -> Tuple[str, Optional[str]]:
+        """Open a provider subscription; returns (external_id, resource_id)"""
+        if provider == "microsoft":
+            created = await client.create_subscription(_notification_url("microsoft"), client_state, expires_at)
+            return created["id"], None
+        channel_id = str(uuid.uuid4())
+        created = await client.create_subscription(_notification_url("google"), client_state, expires_at, channel_id)
+        return channel_id, created.get("resourceId")
+
+    async def _stop(self, client, provider: str, external_id: str, resource_id: Optional[str]):
+        try:
+            if provider == "microsoft":
+                await client.delete_subscription(external_id)
+            else:
+                await client.delete_subscription(external_id, resource_id)
+        except ProviderError as e:
+            logger.warning(f"⚠️  Failed to stop {provider} subscription {external_id}: {e}")
+
+    async def subscribe(self, auth_id: str, snapshot: Dict[str, Any]) -> bool:
+        """Create a provider subscription for a calendar that has none"""
+        client, provider = snapshot["client"], snapshot["provider"]
+        client_state = secrets.token_urlsafe(32)
+        expires_at = datetime.utcnow() + SUBSCRIPTION_LIFETIME[provider]
+        external_id, resource_id = await self._create(client, provider, client_state, expires_at)
+
+        stored = await asyncio.to_thread(
+            _insert_subscription, auth_id, provider, external_id=external_id, resource_id=resource_id,
+            client_state=client_state, expires_at=expires_at
+        )
+        if not stored:
+            logger.info(f"⏭️  Calendar auth {auth_id} was subscribed by another worker; stopping {external_id}")
+            await self._stop(client, provider, external_id, resource_id)
+            return False
+        logger.info(f"✅ Created {provider} subscription {external_id} for user {snapshot['user_id']}")
+        return True
+
+    async def renew(self, snapshot: Dict[str, Any]) -> bool:
+        """Extend a subscription (Graph) or replace its channel (Google), keeping its row"""
+        client, provider, subscription = snapshot["client"], snapshot["provider"], snapshot["subscription"]
+        expires_at = datetime.utcnow() + SUBSCRIPTION_LIFETIME[provider]
+        replaced = None
+
+        if provider == "microsoft":
+            try:
+                await client.renew_subscription(subscription["external_id"], expires_at)
+                values = {"expires_at": expires_at}
+            except ProviderError as e:
+                if e.status_code != 404:
+                    raise
+                # Graph already dropped it; start over
+                new_id, _ = await self._create(client, provider, subscription["client_state"], expires_at)
+                values = {"external_id": new_id, "expires_at": expires_at}
+                replaced = (new_id, None)
+        else:
+            # Google channels cannot be extended: open a new one, then stop the old
+            new_id, resource_id = await self._create(client, provider, subscription["client_state"], expires_at)
+            values = {"external_id": new_id, "resource_id": resource_id, "expires_at": expires_at}
+            replaced = (new_id, resource_id)
+
+        if not await asyncio.to_thread(_update_subscription, subscription["id"], subscription["external_id"], values):
+            # Another worker renewed or removed it meanwhile
+            if replaced:
+                await self._stop(client, provider, *replaced)
+            return False
+        if provider == "google":
+            await self._stop(client, provider, subscription["external_id"], subscription["resource_id"])
+        logger.info(f"🔄 Renewed {provider} subscription {values.get('external_id', subscription['external_id'])}")
+        return True
+
+    async def reconcile(self) -> int:
+        """Subscribe unsubscribed calendars and renew expiring subscriptions; returns changes made"""
+        changed = 0
+        renew_before = datetime.utcnow() + RENEWAL_MARGIN
+
+        for auth_id in await asyncio.to_thread(_due_auth_ids, renew_before):
+            try:
+                snapshot = await asyncio.to_thread(_snapshot, auth_id)
+                if snapshot is None:
+                    continue
+                subscription = snapshot["subscription"]
+                if subscription is None:
+                    changed += await self.subscribe(auth_id, snapshot)
+                elif subscription["expires_at"] <= renew_before:
+                    changed += await self.renew(snapshot)
+            except ProviderError as e:
+                logger.error(f"❌ Subscription upkeep failed for calendar auth {auth_id}: {e}")
+
+        return changed
+
+
+subscription_manager: Optional[SubscriptionManager] = SubscriptionManager() if WEBHOOK_BASE_URL else None
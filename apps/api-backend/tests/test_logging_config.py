@@ -0,0 +1,36 @@
+import io
+import logging
+
+import pytest
+
+import logging_config
+import metrics
+
+
+@pytest.fixture
+def small_queue(monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_QUEUE_SIZE", 5)
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    logging_config.stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_stop_with_full_queue_flushes_everything(small_queue):
+    dropped = metrics.counter("logging.queue_full")
+    dropped_before = dropped.value
+    stream = io.StringIO()
+    handler = logging_config.configure_logging(level="info", fmt="text", sample_rates={}, stream=stream)
+    logger = logging.getLogger("test.logging")
+
+    # The listener sleeps for its flush interval after the first record, so the queue fills up
+    for i in range(20):
+        logger.info("record %d", i)
+    assert handler.queue.full()
+
+    logging_config.stop_logging()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 20 - (dropped.value - dropped_before)
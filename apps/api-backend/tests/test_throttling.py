@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import throttling
+from providers import ProviderClient, ProviderError
+
+HOST = "provider.test"
+
+
+class FakeProviderClient(ProviderClient):
+    provider = "test"
+    base_url = f"https://{HOST}"
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    throttling._breakers.pop(HOST, None)
+    throttling._buckets.pop(("test", "default"), None)
+    yield
+    throttling._breakers.pop(HOST, None)
+    throttling._buckets.pop(("test", "default"), None)
+
+
+def half_open_breaker():
+    breaker = throttling.breaker_for(HOST)
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_seconds
+    assert breaker.state == "half-open"
+    return breaker
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_trial_is_released():
+    started = asyncio.Event()
+
+    async def hang(request):
+        started.set()
+        await asyncio.sleep(3600)
+
+    breaker = half_open_breaker()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(hang)) as http:
+        task = asyncio.create_task(FakeProviderClient("token", http=http)._request("GET", "/events"))
+        await started.wait()
+        assert breaker.trial_in_flight
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert not breaker.trial_in_flight
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_half_open_trial_success_closes_breaker():
+    breaker = half_open_breaker()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+    async with httpx.AsyncClient(transport=transport) as http:
+        await FakeProviderClient("token", http=http)._request("GET", "/events")
+
+    assert breaker.state == "closed"
+    assert not breaker.trial_in_flight
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_pauses_bucket_before_giving_up():
+    transport = httpx.MockTransport(lambda request: httpx.Response(429, headers={"Retry-After": "120"}))
+    async with httpx.AsyncClient(transport=transport) as http:
+        client = FakeProviderClient("token", http=http)
+        with pytest.raises(ProviderError):
+            await client._request("GET", "/events")
+
+    assert client.bucket.blocked_until - time.monotonic() > 100
@@ -0,0 +1,170 @@
+"""
+Outbound request throttling
+Client-side token buckets per provider and tenant, jittered exponential
+backoff, Retry-After parsing and per-host circuit breakers for the provider
+clients. State is per process; with several workers each one gets its own
+buckets, so the configured rates are per worker.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Sustained requests per second and burst size, per provider and tenant
+PROVIDER_RATE_LIMITS = {
+    "microsoft": (float(os.getenv("MICROSOFT_REQUESTS_PER_SECOND", "15")), int(os.getenv("MICROSOFT_REQUEST_BURST", "30"))),
+    "google": (float(os.getenv("GOOGLE_REQUESTS_PER_SECOND", "10")), int(os.getenv("GOOGLE_REQUEST_BURST", "20"))),
+}
+DEFAULT_RATE_LIMIT = (10.0, 20)
+
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "3"))
+PROVIDER_BACKOFF_BASE_SECONDS = float(os.getenv("PROVIDER_BACKOFF_BASE_SECONDS", "0.5"))
+PROVIDER_BACKOFF_MAX_SECONDS = float(os.getenv("PROVIDER_BACKOFF_MAX_SECONDS", "30"))
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry (0-based)"""
+    ceiling = min(PROVIDER_BACKOFF_MAX_SECONDS, PROVIDER_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Async token bucket; pause() blocks everyone after the server pushes back"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            wait = self.blocked_until - now
+            if wait <= 0:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold all requests for this bucket (e.g. after a 429 with Retry-After)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: opens after CIRCUIT_FAILURE_THRESHOLD consecutive
+    failures, fails fast for CIRCUIT_RESET_SECONDS, then lets one trial
+    request through (half-open) to decide whether to close again.
+    """
+
+    __slots__ = ("host", "failure_threshold", "reset_seconds", "failures", "opened_at", "trial_in_flight")
+
+    def __init__(self, host: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        metrics.counter(f"circuit.{self.host}.rejected").inc()
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"✅ Circuit for {self.host} closed")
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def abandon_trial(self):
+        """The half-open trial ended without a verdict (cancelled, or failed locally); let the next call try"""
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        half_open = self.trial_in_flight
+        self.trial_in_flight = False
+        if half_open or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            metrics.counter(f"circuit.{self.host}.opened").inc()
+            logger.warning(f"⚡ Circuit for {self.host} opened after {self.failures} failure(s)")
+
+
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def bucket_for(provider: str, tenant: str) -> TokenBucket:
+    """Shared token bucket for a provider and tenant"""
+    key = (provider, tenant)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        rate, capacity = PROVIDER_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMIT)
+        bucket = _buckets[key] = TokenBucket(rate, capacity)
+    return bucket
+
+
+def breaker_for(host: str) -> CircuitBreaker:
+    """Shared circuit breaker for an outbound host"""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State and consecutive failures of every outbound host's breaker"""
+    return {host: {"state": breaker.state, "failures": breaker.failures} for host, breaker in list(_breakers.items())}
@@ -0,0 +1,142 @@
+"""
+Time-range queries
+Meeting slots are served from the indexed meeting_slots table rather than by
+decoding every meeting's proposed_times/selected_time JSON. User timelines
+come from one query over meeting_participants and meetings.scheduled_at, and
+proposed times are checked against attendees' commitments with an in-memory
+interval tree.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from availability import meeting_attendees
+from intervals import IntervalTree, to_minutes
+from models import Meeting
+from packages.database import find_slots, get_read_db, meeting_end, user_timeline
+from packages.database.slots import slots_from_json
+
+router = APIRouter(tags=["slots"])
+
+# Widest range a single query may cover
+MAX_SLOT_RANGE = timedelta(days=92)
+
+KIND_PATTERN = "^(all|proposed|selected)$"
+
+
+def _kinds(kind: str) -> List[str]:
+    return ["proposed", "selected"] if kind == "all" else [kind]
+
+
+def _check_range(start: datetime, end: datetime):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_SLOT_RANGE:
+        raise HTTPException(status_code=400, detail=f"Range may span at most {MAX_SLOT_RANGE.days} days")
+
+
+@router.get("/api/meetings/slots")
+async def get_meeting_slots(
+    start: datetime,
+    end: datetime,
+    kind: str = Query("all", pattern=KIND_PATTERN),
+    status: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db=Depends(get_read_db),
+):
+    """Proposed/selected slots of any meeting overlapping [start, end), earliest first"""
+    _check_range(start, end)
+    return find_slots(db, start, end, kinds=_kinds(kind), statuses=status, limit=limit)
+
+
+@router.get("/api/users/{user_id}/slots")
+async def get_user_slots(
+    user_id: str,
+    start: datetime,
+    end: datetime,
+    kind: str = Query("all", pattern=KIND_PATTERN),
+    limit: int = Query(100, ge=1, le=500),
+    db=Depends(get_read_db),
+):
+    """Slots overlapping [start, end) for meetings the user organizes or attends"""
+    _check_range(start, end)
+    return find_slots(db, start, end, kinds=_kinds(kind), user_id=user_id, limit=limit)
+
+
+def _user_summary(user) -> Optional[Dict[str, Any]]:
+    return {"id": user.id, "email": user.email, "name": user.name} if user else None
+
+
+def timeline_item(entry: Dict[str, Any]) -> Dict[str, Any]:
+    meeting = entry["meeting"]
+    return {
+        "id": meeting.id,
+        "title": meeting.title,
+        "status": meeting.status,
+        "meeting_type": meeting.meeting_type,
+        "start": meeting.scheduled_at.isoformat() + "Z",
+        "end": meeting_end(meeting).isoformat() + "Z",
+        "role": entry["role"],
+        "response": entry["response"],
+        "organizer": _user_summary(meeting.organizer),
+        "participants": [_user_summary(user) for user in meeting.participants],
+    }
+
+
+def commitment_tree(timeline: List[Dict[str, Any]], exclude_meeting_id: Optional[str] = None) -> IntervalTree:
+    """Interval tree of a user's scheduled meetings, payload = the meeting"""
+    return IntervalTree(
+        (to_minutes(entry["meeting"].scheduled_at), to_minutes(meeting_end(entry["meeting"]), round_up=True), entry["meeting"])
+        for entry in timeline
+        if entry["meeting"].id != exclude_meeting_id
+    )
+
+
+@router.get("/api/users/{user_id}/timeline")
+async def get_user_timeline(user_id: str, start: datetime, end: datetime, db=Depends(get_read_db)):
+    """Scheduled meetings the user organizes or attends overlapping [start, end), earliest first"""
+    _check_range(start, end)
+    return {
+        "user_id": user_id,
+        "meetings": [timeline_item(entry) for entry in user_timeline(db, user_id, start, end)],
+    }
+
+
+@router.get("/api/meetings/{meeting_id}/conflicts")
+async def get_meeting_conflicts(meeting_id: str, db=Depends(get_read_db)):
+    """Each proposed time of the meeting with the attendees' live meetings it collides with"""
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    proposed = slots_from_json(meeting.id, meeting.proposed_times, None)
+    if not proposed:
+        return {"meeting_id": meeting.id, "slots": []}
+
+    span_start = min(slot.start_time for slot in proposed)
+    span_end = max(slot.end_time for slot in proposed)
+    attendees = meeting_attendees(meeting)
+    trees = [
+        (user, commitment_tree(user_timeline(db, user.id, span_start, span_end, live_only=True), exclude_meeting_id=meeting.id))
+        for user in attendees
+    ]
+
+    slots = []
+    for slot in proposed:
+        start, end = to_minutes(slot.start_time), to_minutes(slot.end_time, round_up=True)
+        conflicts = [
+            {
+                "user_id": user.id,
+                "email": user.email,
+                "meeting_id": other.id,
+                "title": other.title,
+                "start": other.scheduled_at.isoformat() + "Z",
+                "end": meeting_end(other).isoformat() + "Z",
+            }
+            for user, tree in trees
+            for other in tree.overlapping(start, end)
+        ]
+        slots.append({**slot.to_dict(), "conflicts": conflicts})
+    return {"meeting_id": meeting.id, "slots": slots}
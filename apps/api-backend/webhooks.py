@@ -0,0 +1,93 @@
+"""
+Provider webhook endpoints
+Receive Microsoft Graph change notifications and Google Calendar watch-channel
+pings. Handlers never call the provider: they check the notification's
+client state against its subscription (one indexed read), record a
+calendar.sync job (one insert, deduplicated per subscription) and
+acknowledge at once.
+"""
+
+import logging
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Request, Header, Response, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from models import CalendarSubscription
+from packages.database import get_db, enqueue_job
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+
+def is_authentic(db: Session, provider: str, external_id: str, client_state: Optional[str]) -> bool:
+    """Whether the notification names a known subscription and echoes its client state"""
+    expected = db.query(CalendarSubscription.client_state).filter(
+        CalendarSubscription.provider == provider,
+        CalendarSubscription.external_id == external_id
+    ).scalar()
+    return bool(expected and client_state) and secrets.compare_digest(client_state, expected)
+
+
+def enqueue_sync(db: Session, provider: str, external_id: str, client_state: Optional[str]) -> bool:
+    """
+    Queue a re-sync of an authentic notification; bursts of notifications
+    share one queued job. Returns False (nothing queued) for forged or stale
+    notifications.
+    """
+    if not is_authentic(db, provider, external_id, client_state):
+        logger.warning(f"⚠️  Rejected {provider} notification for {external_id}: unknown subscription or bad client state")
+        return False
+    enqueue_job(
+        db,
+        "calendar.sync",
+        payload={"provider": provider, "external_id": external_id, "client_state": client_state},
+        priority=10,
+        dedupe_key=f"sync:{provider}:{external_id}",
+    )
+    return True
+
+
+@router.post("/microsoft")
+async def microsoft_notifications(request: Request, validationToken: Optional[str] = None, db=Depends(get_db)):
+    """Microsoft Graph change notifications (and subscription validation handshake)"""
+    if validationToken is not None:
+        # Graph validates the endpoint by expecting the token echoed back as text/plain
+        return PlainTextResponse(validationToken)
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        return Response(status_code=400)
+
+    notifications = [n for n in payload.get("value", []) if n.get("subscriptionId")]
+    queued = sum(
+        enqueue_sync(db, "microsoft", notification["subscriptionId"], notification.get("clientState"))
+        for notification in notifications
+    )
+    db.commit()
+
+    logger.info("📨 %d Microsoft notification(s) queued for sync", queued)
+    return Response(status_code=202)
+
+
+@router.post("/google")
+async def google_notifications(
+    x_goog_channel_id: str = Header(...),
+    x_goog_resource_state: str = Header(...),
+    x_goog_channel_token: Optional[str] = Header(None),
+    db=Depends(get_db),
+):
+    """Google Calendar watch-channel notifications"""
+    if x_goog_resource_state == "sync":
+        # Initial handshake sent when the channel is created; nothing changed yet
+        return Response(status_code=200)
+
+    if enqueue_sync(db, "google", x_goog_channel_id, x_goog_channel_token):
+        db.commit()
+        logger.info("📨 Google notification for channel %s queued for sync", x_goog_channel_id)
+    # Acknowledged either way: an error would only make Google retry
+    return Response(status_code=200)
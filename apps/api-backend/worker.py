@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+SmartMeet background job worker
+Registers the API's job handlers on a JobWorker. The worker runs inside the
+API process (RUN_JOB_WORKER=true, the default for the development server) or
+standalone, as in production where `run.py --production` defaults
+RUN_JOB_WORKER to false:
+
+    python worker.py
+
+Embedded handlers share the API's event loop, so their synchronous database
+work runs in a thread (asyncio.to_thread) and only provider calls are
+awaited on the loop.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Add project root to Python path so the shared packages are importable
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from models import AvailabilityCache, CalendarAuth  # noqa: E402
+from packages.database import (  # noqa: E402
+    JobWorker, enqueue_job, get_db_session, purge_expired_idempotency_keys, purge_finished_jobs
+)
+from providers import refresh_access_token, close_http_client  # noqa: E402
+from calendar_sync import sync_subscription  # noqa: E402
+from subscriptions import subscription_manager, RENEWAL_INTERVAL_SECONDS  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+RUN_JOB_WORKER = os.getenv("RUN_JOB_WORKER", "true").lower() == "true"
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "20"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+# Refresh access tokens this long before they expire
+TOKEN_REFRESH_MARGIN = timedelta(minutes=10)
+# Succeeded jobs are kept this long for inspection
+FINISHED_JOB_RETENTION = timedelta(days=7)
+
+worker = JobWorker(batch_size=JOB_BATCH_SIZE, poll_interval=JOB_POLL_INTERVAL)
+
+
+@worker.register("calendar.sync", concurrency=8)
+async def handle_calendar_sync(payload):
+    """Process a provider change notification"""
+    await sync_subscription(payload["provider"], payload["external_id"], payload.get("client_state"))
+
+
+def _refresh_credentials(auth_id: str) -> Optional[Tuple[str, str]]:
+    with get_db_session() as db:
+        auth = db.get(CalendarAuth, auth_id)
+        if not auth or not auth.refresh_token or not auth.is_active:
+            return None
+        return auth.provider, auth.refresh_token
+
+
+def _store_tokens(auth_id: str, tokens: Dict[str, Any]) -> bool:
+    with get_db_session() as db:
+        auth = db.get(CalendarAuth, auth_id)
+        if auth is None:
+            return False
+        auth.access_token = tokens["access_token"]
+        auth.refresh_token = tokens.get("refresh_token", auth.refresh_token)
+        auth.token_expires_at = datetime.utcnow() + timedelta(seconds=tokens.get("expires_in", 3600))
+        return True
+
+
+@worker.register("auth.refresh_token", concurrency=4)
+async def handle_refresh_token(payload):
+    """Refresh one calendar's OAuth access token"""
+    auth_id = payload["calendar_auth_id"]
+    credentials = await asyncio.to_thread(_refresh_credentials, auth_id)
+    if credentials is None:
+        return
+    provider, refresh_token = credentials
+
+    tokens = await refresh_access_token(provider, refresh_token)
+
+    if not await asyncio.to_thread(_store_tokens, auth_id, tokens):
+        logger.info(f"🔑 Calendar auth {auth_id} was removed during its token refresh")
+        return
+    logger.info(f"🔑 Refreshed {provider} access token for calendar auth {auth_id}")
+
+
+def _queue_expiring_refreshes() -> int:
+    with get_db_session() as db:
+        expiring = db.query(CalendarAuth.id).filter(
+            CalendarAuth.is_active == True,
+            CalendarAuth.refresh_token.isnot(None),
+            CalendarAuth.token_expires_at < datetime.utcnow() + TOKEN_REFRESH_MARGIN
+        ).all()
+        for (auth_id,) in expiring:
+            enqueue_job(db, "auth.refresh_token", {"calendar_auth_id": auth_id}, dedupe_key=f"refresh:{auth_id}")
+    return len(expiring)
+
+
+@worker.register("auth.refresh_expiring", concurrency=1)
+async def handle_refresh_expiring(payload):
+    """Queue token refreshes for calendars whose tokens expire soon"""
+    queued = await asyncio.to_thread(_queue_expiring_refreshes)
+    if queued:
+        logger.info(f"🔑 Queued {queued} token refresh job(s)")
+
+
+def _purge_expired() -> Tuple[int, int, int]:
+    with get_db_session() as db:
+        removed = db.query(AvailabilityCache).filter(
+            AvailabilityCache.expires_at < datetime.utcnow()
+        ).delete(synchronize_session=False)
+        purged = purge_finished_jobs(db, FINISHED_JOB_RETENTION)
+        keys = purge_expired_idempotency_keys(db)
+    return removed, purged, keys
+
+
+@worker.register("cache.purge_expired", concurrency=1)
+async def handle_cache_purge(payload):
+    """Delete expired availability cache rows, old finished jobs and expired idempotency keys"""
+    removed, purged, keys = await asyncio.to_thread(_purge_expired)
+    logger.info(f"🧹 Purged {removed} expired cache entries, {purged} finished jobs and {keys} idempotency keys")
+
+
+worker.every("auth.refresh_expiring", 300)
+worker.every("cache.purge_expired", 3600)
+
+if subscription_manager:
+    @worker.register("calendar.renew_subscriptions", concurrency=1)
+    async def handle_renew_subscriptions(payload):
+        """Create missing and renew expiring push subscriptions"""
+        changed = await subscription_manager.reconcile()
+        if changed:
+            logger.info(f"📬 Subscription upkeep made {changed} change(s)")
+
+    worker.every("calendar.renew_subscriptions", RENEWAL_INTERVAL_SECONDS)
+
+
+async def main():
+    """Standalone worker process"""
+    try:
+        await worker.run()
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    from logging_config import configure_logging
+    configure_logging()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n👋 Worker stopped")
@@ -14,6 +14,9 @@ interface MeetingData {
   emails: string[];
   proposed_times: ProposedTime[];
   created_at: string;
+  // Streamed results: how many attendees' calendars the ranking reflects
+  known?: number;
+  total?: number;
 }
 
 export default function AvailabilityPage() {
@@ -23,14 +26,49 @@ export default function AvailabilityPage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [selectedTime, setSelectedTime] = useState<number | null>(null);
+  const [refining, setRefining] = useState(false);
 
   const API_BASE_URL =
     process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
   useEffect(() => {
-    if (meetingId) {
+    if (!meetingId) {
+      return;
+    }
+    if (typeof EventSource === "undefined") {
       fetchMeetingData();
+      return;
     }
+
+    // Render provisional slots as soon as the first calendars arrive
+    const source = new EventSource(
+      `${API_BASE_URL}/availability/${meetingId}/stream`
+    );
+    let received = false;
+
+    const onUpdate = (event: MessageEvent) => {
+      received = true;
+      setMeetingData(JSON.parse(event.data));
+      setLoading(false);
+      setRefining(true);
+    };
+    source.addEventListener("provisional", onUpdate);
+    source.addEventListener("refined", onUpdate);
+    source.addEventListener("final", (event) => {
+      onUpdate(event as MessageEvent);
+      setRefining(false);
+      source.close();
+    });
+    source.onerror = () => {
+      source.close();
+      setRefining(false);
+      // Stream unavailable (or meeting missing): fall back to the plain request
+      if (!received) {
+        fetchMeetingData();
+      }
+    };
+
+    return () => source.close();
   }, [meetingId]);
 
   const fetchMeetingData = async () => {
@@ -165,6 +203,16 @@ export default function AvailabilityPage() {
               <h2 className="text-lg font-semibold text-gray-900 mb-4">
                 Proposed Times
               </h2>
+              {refining && (
+                <p className="flex items-center gap-2 text-sm text-gray-500 mb-4">
+                  <span className="animate-spin rounded-full h-4 w-4 border-b-2 border-blue-600"></span>
+                  Checking calendars
+                  {meetingData.total
+                    ? ` (${meetingData.known ?? 0} of ${meetingData.total})`
+                    : ""}
+                  ...
+                </p>
+              )}
               <div className="space-y-4">
                 {meetingData.proposed_times.map((timeSlot, index) => {
                   const startTime = formatDateTime(timeSlot.start);
@@ -8,12 +8,19 @@ from .models import (
     User,
     CalendarAuth, 
     Meeting,
+    MeetingSlot,
     AvailabilityCache,
+    CalendarSubscription,
+    Job,
+    IdempotencyKey,
     meeting_participants,
+    meetings_archive,
+    meeting_participants_archive,
     get_user_by_email,
     create_user,
     get_user_calendar_auth,
     create_calendar_auth,
+    invalidate_user_availability,
     create_meeting
 )
 
@@ -21,38 +28,147 @@ from .connection import (
     engine,
     SessionLocal,
     get_db,
+    get_read_db,
     get_db_session,
+    replica_router,
     create_tables,
     drop_tables,
     reset_database,
     check_database_connection,
+    database_pool_stats,
     init_database
 )
 
+from .jobs import (
+    JobWorker,
+    enqueue_job,
+    claim_jobs,
+    complete_jobs,
+    fail_job,
+    requeue_stale_jobs,
+    queue_depth,
+    purge_finished_jobs
+)
+
+from .search import (
+    search_meetings,
+    search_users
+)
+
+from .slots import (
+    backfill_meeting_slots,
+    find_slots
+)
+
+from .timeline import (
+    user_timeline,
+    meeting_end
+)
+
+from .archive import (
+    archive_meetings,
+    count_archivable
+)
+
+from .idempotency import (
+    claim_idempotency_key,
+    complete_idempotency_key,
+    release_idempotency_key,
+    purge_expired_idempotency_keys,
+    idempotency_hash
+)
+
+from .export import (
+    export_snapshot,
+    export_dataset,
+    read_export,
+    load_watermarks,
+    DATASETS as EXPORT_DATASETS
+)
+
+from .synthetic import (
+    seed_synthetic,
+    synthetic_busy
+)
+
 __all__ = [
     # Models
     "Base",
     "User", 
     "CalendarAuth",
     "Meeting",
+    "MeetingSlot",
     "AvailabilityCache", 
+    "CalendarSubscription",
+    "Job",
+    "IdempotencyKey",
     "meeting_participants",
+    "meetings_archive",
+    "meeting_participants_archive",
     
     # Model utilities
     "get_user_by_email",
     "create_user",
     "get_user_calendar_auth", 
     "create_calendar_auth",
+    "invalidate_user_availability",
     "create_meeting",
     
     # Database connection
     "engine",
     "SessionLocal",
     "get_db",
+    "get_read_db",
     "get_db_session",
+    "replica_router",
     "create_tables",
     "drop_tables", 
     "reset_database",
     "check_database_connection",
-    "init_database"
+    "database_pool_stats",
+    "init_database",
+    
+    # Background jobs
+    "JobWorker",
+    "enqueue_job",
+    "claim_jobs",
+    "complete_jobs",
+    "fail_job",
+    "requeue_stale_jobs",
+    "queue_depth",
+    "purge_finished_jobs",
+    
+    # Search
+    "search_meetings",
+    "search_users",
+    
+    # Meeting slots
+    "backfill_meeting_slots",
+    "find_slots",
+    
+    # User timelines
+    "user_timeline",
+    "meeting_end",
+    
+    # Archival
+    "archive_meetings",
+    "count_archivable",
+    
+    # Idempotency keys
+    "claim_idempotency_key",
+    "complete_idempotency_key",
+    "release_idempotency_key",
+    "purge_expired_idempotency_keys",
+    "idempotency_hash",
+    
+    # Columnar exports
+    "export_snapshot",
+    "export_dataset",
+    "read_export",
+    "load_watermarks",
+    "EXPORT_DATASETS",
+    
+    # Synthetic data
+    "seed_synthetic",
+    "synthetic_busy"
 ] 
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Meeting archival
+Completed and cancelled meetings untouched for MEETING_ARCHIVE_AFTER_DAYS
+are moved, with their participant rows, from the live tables into
+meetings_archive / meeting_participants_archive. Each batch is one short
+transaction (copy, then delete) so the live tables and their indexes stay
+small without long locks.
+"""
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    Meeting, MeetingSlot, meeting_participants, meetings_archive, meeting_participants_archive
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = ("completed", "cancelled")
+MEETING_ARCHIVE_AFTER_DAYS = int(os.getenv("MEETING_ARCHIVE_AFTER_DAYS", "90"))
+MEETING_ARCHIVE_BATCH_SIZE = int(os.getenv("MEETING_ARCHIVE_BATCH_SIZE", "500"))
+
+def archive_cutoff(older_than: Optional[timedelta] = None) -> datetime:
+    return datetime.utcnow() - (older_than or timedelta(days=MEETING_ARCHIVE_AFTER_DAYS))
+
+def _candidates(cutoff: datetime):
+    return select(Meeting.id).where(Meeting.status.in_(ARCHIVABLE_STATUSES), Meeting.updated_at < cutoff)
+
+def count_archivable(db: Session, cutoff: datetime) -> Dict[str, int]:
+    """What an archive run would move, without moving anything"""
+    ids = _candidates(cutoff).subquery()
+    meetings = db.scalar(select(func.count()).select_from(ids))
+    participants = db.scalar(
+        select(func.count()).select_from(meeting_participants)
+        .where(meeting_participants.c.meeting_id.in_(select(ids.c.id)))
+    )
+    return {"meetings": meetings or 0, "participants": participants or 0}
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int = MEETING_ARCHIVE_BATCH_SIZE) -> Dict[str, int]:
+    """Move up to batch_size archivable meetings in one transaction"""
+    query = _candidates(cutoff).order_by(Meeting.updated_at, Meeting.id).limit(batch_size)
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent archivers (or a long user transaction) never block each other
+        query = query.with_for_update(skip_locked=True)
+    ids = list(db.scalars(query))
+    if not ids:
+        return {"meetings": 0, "participants": 0}
+
+    archived_at = datetime.utcnow()
+    try:
+        live_columns = [column for column in Meeting.__table__.columns]
+        db.execute(insert(meetings_archive).from_select(
+            [column.name for column in live_columns] + ["archived_at"],
+            select(*live_columns, literal(archived_at)).where(Meeting.id.in_(ids))
+        ))
+        participant_columns = [column for column in meeting_participants.columns]
+        participants = db.execute(insert(meeting_participants_archive).from_select(
+            [column.name for column in participant_columns] + ["archived_at"],
+            select(*participant_columns, literal(archived_at)).where(meeting_participants.c.meeting_id.in_(ids))
+        )).rowcount
+
+        # Slots are derived from the meeting's JSON, which the archive row keeps
+        db.execute(delete(MeetingSlot).where(MeetingSlot.meeting_id.in_(ids)))
+        db.execute(delete(meeting_participants).where(meeting_participants.c.meeting_id.in_(ids)))
+        db.execute(delete(Meeting).where(Meeting.id.in_(ids)), execution_options={"synchronize_session": False})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"meetings": len(ids), "participants": participants}
+
+def archive_meetings(
+    db: Session,
+    older_than: Optional[timedelta] = None,
+    batch_size: int = MEETING_ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    pause: float = 0.0,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Archive terminal meetings older than the cutoff in bounded batches until
+    none are left (or max_batches). `pause` seconds between batches leaves
+    room for replication and vacuum on busy primaries. Returns totals with
+    elapsed seconds; a dry run only counts.
+    """
+    cutoff = archive_cutoff(older_than)
+    started = time.perf_counter()
+    if dry_run:
+        totals = count_archivable(db, cutoff)
+        return {**totals, "batches": 0, "seconds": time.perf_counter() - started, "dry_run": True}
+
+    totals = {"meetings": 0, "participants": 0, "batches": 0}
+    while max_batches is None or totals["batches"] < max_batches:
+        batch_started = time.perf_counter()
+        batch = archive_batch(db, cutoff, batch_size)
+        if not batch["meetings"]:
+            break
+        elapsed = time.perf_counter() - batch_started
+        totals["meetings"] += batch["meetings"]
+        totals["participants"] += batch["participants"]
+        totals["batches"] += 1
+        logger.info(
+            f"📦 Batch {totals['batches']}: {batch['meetings']} meetings, {batch['participants']} participants "
+            f"in {elapsed * 1000:.0f}ms ({batch['meetings'] / max(elapsed, 1e-9):.0f} meetings/s)"
+        )
+        if batch["meetings"] < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return {**totals, "seconds": time.perf_counter() - started, "dry_run": False}
@@ -0,0 +1,335 @@
+"""
+Columnar exports for analytics
+Streams meetings, participant links and cached availability (one row per
+busy interval) into Parquet or Arrow IPC files, so analytics reads files
+instead of running SELECT * against the API database. Rows are read in
+keyset-paginated chunks ordered by their watermark column (updated_at, or
+created_at for availability rows, which are never updated) and each chunk is
+written as one row group / record batch, so memory stays bounded by the
+chunk size. The last exported (watermark, key) per dataset is kept in
+_watermarks.json next to the files; the next run only exports rows changed
+since, as a new part file. Rows younger than EXPORT_SAFETY_LAG_SECONDS are
+left for the next run so transactions still committing are not skipped.
+Readers must take the latest part's version of a row (by id and watermark).
+
+Deletions: meetings and participant links moved out by archival are exported
+from meetings_archive / meeting_participants_archive (by archived_at) and act
+as tombstones for the live datasets. Rows deleted any other way never show up
+in an incremental part, so run a periodic --full export: read_export ignores
+the parts written before the latest full one. Rows whose watermark is NULL
+cannot be placed in a watermark range; they are exported by full (and first)
+runs and by the first incremental run after they are next updated.
+Requires pyarrow.
+"""
+import base64
+import json
+import logging
+import os
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, and_, select, tuple_
+from sqlalchemy.engine import Engine
+
+from .models import (
+    AvailabilityCache, Meeting, meeting_participants, meetings_archive, meeting_participants_archive
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the export needs it
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "10000"))
+EXPORT_SAFETY_LAG_SECONDS = int(os.getenv("EXPORT_SAFETY_LAG_SECONDS", "60"))
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+WATERMARK_FILE = "_watermarks.json"
+
+# Mirrors intervals.CACHE_FORMAT in the API
+CACHE_FORMAT = "intervals-v1"
+EPOCH = datetime(1970, 1, 1)
+MINUTE_US = 60_000_000
+
+# Dataset name -> (table, watermark column, tie-breaking key columns)
+DATASETS = {
+    "meetings": (Meeting.__table__, "updated_at", ("id",)),
+    "meeting_participants": (meeting_participants, "updated_at", ("meeting_id", "user_id")),
+    "availability": (AvailabilityCache.__table__, "created_at", ("id",)),
+    # Tombstones: rows archival removed from the live datasets above
+    "meetings_archive": (meetings_archive, "archived_at", ("id",)),
+    "meeting_participants_archive": (meeting_participants_archive, "archived_at", ("meeting_id", "user_id")),
+}
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Columnar export needs pyarrow: pip install -r packages/database/requirements.txt")
+
+def _arrow_type(column) -> "pa.DataType":
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    # Strings, text and JSON (serialized)
+    return pa.string()
+
+def _table_schema(table) -> "pa.Schema":
+    return pa.schema([pa.field(column.name, _arrow_type(column)) for column in table.columns])
+
+def dataset_schema(name: str) -> "pa.Schema":
+    """Arrow schema of an exported dataset"""
+    _require_pyarrow()
+    if name == "availability":
+        timestamp = pa.timestamp("us")
+        return pa.schema([
+            ("cache_id", pa.string()), ("user_id", pa.string()), ("cache_key", pa.string()),
+            ("busy_start", timestamp), ("busy_end", timestamp), ("computed_at", timestamp), ("expires_at", timestamp),
+        ])
+    return _table_schema(DATASETS[name][0])
+
+def _rows_to_batch(table, rows: Sequence[Any], schema: "pa.Schema") -> "pa.RecordBatch":
+    json_columns = {column.name for column in table.columns if isinstance(column.type, JSON)}
+    columns = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if field.name in json_columns:
+            values = [None if value is None else json.dumps(value) for value in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+def _int64_array(values: array) -> "pa.Array":
+    """Zero-copy view of an array('q')"""
+    return pa.Array.from_buffers(pa.int64(), len(values), [None, pa.py_buffer(values)])
+
+def _busy_minutes(value: Any):
+    """(starts, ends) epoch-minute arrays of an availability_data value"""
+    if isinstance(value, dict) and value.get("format") == CACHE_FORMAT:
+        values = array("q")
+        values.frombytes(base64.b64decode(value["data"]))
+        if sys.byteorder == "big":
+            values.byteswap()
+        half = len(values) // 2
+        return values[:half], values[half:]
+    # Older list of {"start": iso, "end": iso}
+    starts, ends = array("q"), array("q")
+    for interval in value or []:
+        if interval.get("start") and interval.get("end"):
+            start, end = (datetime.fromisoformat(interval[edge]) for edge in ("start", "end"))
+            if start.tzinfo is not None:
+                start, end = (moment.astimezone(timezone.utc).replace(tzinfo=None) for moment in (start, end))
+            starts.append(int((start - EPOCH).total_seconds() // 60))
+            ends.append(-int(-(end - EPOCH).total_seconds() // 60))
+    return starts, ends
+
+def _availability_batch(rows: Sequence[Any], schema: "pa.Schema") -> "pa.RecordBatch":
+    """One row per busy interval; rows are (id, user_id, cache_key, availability_data, expires_at, created_at)"""
+    positions, starts, ends = array("q"), array("q"), array("q")
+    for position, row in enumerate(rows):
+        row_starts, row_ends = _busy_minutes(row.availability_data)
+        starts.extend(row_starts)
+        ends.extend(row_ends)
+        positions.extend([position] * len(row_starts))
+    take = _int64_array(positions)
+
+    def repeated(values, type_):
+        return pc.take(pa.array(values, type=type_), take)
+
+    timestamp = pa.timestamp("us")
+    return pa.RecordBatch.from_arrays([
+        repeated([row.id for row in rows], pa.string()),
+        repeated([row.user_id for row in rows], pa.string()),
+        repeated([row.cache_key for row in rows], pa.string()),
+        pc.multiply(_int64_array(starts), MINUTE_US).view(timestamp),
+        pc.multiply(_int64_array(ends), MINUTE_US).view(timestamp),
+        repeated([row.created_at for row in rows], timestamp),
+        repeated([row.expires_at for row in rows], timestamp),
+    ], schema=schema)
+
+def _keyset_chunks(engine: Engine, table, condition, order: List[Any], position: Optional[List[Any]],
+                   chunk_size: int) -> Iterator[Sequence[Any]]:
+    while True:
+        query = select(table).where(condition).order_by(*order).limit(chunk_size)
+        if position is not None:
+            query = query.where(tuple_(*order) > tuple_(*position))
+        # One short read per chunk: no long-running transaction on the source
+        with engine.connect() as connection:
+            rows = connection.execute(query).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]._mapping
+        position = [last[column.name] for column in order]
+        if len(rows) < chunk_size:
+            return
+
+def _chunks(engine: Engine, name: str, since: Optional[Dict[str, Any]], until: datetime,
+            chunk_size: int) -> Iterator[Sequence[Any]]:
+    """
+    Rows changed in (since, until], in watermark order, chunk_size at a time.
+    Without `since` (full or first run), rows with a NULL watermark come
+    first, in key order.
+    """
+    table, watermark, keys = DATASETS[name]
+    stamp = table.c[watermark]
+    key_columns = [table.c[key] for key in keys]
+    if since is None:
+        yield from _keyset_chunks(engine, table, stamp.is_(None), key_columns, None, chunk_size)
+    position = None
+    if since:
+        position = [datetime.fromisoformat(since[watermark])] + [since[key] for key in keys]
+    yield from _keyset_chunks(
+        engine, table, and_(stamp.isnot(None), stamp <= until), [stamp] + key_columns, position, chunk_size
+    )
+
+class _PartWriter:
+    """Writes record batches to a part file atomically (tmp file, then rename)"""
+
+    def __init__(self, path: Path, schema: "pa.Schema", fmt: str):
+        self.path = path
+        self.tmp = path.with_name(path.name + ".tmp")
+        self.rows = 0
+        self._sink = None
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.tmp, schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(str(self.tmp), "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write(self, batch: "pa.RecordBatch"):
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self, keep: bool):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        if keep:
+            os.replace(self.tmp, self.path)
+        else:
+            self.tmp.unlink()
+
+def load_watermarks(output_dir) -> Dict[str, Dict[str, Any]]:
+    path = Path(output_dir) / WATERMARK_FILE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def _save_watermarks(output_dir: Path, watermarks: Dict[str, Dict[str, Any]]):
+    path = output_dir / WATERMARK_FILE
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(watermarks, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+def export_dataset(
+    engine: Engine,
+    name: str,
+    output_dir,
+    fmt: str = "parquet",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    full: bool = False,
+    safety_lag: timedelta = timedelta(seconds=EXPORT_SAFETY_LAG_SECONDS)
+) -> Dict[str, Any]:
+    """
+    Export one dataset's rows changed since its watermark (everything when
+    `full`) to a new part file under output_dir/<name>/, then advance the
+    watermark. Returns rows, chunks, the file written (None when an
+    incremental run found no changes) and elapsed seconds.
+    """
+    _require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(EXPORT_FORMATS)})")
+    started = time.perf_counter()
+    output_dir = Path(output_dir)
+    table, watermark, keys = DATASETS[name]
+    watermarks = load_watermarks(output_dir)
+    since = None if full else watermarks.get(name)
+    until = datetime.utcnow() - safety_lag
+
+    schema = dataset_schema(name)
+    (output_dir / name).mkdir(parents=True, exist_ok=True)
+    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    path = output_dir / name / f"{'full' if full else 'part'}-{run_id}{EXPORT_FORMATS[fmt]}"
+    writer = _PartWriter(path, schema, fmt)
+    chunks, last = 0, None
+    try:
+        for rows in _chunks(engine, name, since, until, chunk_size):
+            if name == "availability":
+                batch = _availability_batch(rows, schema)
+            else:
+                batch = _rows_to_batch(table, rows, schema)
+            writer.write(batch)
+            chunks += 1
+            if rows[-1]._mapping[watermark] is not None:
+                last = rows[-1]._mapping
+    except BaseException:
+        writer.close(keep=False)
+        raise
+    # A full export is kept even when empty: it marks where read_export starts
+    kept = chunks > 0 or full
+    writer.close(keep=kept)
+
+    if last is not None:
+        # Only after the file is in place, so a failed run is simply repeated
+        watermarks[name] = {watermark: last[watermark].isoformat(), **{key: last[key] for key in keys}}
+        _save_watermarks(output_dir, watermarks)
+    return {
+        "rows": writer.rows,
+        "chunks": chunks,
+        "file": str(path) if kept else None,
+        "seconds": time.perf_counter() - started,
+    }
+
+def export_snapshot(
+    engine: Engine,
+    output_dir=EXPORT_DIR,
+    datasets: Optional[List[str]] = None,
+    fmt: str = "parquet",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    full: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """Export each dataset (all by default); results by dataset name"""
+    results = {}
+    for name in datasets or list(DATASETS):
+        if name not in DATASETS:
+            raise ValueError(f"Unknown dataset {name!r} (expected one of {', '.join(DATASETS)})")
+        results[name] = export_dataset(engine, name, output_dir, fmt=fmt, chunk_size=chunk_size, full=full)
+        logger.info(
+            f"📤 Exported {results[name]['rows']} {name} rows in {results[name]['chunks']} chunks "
+            f"({results[name]['seconds']:.1f}s)"
+        )
+    return results
+
+def read_export(output_dir, name: str) -> "pa.Table":
+    """
+    The dataset's part files since its latest full export as one table,
+    memory-mapped: Arrow files are read zero-copy from the page cache, Parquet
+    files are decoded from the mapping without buffered reads. Later parts
+    hold newer versions of rows.
+    """
+    _require_pyarrow()
+    parts = sorted(
+        (part for part in (Path(output_dir) / name).glob("*") if part.suffix in EXPORT_FORMATS.values()),
+        key=lambda part: part.stem.split("-", 1)[1]  # run id, across full- and part- files
+    )
+    fulls = [index for index, part in enumerate(parts) if part.stem.startswith("full-")]
+    if fulls:
+        parts = parts[fulls[-1]:]
+    tables = []
+    for part in parts:
+        if part.suffix == ".arrow":
+            tables.append(pa.ipc.open_file(pa.memory_map(str(part), "r")).read_all())
+        elif part.suffix == ".parquet":
+            tables.append(pq.read_table(part, memory_map=True))
+    if not tables:
+        return dataset_schema(name).empty_table()
+    return pa.concat_tables(tables)
@@ -0,0 +1,97 @@
+"""
+Idempotency key store
+One row per (scope, key): claimed as in_progress by the first request,
+then completed with the response that duplicates replay until it expires.
+In-progress rows expire after IDEMPOTENCY_LOCK_SECONDS so a crashed worker
+cannot block a key forever. Rows are plain dicts outside this module.
+"""
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# Completed responses are replayed this long
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "300"))
+# An in-progress claim older than this is treated as abandoned
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+
+def idempotency_hash(*parts: Any) -> str:
+    """Stable sha256 over the parts (keys and request fingerprints)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def _as_dict(row: IdempotencyKey) -> Dict[str, Any]:
+    return {
+        "scope": row.scope,
+        "fingerprint": row.fingerprint,
+        "status": row.status,
+        "response_status": row.response_status,
+        "response_headers": row.response_headers or {},
+        "response_body": row.response_body,
+        "expires_at": row.expires_at,
+    }
+
+def claim_idempotency_key(db: Session, scope: str, key: str, fingerprint: str,
+                          lock_seconds: int = IDEMPOTENCY_LOCK_SECONDS) -> Optional[Dict[str, Any]]:
+    """
+    Claim `key` for this request. Returns None when the caller now owns it,
+    otherwise the live row of whoever does (in progress or completed).
+    """
+    now = datetime.utcnow()
+    existing = db.get(IdempotencyKey, key)
+    if existing is not None:
+        if existing.expires_at > now:
+            return _as_dict(existing)
+        db.delete(existing)
+        db.flush()
+    db.add(IdempotencyKey(
+        key=key, scope=scope, fingerprint=fingerprint, status="in_progress",
+        expires_at=now + timedelta(seconds=lock_seconds)
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker claimed it between our read and insert
+        db.rollback()
+        winner = db.get(IdempotencyKey, key)
+        return _as_dict(winner) if winner is not None else None
+    return None
+
+def complete_idempotency_key(db: Session, key: str, status_code: int, headers: Dict[str, str], body: Optional[str],
+                             ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS):
+    """Store the response duplicates will be given"""
+    row = db.get(IdempotencyKey, key)
+    if row is None:
+        return
+    row.status = "completed"
+    row.response_status = status_code
+    row.response_headers = headers
+    row.response_body = body
+    row.expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+    db.commit()
+
+def release_idempotency_key(db: Session, key: str):
+    """Drop an in-progress claim so the request can be retried"""
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key, IdempotencyKey.status == "in_progress"
+    ).delete(synchronize_session=False)
+    db.commit()
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    """Delete expired rows of either status"""
+    removed = db.query(IdempotencyKey).filter(
+        IdempotencyKey.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removed
@@ -0,0 +1,338 @@
+"""
+Database-backed background job queue for SmartMeet
+Jobs live in the jobs table; workers claim batches with
+SELECT ... FOR UPDATE SKIP LOCKED so any number of processes can share the
+queue without handing the same job out twice.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+from sqlalchemy import exists, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from .models import Job
+from .connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Retry backoff: base * 2^(attempt - 1), capped, with full jitter
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "3600"))
+# Running jobs whose lock is older than this are assumed orphaned by a dead worker
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "600"))
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    payload: Dict[str, Any] = None,
+    run_at: datetime = None,
+    priority: int = 0,
+    max_attempts: int = 5,
+    dedupe_key: str = None
+) -> Job:
+    """
+    Add a job to the queue (caller commits)
+    With a dedupe_key, an already queued job with the same key is returned
+    instead of adding a duplicate. The partial unique index on queued
+    dedupe keys makes this hold across processes: a concurrent insert of the
+    same key is skipped with ON CONFLICT DO NOTHING.
+    """
+    values = dict(
+        job_type=job_type,
+        payload=payload or {},
+        run_at=run_at or datetime.utcnow(),
+        priority=priority,
+        max_attempts=max_attempts,
+        dedupe_key=dedupe_key
+    )
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(db.get_bind().dialect.name)
+    if not dedupe_key or dialect is None:
+        job = Job(**values)
+        db.add(job)
+        # Sessions don't autoflush; flush so a later dedupe check in this session sees it
+        db.flush()
+        return job
+
+    job_id = str(uuid.uuid4())
+    inserted = db.execute(
+        dialect.insert(Job).values(id=job_id, **values).on_conflict_do_nothing(
+            index_elements=[Job.dedupe_key], index_where=Job.status == 'queued'
+        )
+    ).rowcount
+    if inserted:
+        return db.get(Job, job_id)
+    return db.query(Job).filter(Job.dedupe_key == dedupe_key, Job.status == 'queued').one()
+
+def _queued_duplicate(db: Session, job: Job):
+    """Id of another queued job with this job's dedupe_key, if any"""
+    if not job.dedupe_key:
+        return None
+    return db.query(Job.id).filter(
+        Job.dedupe_key == job.dedupe_key, Job.status == 'queued', Job.id != job.id
+    ).scalar()
+
+def _supersede(job: Job, duplicate_id: str):
+    """Finish a job whose retry an identical queued job already covers"""
+    job.status = 'failed'
+    job.finished_at = datetime.utcnow()
+    job.last_error = f"{job.last_error or ''}\nSuperseded by queued job {duplicate_id}".strip()[:2000]
+    logger.info(f"⏭️  Job {job.id} ({job.job_type}) not retried: job {duplicate_id} is already queued")
+
+def claim_jobs(db: Session, job_type: str, limit: int, worker_id: str) -> List[Job]:
+    """Claim up to limit due jobs of one type and mark them running"""
+    now = datetime.utcnow()
+    jobs = (
+        db.query(Job)
+        .filter(Job.status == 'queued', Job.job_type == job_type, Job.run_at <= now)
+        .order_by(Job.priority.desc(), Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in jobs:
+        job.status = 'running'
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.attempts += 1
+    db.commit()
+    return jobs
+
+def complete_jobs(db: Session, job_ids: List[str]):
+    """Mark a batch of jobs as succeeded in one statement"""
+    if not job_ids:
+        return
+    db.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids))
+        .values(status='succeeded', finished_at=datetime.utcnow(), locked_by=None, locked_at=None, last_error=None)
+    )
+    db.commit()
+
+def retry_delay(attempts: int) -> float:
+    """Jittered exponential backoff before the next attempt"""
+    ceiling = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return random.uniform(0, ceiling)
+
+def fail_job(db: Session, job_id: str, error: str):
+    """Schedule a retry with backoff, or mark the job failed after max_attempts"""
+    job = db.get(Job, job_id)
+    if not job:
+        return
+    job.last_error = error[:2000]
+    job.locked_by = None
+    job.locked_at = None
+    duplicate_id = _queued_duplicate(db, job)
+    if job.attempts >= job.max_attempts:
+        job.status = 'failed'
+        job.finished_at = datetime.utcnow()
+        logger.error(f"❌ Job {job.id} ({job.job_type}) failed permanently after {job.attempts} attempts: {error}")
+    elif duplicate_id:
+        _supersede(job, duplicate_id)
+    else:
+        job.status = 'queued'
+        job.run_at = datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))
+        logger.warning(f"🔁 Job {job.id} ({job.job_type}) attempt {job.attempts} failed, retrying at {job.run_at}: {error}")
+    try:
+        db.commit()
+    except IntegrityError:
+        # The same key was queued by another process since the check above
+        db.rollback()
+        job = db.get(Job, job_id)
+        job.last_error = error[:2000]
+        job.locked_by = None
+        job.locked_at = None
+        _supersede(job, _queued_duplicate(db, job))
+        db.commit()
+
+def requeue_stale_jobs(db: Session, timeout_seconds: int = JOB_LOCK_TIMEOUT_SECONDS) -> int:
+    """
+    Return running jobs held longer than timeout_seconds to the queue.
+    Stale jobs whose dedupe_key is already queued again are finished instead.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout_seconds)
+    queued = aliased(Job)
+    duplicate_queued = exists().where(
+        queued.dedupe_key == Job.dedupe_key, queued.status == 'queued', queued.id != Job.id
+    )
+    stale = (Job.status == 'running', Job.locked_at < cutoff)
+    for attempt in range(3):
+        try:
+            db.execute(
+                update(Job).where(*stale, duplicate_queued)
+                .values(status='failed', finished_at=datetime.utcnow(), locked_by=None, locked_at=None,
+                        last_error="Orphaned; superseded by a queued job with the same dedupe key"),
+                execution_options={"synchronize_session": False}
+            )
+            result = db.execute(
+                update(Job).where(*stale)
+                .values(status='queued', locked_by=None, locked_at=None, run_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False}
+            )
+            db.commit()
+            return result.rowcount
+        except IntegrityError:
+            # A duplicate was queued between the two statements; go again
+            db.rollback()
+            if attempt == 2:
+                raise
+
+def queue_depth(db: Session) -> Dict[str, int]:
+    """Number of queued jobs per job type"""
+    rows = db.query(Job.job_type, func.count(Job.id)).filter(Job.status == 'queued').group_by(Job.job_type).all()
+    return {job_type: count for job_type, count in rows}
+
+def purge_finished_jobs(db: Session, older_than: timedelta) -> int:
+    """Delete succeeded jobs that finished before the cutoff"""
+    cutoff = datetime.utcnow() - older_than
+    deleted = db.query(Job).filter(
+        Job.status == 'succeeded',
+        Job.finished_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+class JobWorker:
+    """
+    Asyncio worker pool for the jobs table
+    Each job type has its own concurrency limit; the worker claims at most as
+    many jobs as it has free slots (up to batch_size per query) and records
+    successes in batches. The worker's own database calls run in a thread;
+    handlers run on the event loop, so when the worker is embedded in the API
+    they must move their database work to a thread too.
+    """
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = 20, poll_interval: float = 1.0):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, JobHandler] = {}
+        self.limits: Dict[str, int] = {}
+        self.running: Dict[str, int] = {}
+        self.schedules: Dict[str, float] = {}
+        self._next_scheduled: Dict[str, float] = {}
+        # Jobs of crashed workers go stale after JOB_LOCK_TIMEOUT_SECONDS; look that often
+        self.requeue_interval = float(JOB_LOCK_TIMEOUT_SECONDS)
+        self._next_requeue = 0.0
+        self.processed = 0
+        self._completed: List[str] = []
+        self._tasks: set = set()
+        self._wake = asyncio.Event()
+
+    def register(self, job_type: str, concurrency: int = 4):
+        """Decorator registering an async handler(payload) for a job type"""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.handlers[job_type] = handler
+            self.limits[job_type] = concurrency
+            self.running[job_type] = 0
+            return handler
+        return decorator
+
+    def every(self, job_type: str, seconds: float):
+        """Enqueue job_type periodically (one queued instance across all workers)"""
+        self.schedules[job_type] = seconds
+        self._next_scheduled[job_type] = 0.0
+
+    def _enqueue_scheduled(self, due: List[str]):
+        db = self.session_factory()
+        try:
+            for job_type in due:
+                enqueue_job(db, job_type, dedupe_key=f"periodic:{job_type}")
+            db.commit()
+        finally:
+            db.close()
+
+    def _db_call(self, fn, *args):
+        """Run fn(db, *args) in a fresh session"""
+        db = self.session_factory()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+    def _claim_all(self) -> List[Dict[str, Any]]:
+        claimed = []
+        db = self.session_factory()
+        try:
+            for job_type in self.handlers:
+                free = self.limits[job_type] - self.running[job_type]
+                if free <= 0:
+                    continue
+                for job in claim_jobs(db, job_type, min(free, self.batch_size), self.worker_id):
+                    claimed.append({"id": job.id, "job_type": job.job_type, "payload": job.payload or {}})
+        finally:
+            db.close()
+        return claimed
+
+    async def _execute(self, job: Dict[str, Any]):
+        job_type = job["job_type"]
+        try:
+            await self.handlers[job_type](job["payload"])
+            self._completed.append(job["id"])
+        except Exception as e:
+            await asyncio.to_thread(self._db_call, fail_job, job["id"], f"{type(e).__name__}: {e}")
+        finally:
+            self.running[job_type] -= 1
+            self.processed += 1
+            self._wake.set()
+
+    async def _flush_completed(self):
+        if self._completed:
+            job_ids, self._completed = self._completed, []
+            await asyncio.to_thread(self._db_call, complete_jobs, job_ids)
+
+    async def run_once(self) -> int:
+        """Claim and start one round of jobs; returns the number started"""
+        await self._flush_completed()
+
+        now = asyncio.get_running_loop().time()
+        due = [job_type for job_type, at in self._next_scheduled.items() if at <= now]
+        if due:
+            await asyncio.to_thread(self._enqueue_scheduled, due)
+            for job_type in due:
+                self._next_scheduled[job_type] = now + self.schedules[job_type]
+
+        if now >= self._next_requeue:
+            self._next_requeue = now + self.requeue_interval
+            requeued = await asyncio.to_thread(self._db_call, requeue_stale_jobs)
+            if requeued:
+                logger.warning(f"🔁 Requeued {requeued} orphaned job(s)")
+
+        claimed = await asyncio.to_thread(self._claim_all)
+        for job in claimed:
+            self.running[job["job_type"]] += 1
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(claimed)
+
+    async def drain(self):
+        """Wait for in-flight jobs and record their results"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        await self._flush_completed()
+
+    async def run(self):
+        """Main loop until cancelled"""
+        logger.info(f"👷 Job worker {self.worker_id} started for: {', '.join(self.handlers)}")
+        try:
+            while True:
+                started = await self.run_once()
+                if not started:
+                    # Idle (or saturated): wait for a slot to free up or the next poll
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self.drain()
+            logger.info(f"👋 Job worker {self.worker_id} stopped after {self.processed} job(s)")
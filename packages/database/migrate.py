@@ -0,0 +1,54 @@
+"""
+Schema migrations for SmartMeet
+Tables come from the models (create_tables); Alembic revisions in
+migrations/versions apply changes create_all cannot, such as indexes on
+existing tables and Postgres-specific DDL.
+"""
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from .connection import engine, create_tables
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+def alembic_config() -> Config:
+    """Alembic configuration without an alembic.ini"""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+def run_migrations(revision: str = "head"):
+    """Create missing tables, then apply Alembic revisions up to `revision`"""
+    create_tables()
+    command.upgrade(alembic_config(), revision)
+
+def rollback_migration(revision: str = "-1"):
+    """Revert Alembic revisions down to `revision` (default: the last one)"""
+    command.downgrade(alembic_config(), revision)
+
+def generate_migration(name: str, autogenerate: bool = True):
+    """Write a new revision file, diffing the models against the database"""
+    command.revision(alembic_config(), message=name, autogenerate=autogenerate)
+
+def current_revision() -> Optional[str]:
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def pending_migrations() -> List[str]:
+    """Revisions not yet applied, oldest first"""
+    script = ScriptDirectory.from_config(alembic_config())
+    current = current_revision()
+    pending = []
+    for revision in script.walk_revisions():
+        if revision.revision == current:
+            break
+        pending.append(f"{revision.revision} - {revision.doc}")
+    return list(reversed(pending))
@@ -0,0 +1,47 @@
+"""
+Alembic environment for SmartMeet
+Runs against the package's engine; invoked through packages.database.migrate
+(`python tools/database/manage.py migrate`).
+"""
+
+from alembic import context
+
+from packages.database.connection import engine
+from packages.database.models import Base
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Leave database-only indexes (e.g. trigram GIN indexes) out of autogenerate"""
+    if type_ == "index" and reflected and compare_to is None:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
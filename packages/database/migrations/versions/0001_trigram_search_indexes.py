@@ -0,0 +1,40 @@
+"""Trigram GIN indexes for meeting and user search
+
+Revision ID: 0001_trigram_search
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0001_trigram_search"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index, table, column)
+TRIGRAM_INDEXES = [
+    ("ix_meetings_title_trgm", "meetings", "title"),
+    ("ix_meetings_description_trgm", "meetings", "description"),
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_users_name_trgm", "users", "name"),
+]
+
+
+def upgrade():
+    # SQLite searches fall back to LIKE; nothing to index
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY keeps the tables writable while large indexes build
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name, _, _ in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,41 @@
+"""Indexes for per-user meeting timelines
+
+Revision ID: 0002_timeline_indexes
+Revises: 0001_trigram_search
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0002_timeline_indexes"
+down_revision = "0001_trigram_search"
+branch_labels = None
+depends_on = None
+
+# (index, table, columns); also declared on the models for new databases
+TIMELINE_INDEXES = [
+    ("ix_meeting_participants_user", "meeting_participants", ["user_id", "meeting_id"]),
+    ("ix_meetings_organizer_scheduled", "meetings", ["organizer_id", "scheduled_at"]),
+    ("ix_meetings_scheduled_at", "meetings", ["scheduled_at"]),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        for name, table, columns in TIMELINE_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+        return
+    # CONCURRENTLY keeps the tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in TIMELINE_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        for name, table, _ in TIMELINE_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        for name, table, _ in TIMELINE_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""Partial index on live meeting statuses
+
+Revision ID: 0003_active_meetings
+Revises: 0002_timeline_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "0003_active_meetings"
+down_revision = "0002_timeline_indexes"
+branch_labels = None
+depends_on = None
+
+ACTIVE_STATUSES = text("status IN ('draft', 'proposed', 'scheduled')")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_meetings_active", "meetings", ["organizer_id", "scheduled_at"],
+                        sqlite_where=ACTIVE_STATUSES, if_not_exists=True)
+        return
+    # CONCURRENTLY keeps meetings writable while the index builds
+    with op.get_context().autocommit_block():
+        op.create_index("ix_meetings_active", "meetings", ["organizer_id", "scheduled_at"],
+                        postgresql_where=ACTIVE_STATUSES, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index("ix_meetings_active", table_name="meetings", if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_meetings_active", table_name="meetings", postgresql_concurrently=True, if_exists=True)
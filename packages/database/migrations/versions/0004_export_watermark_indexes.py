@@ -0,0 +1,40 @@
+"""Indexes for incremental exports by updated_at
+
+Revision ID: 0004_export_watermarks
+Revises: 0003_active_meetings
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0004_export_watermarks"
+down_revision = "0003_active_meetings"
+branch_labels = None
+depends_on = None
+
+# (index, table, columns); also declared on the models for new databases
+EXPORT_INDEXES = [
+    ("ix_meetings_updated", "meetings", ["updated_at", "id"]),
+    ("ix_meeting_participants_updated", "meeting_participants", ["updated_at", "meeting_id", "user_id"]),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        for name, table, columns in EXPORT_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+        return
+    # CONCURRENTLY keeps the tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in EXPORT_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        for name, table, _ in EXPORT_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        for name, table, _ in EXPORT_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
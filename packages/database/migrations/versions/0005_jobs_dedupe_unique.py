@@ -0,0 +1,57 @@
+"""Unique dedupe key among queued jobs
+
+Revision ID: 0005_jobs_dedupe_unique
+Revises: 0004_export_watermarks
+Create Date: 2026-10-19
+"""
+
+from datetime import datetime
+
+from alembic import op
+from sqlalchemy import inspect, text
+
+revision = "0005_jobs_dedupe_unique"
+down_revision = "0004_export_watermarks"
+branch_labels = None
+depends_on = None
+
+QUEUED = text("status = 'queued'")
+
+# Keep the oldest queued job per key (by created_at, then id); the index
+# cannot build over duplicates. finished_at lets purge_finished_jobs remove them.
+SUPERSEDE_DUPLICATES = text("""
+    UPDATE jobs SET status = 'failed', finished_at = :now,
+        last_error = 'Superseded by a queued job with the same dedupe key'
+    WHERE status = 'queued' AND dedupe_key IS NOT NULL AND EXISTS (
+        SELECT 1 FROM jobs AS older
+        WHERE older.status = 'queued' AND older.dedupe_key = jobs.dedupe_key
+          AND (older.created_at < jobs.created_at OR (older.created_at = jobs.created_at AND older.id < jobs.id))
+    )
+""")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if "jobs" not in inspect(bind).get_table_names():
+        return  # create_all builds the table with the index
+    bind.execute(SUPERSEDE_DUPLICATES, {"now": datetime.utcnow()})
+    if bind.dialect.name != "postgresql":
+        op.create_index("ux_jobs_dedupe_queued", "jobs", ["dedupe_key"], unique=True,
+                        sqlite_where=QUEUED, if_not_exists=True)
+        op.drop_index("ix_jobs_dedupe_key", table_name="jobs", if_exists=True)
+        return
+    # CONCURRENTLY keeps jobs writable while the index builds
+    with op.get_context().autocommit_block():
+        op.create_index("ux_jobs_dedupe_queued", "jobs", ["dedupe_key"], unique=True,
+                        postgresql_where=QUEUED, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ix_jobs_dedupe_key", table_name="jobs", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_jobs_dedupe_key", "jobs", ["dedupe_key"], if_not_exists=True)
+        op.drop_index("ux_jobs_dedupe_queued", table_name="jobs", if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.create_index("ix_jobs_dedupe_key", "jobs", ["dedupe_key"], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ux_jobs_dedupe_queued", table_name="jobs", postgresql_concurrently=True, if_exists=True)
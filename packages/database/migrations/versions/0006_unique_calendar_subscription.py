@@ -0,0 +1,51 @@
+"""One push subscription per calendar
+
+Revision ID: 0006_unique_subscription
+Revises: 0005_jobs_dedupe_unique
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import inspect, text
+
+revision = "0006_unique_subscription"
+down_revision = "0005_jobs_dedupe_unique"
+branch_labels = None
+depends_on = None
+
+# Keep the longest-lived row per calendar; the others' provider subscriptions
+# simply expire and their notifications are dropped as unknown
+DELETE_DUPLICATES = text("""
+    DELETE FROM calendar_subscriptions WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY calendar_auth_id, provider ORDER BY expires_at DESC, id
+            ) AS position
+            FROM calendar_subscriptions
+        ) ranked WHERE position > 1
+    )
+""")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if "calendar_subscriptions" not in inspect(bind).get_table_names():
+        return  # create_all builds the table with the index
+    op.execute(DELETE_DUPLICATES)
+    if bind.dialect.name != "postgresql":
+        op.create_index("ux_calendar_subscriptions_auth_provider", "calendar_subscriptions",
+                        ["calendar_auth_id", "provider"], unique=True, if_not_exists=True)
+        return
+    # CONCURRENTLY keeps calendar_subscriptions writable while the index builds
+    with op.get_context().autocommit_block():
+        op.create_index("ux_calendar_subscriptions_auth_provider", "calendar_subscriptions",
+                        ["calendar_auth_id", "provider"], unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index("ux_calendar_subscriptions_auth_provider", table_name="calendar_subscriptions", if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index("ux_calendar_subscriptions_auth_provider", table_name="calendar_subscriptions",
+                      postgresql_concurrently=True, if_exists=True)
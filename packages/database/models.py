@@ -2,10 +2,10 @@
 Database models for SmartMeet application
 Shared across all services in the monorepo
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Table
+from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Text, ForeignKey, JSON, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Session
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import uuid
@@ -20,7 +20,11 @@ meeting_participants = Table(
     Column('user_id', String, ForeignKey('users.id'), primary_key=True),
     Column('status', String, default='pending'),  # pending, accepted, declined
     Column('created_at', DateTime, default=func.now()),
-    Column('updated_at', DateTime, default=func.now(), onupdate=func.now())
+    Column('updated_at', DateTime, default=func.now(), onupdate=func.now()),
+    # Timeline lookups start from the user; the primary key leads with meeting_id
+    Index('ix_meeting_participants_user', 'user_id', 'meeting_id'),
+    # Incremental exports page through changes in this order (export.py)
+    Index('ix_meeting_participants_updated', 'updated_at', 'meeting_id', 'user_id')
 )
 
 class User(Base):
@@ -91,6 +95,7 @@ class CalendarAuth(Base):
     
     # Relationships
     user = relationship("User", back_populates="calendar_auths")
+    subscriptions = relationship("CalendarSubscription", back_populates="calendar_auth", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<CalendarAuth(id={self.id}, user_id={self.user_id}, provider={self.provider})>"
@@ -108,6 +113,9 @@ class CalendarAuth(Base):
             "token_expires_at": self.token_expires_at.isoformat() if self.token_expires_at else None
         }
 
+# Meetings still in play; queries must repeat this exact text for the planner to use ix_meetings_active
+LIVE_MEETING_PREDICATE = text("status IN ('draft', 'proposed', 'scheduled')")
+
 class Meeting(Base):
     """Meeting model for storing meeting information and scheduling data"""
     __tablename__ = "meetings"
@@ -145,6 +153,22 @@ class Meeting(Base):
     # Relationships
     organizer = relationship("User", back_populates="organized_meetings", foreign_keys=[organizer_id])
     participants = relationship("User", secondary=meeting_participants, back_populates="participated_meetings")
+    # Indexed copy of proposed_times/selected_time, rewritten on flush (see slots.py)
+    slots = relationship("MeetingSlot", viewonly=True, order_by="MeetingSlot.start_time")
+    
+    __table_args__ = (
+        # User timelines: meetings a user organizes within a date window
+        Index('ix_meetings_organizer_scheduled', 'organizer_id', 'scheduled_at'),
+        Index('ix_meetings_scheduled_at', 'scheduled_at'),
+        # Incremental exports (and archival) scan by last change
+        Index('ix_meetings_updated', 'updated_at', 'id'),
+        # Live-meeting reads (timeline live_only, e.g. conflict checks); terminal rows wait here until archived
+        Index(
+            'ix_meetings_active', 'organizer_id', 'scheduled_at',
+            postgresql_where=LIVE_MEETING_PREDICATE,
+            sqlite_where=LIVE_MEETING_PREDICATE
+        ),
+    )
     
     def __repr__(self):
         return f"<Meeting(id={self.id}, title={self.title}, status={self.status})>"
@@ -172,6 +196,41 @@ class Meeting(Base):
             "participants": [p.to_dict() for p in self.participants] if self.participants else []
         }
 
+class MeetingSlot(Base):
+    """One proposed or selected time of a meeting, normalized for range queries"""
+    __tablename__ = "meeting_slots"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    meeting_id = Column(String, ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)  # proposed, selected
+    position = Column(Integer, default=0, nullable=False)  # Index within proposed_times
+    
+    # Naive UTC, like the other DateTime columns
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    confidence = Column(Float, nullable=True)
+    
+    # One-way, so the unit of work inserts a new meeting before its slots
+    meeting = relationship("Meeting")
+    
+    __table_args__ = (
+        # Overlap queries: start_time < :end AND end_time > :start
+        Index('ix_meeting_slots_range', 'start_time', 'end_time'),
+        Index('ix_meeting_slots_meeting', 'meeting_id', 'kind'),
+    )
+    
+    def __repr__(self):
+        return f"<MeetingSlot(meeting_id={self.meeting_id}, kind={self.kind}, start_time={self.start_time})>"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "meeting_id": self.meeting_id,
+            "kind": self.kind,
+            "start": self.start_time.isoformat() + "Z",
+            "end": self.end_time.isoformat() + "Z",
+            "confidence": self.confidence
+        }
+
 class AvailabilityCache(Base):
     """Cache for storing user availability data to reduce API calls"""
     __tablename__ = "availability_cache"
@@ -190,6 +249,108 @@ class AvailabilityCache(Base):
     def __repr__(self):
         return f"<AvailabilityCache(id={self.id}, user_id={self.user_id}, expires_at={self.expires_at})>"
 
+class CalendarSubscription(Base):
+    """Provider push subscription (Graph subscription / Google watch channel) for a calendar"""
+    __tablename__ = "calendar_subscriptions"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    calendar_auth_id = Column(String, ForeignKey("calendar_auths.id"), nullable=False, index=True)
+    provider = Column(String, nullable=False)  # 'microsoft' or 'google'
+    
+    # Provider identifiers
+    external_id = Column(String, nullable=False, unique=True)  # Graph subscription id / Google channel id
+    resource_id = Column(String, nullable=True)  # Google resourceId (needed to stop a channel)
+    client_state = Column(String, nullable=False)  # Shared secret echoed back on every notification
+    
+    # Lifecycle
+    expires_at = Column(DateTime, nullable=False, index=True)
+    last_notification_at = Column(DateTime, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    calendar_auth = relationship("CalendarAuth", back_populates="subscriptions")
+    
+    __table_args__ = (
+        # One subscription per calendar; concurrent reconcilers race on this
+        Index('ux_calendar_subscriptions_auth_provider', 'calendar_auth_id', 'provider', unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<CalendarSubscription(id={self.id}, provider={self.provider}, expires_at={self.expires_at})>"
+
+class Job(Base):
+    """Background job claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED"""
+    __tablename__ = "jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(String, nullable=False)  # e.g. calendar.sync, auth.refresh_token
+    payload = Column(JSON, nullable=True)
+    
+    # Queue state
+    status = Column(String, default='queued', nullable=False)  # queued, running, succeeded, failed
+    priority = Column(Integer, default=0, nullable=False)  # Higher runs first
+    run_at = Column(DateTime, default=func.now(), nullable=False)  # Not claimable before this
+    dedupe_key = Column(String, nullable=True)  # At most one queued job per key (ux_jobs_dedupe_queued)
+    
+    # Execution
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Claim query: status = 'queued' AND job_type = ? AND run_at <= now()
+        Index('ix_jobs_claim', 'status', 'job_type', 'run_at'),
+        # Enforces dedupe_key across processes; finished jobs may repeat a key
+        Index(
+            'ux_jobs_dedupe_queued', 'dedupe_key', unique=True,
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'")
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<Job(id={self.id}, job_type={self.job_type}, status={self.status})>"
+
+class IdempotencyKey(Base):
+    """Outcome of a request made with an idempotency key (or OAuth code), replayed to duplicates"""
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(64), primary_key=True)  # sha256 of scope + client key
+    scope = Column(String, nullable=False)  # e.g. oauth.microsoft, meetings.schedule_batch
+    fingerprint = Column(String(64), nullable=False)  # Hash of the request the key was first used with
+    status = Column(String, default='in_progress', nullable=False)  # in_progress, completed
+    
+    # Stored response
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(JSON, nullable=True)
+    response_body = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)  # Lock expiry while in progress, replay TTL once completed
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(scope={self.scope}, status={self.status}, expires_at={self.expires_at})>"
+
+def _archive_table(source: Table, name: str) -> Table:
+    """Same columns as `source` without foreign keys or defaults, plus archived_at"""
+    columns = [Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+               for column in source.columns]
+    return Table(name, Base.metadata, *columns, Column('archived_at', DateTime, nullable=False, index=True))
+
+# Terminal meetings moved out of the live tables by packages/database/archive.py
+meetings_archive = _archive_table(Meeting.__table__, 'meetings_archive')
+meeting_participants_archive = _archive_table(meeting_participants, 'meeting_participants_archive')
+
 # Database utility functions
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get user by email address"""
@@ -252,6 +413,12 @@ def create_calendar_auth(
         db.refresh(auth)
         return auth
 
+def invalidate_user_availability(db: Session, user_id: str) -> int:
+    """Delete cached availability for a single user; returns rows removed"""
+    return db.query(AvailabilityCache).filter(
+        AvailabilityCache.user_id == user_id
+    ).delete(synchronize_session=False)
+
 def create_meeting(
     db: Session,
     organizer_id: str,
@@ -0,0 +1,98 @@
+"""
+Fuzzy search over meetings and users
+On PostgreSQL, matches use pg_trgm word similarity (served by the GIN trigram
+indexes from migration 0001) and results are ranked by similarity. SQLite
+falls back to case-insensitive LIKE with a simple prefix/substring ranking.
+"""
+import os
+from typing import Any, Dict, List
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from .models import Meeting, User
+
+# Minimum pg_trgm word similarity for a match (0-1)
+SEARCH_SIMILARITY_THRESHOLD = float(os.getenv("SEARCH_SIMILARITY_THRESHOLD", "0.3"))
+SEARCH_MAX_LIMIT = 100
+
+# Word similarity needs at least three characters; shorter queries use prefix ILIKE,
+# which the trigram indexes also serve
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+def _like_pattern(query: str, prefix_only: bool = False) -> str:
+    escaped = query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if prefix_only else f"%{escaped}%"
+
+def _use_trigrams(db: Session, query: str) -> bool:
+    return db.get_bind().dialect.name == "postgresql" and len(query) >= MIN_TRIGRAM_QUERY_LENGTH
+
+def _set_threshold(db: Session):
+    # Transaction-local, so it is safe behind PgBouncer transaction pooling
+    db.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(SEARCH_SIMILARITY_THRESHOLD), True))
+    )
+
+def _like_score(columns, query: str):
+    """Rank for LIKE matches: prefix of the first column > substring > other columns"""
+    first, *rest = [func.lower(func.coalesce(column, "")) for column in columns]
+    whens = [
+        (first.like(_like_pattern(query, prefix_only=True), escape="\\"), 1.0),
+        (first.like(_like_pattern(query), escape="\\"), 0.7),
+    ]
+    whens += [(column.like(_like_pattern(query), escape="\\"), 0.4) for column in rest]
+    return case(*whens, else_=0.0)
+
+def _search(db: Session, model, columns, query: str, limit: int):
+    """Rows of `model` matching `query` on any of `columns` with their score, best first"""
+    query = query.strip()
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+    if _use_trigrams(db, query):
+        _set_threshold(db)
+        # `q <% column` is the indexable form of word_similarity(q, column) >= threshold
+        score = func.greatest(*[func.word_similarity(query, column) for column in columns])
+        condition = or_(*[literal(query).op("<%")(column) for column in columns])
+    else:
+        score = _like_score(columns, query)
+        if db.get_bind().dialect.name == "postgresql":
+            # ILIKE on the bare column: the gin_trgm_ops indexes serve it, lower(column) LIKE they can't
+            pattern = _like_pattern(query, prefix_only=True)
+            condition = or_(*[column.ilike(pattern, escape="\\") for column in columns])
+        else:
+            condition = or_(*[func.lower(column).like(_like_pattern(query), escape="\\") for column in columns])
+
+    score = score.label("score")
+    return db.execute(
+        select(model, score).where(condition).order_by(score.desc(), columns[0]).limit(limit)
+    ).all()
+
+def search_meetings(db: Session, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Meetings whose title or description matches `query`, best first"""
+    rows = _search(db, Meeting, [Meeting.title, Meeting.description], query, limit)
+    return [
+        {
+            "id": meeting.id,
+            "title": meeting.title,
+            "description": meeting.description,
+            "status": meeting.status,
+            "organizer_id": meeting.organizer_id,
+            "scheduled_at": meeting.scheduled_at.isoformat() if meeting.scheduled_at else None,
+            "score": round(float(score), 3),
+        }
+        for meeting, score in rows
+    ]
+
+def search_users(db: Session, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Users whose email or name matches `query`, best first"""
+    rows = _search(db, User, [User.email, User.name], query, limit)
+    return [
+        {
+            "id": user.id,
+            "email": user.email,
+            "name": user.name,
+            "avatar_url": user.avatar_url,
+            "score": round(float(score), 3),
+        }
+        for user, score in rows
+    ]
@@ -0,0 +1,140 @@
+"""
+Normalized meeting slots
+Meeting.proposed_times and selected_time stay the API's JSON source of truth;
+meeting_slots holds one indexed row per slot so time-range questions ("which
+meetings propose a time this week", "what does this user have tomorrow") are
+index range scans instead of decoding every meeting. Rows are rewritten in
+before_flush whenever either JSON column is assigned, and scheduled_at is set
+from the selected slot.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+import uuid
+
+from sqlalchemy import delete, event, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from .models import Meeting, MeetingSlot, meeting_participants
+
+logger = logging.getLogger(__name__)
+
+SLOT_KINDS = ("proposed", "selected")
+SLOTS_MAX_LIMIT = 500
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    """Naive UTC datetime from an ISO string ('Z' or offset) or datetime"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def slots_from_json(meeting_id: str, proposed_times: Any, selected_time: Any) -> List[MeetingSlot]:
+    """Slot rows for a meeting's JSON columns; malformed entries are skipped"""
+    entries = [("proposed", position, slot) for position, slot in enumerate(proposed_times or [])]
+    if selected_time:
+        entries.append(("selected", 0, selected_time))
+
+    slots = []
+    for kind, position, slot in entries:
+        if not isinstance(slot, dict):
+            continue
+        start, end = _parse_time(slot.get("start")), _parse_time(slot.get("end"))
+        if start is None or end is None or end <= start:
+            logger.warning(f"⚠️  Skipping malformed {kind} slot on meeting {meeting_id}: {slot}")
+            continue
+        slots.append(MeetingSlot(
+            meeting_id=meeting_id, kind=kind, position=position,
+            start_time=start, end_time=end, confidence=slot.get("confidence")
+        ))
+    return slots
+
+def _slots_changed(meeting: Meeting) -> bool:
+    state = inspect(meeting)
+    return state.attrs.proposed_times.history.has_changes() or state.attrs.selected_time.history.has_changes()
+
+@event.listens_for(Session, "before_flush")
+def _sync_meeting_slots(session: Session, flush_context, instances):
+    """Rewrite the slot rows of meetings whose proposed/selected times were assigned"""
+    changed = [obj for obj in list(session.new) + list(session.dirty) if isinstance(obj, Meeting) and _slots_changed(obj)]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Meeting)]
+
+    stale = [meeting.id for meeting in changed if meeting.id is not None] + deleted
+    if stale:
+        # Core statement on the flush's connection: no autoflush, no identity-map sync needed
+        session.connection().execute(delete(MeetingSlot).where(MeetingSlot.meeting_id.in_(stale)))
+
+    for meeting in changed:
+        if meeting.id is None:
+            meeting.id = str(uuid.uuid4())
+        if inspect(meeting).attrs.selected_time.history.has_changes():
+            # scheduled_at follows the selected slot so user timelines can index it
+            selected = meeting.selected_time if isinstance(meeting.selected_time, dict) else {}
+            meeting.scheduled_at = _parse_time(selected.get("start"))
+        for slot in slots_from_json(meeting.id, meeting.proposed_times, meeting.selected_time):
+            slot.meeting = meeting
+            session.add(slot)
+
+def backfill_meeting_slots(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Rebuild meeting_slots from the JSON columns for every meeting, in batches
+    keyed by meeting id. Safe to re-run; each batch commits on its own.
+    """
+    totals = {"meetings": 0, "slots": 0}
+    last_id = ""
+    while True:
+        rows = db.execute(
+            select(Meeting.id, Meeting.proposed_times, Meeting.selected_time)
+            .where(Meeting.id > last_id)
+            .order_by(Meeting.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return totals
+
+        ids = [row.id for row in rows]
+        db.execute(delete(MeetingSlot).where(MeetingSlot.meeting_id.in_(ids)))
+        slots = [slot for row in rows for slot in slots_from_json(row.id, row.proposed_times, row.selected_time)]
+        db.add_all(slots)
+        db.commit()
+
+        totals["meetings"] += len(rows)
+        totals["slots"] += len(slots)
+        last_id = ids[-1]
+
+def find_slots(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    kinds: Iterable[str] = SLOT_KINDS,
+    user_id: Optional[str] = None,
+    statuses: Optional[Iterable[str]] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Slots overlapping [start, end) with their meeting's title and status,
+    earliest first. `user_id` restricts to meetings the user organizes or
+    attends.
+    """
+    start, end = _parse_time(start), _parse_time(end)
+    limit = max(1, min(limit, SLOTS_MAX_LIMIT))
+
+    query = (
+        select(MeetingSlot, Meeting.title, Meeting.status)
+        .join(Meeting, Meeting.id == MeetingSlot.meeting_id)
+        .where(MeetingSlot.start_time < end, MeetingSlot.end_time > start, MeetingSlot.kind.in_(list(kinds)))
+    )
+    if statuses:
+        query = query.where(Meeting.status.in_(list(statuses)))
+    if user_id:
+        attending = select(meeting_participants.c.meeting_id).where(meeting_participants.c.user_id == user_id)
+        query = query.where(or_(Meeting.organizer_id == user_id, MeetingSlot.meeting_id.in_(attending)))
+
+    rows = db.execute(query.order_by(MeetingSlot.start_time, MeetingSlot.meeting_id).limit(limit)).all()
+    return [{**slot.to_dict(), "title": title, "status": status} for slot, title, status in rows]
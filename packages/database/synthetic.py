@@ -0,0 +1,328 @@
+"""
+Synthetic data for load testing
+Generates users, calendar auths, meetings (with their slots), participant
+links and availability cache rows at scale, bulk-loaded in chunks (COPY on
+PostgreSQL, executemany elsewhere). Ids, names, memberships and calendars
+are derived from the seed and the row index, so a given (scale, seed) always
+produces the same data (timestamps are relative to when it runs), and
+synthetic_busy() gives the calendar the fake provider serves for any
+synthetic mailbox.
+"""
+import base64
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from .models import AvailabilityCache, CalendarAuth, Meeting, MeetingSlot, User, meeting_participants
+
+logger = logging.getLogger(__name__)
+
+SYNTHETIC_DOMAIN = "synthetic.example"
+SYNTHETIC_TOKEN_PREFIX = "synthetic"
+SEED_CHUNK_SIZE = 10000
+
+# Mailboxes per organisation; each organisation is one tenant on one provider
+USERS_PER_ORG = 200
+MAX_PARTICIPANTS = 6
+
+FIRST_NAMES = ["john", "jane", "alice", "bob", "charlie", "maria", "wei", "priya", "ahmed", "olga", "kenji", "fatima", "lucas", "sofia", "noah", "emma", "omar", "lena", "ivan", "yuki"]
+LAST_NAMES = ["smith", "doe", "brown", "wilson", "davis", "garcia", "chen", "patel", "khan", "ivanova", "tanaka", "silva", "muller", "rossi", "novak", "kim", "nguyen", "lopez", "berg", "okafor"]
+TOPICS = ["quarterly", "business", "review", "product", "demo", "standup", "planning", "retrospective", "budget", "roadmap", "hiring", "onboarding", "design", "security", "launch", "customer", "partner", "sync", "offsite", "training"]
+TIMEZONES = ["UTC", "Europe/London", "Europe/Berlin", "America/New_York", "America/Los_Angeles", "Asia/Tokyo"]
+# (status, cumulative share)
+MEETING_STATUSES = [("draft", 0.2), ("proposed", 0.5), ("scheduled", 0.8), ("completed", 0.95), ("cancelled", 1.0)]
+
+# Mirrors availability.busy_cache_key / availability_window and intervals.CACHE_FORMAT in the API
+AVAILABILITY_WINDOW_DAYS = int(os.getenv("AVAILABILITY_WINDOW_DAYS", "7"))
+AVAILABILITY_CACHE_TTL_MINUTES = int(os.getenv("AVAILABILITY_CACHE_TTL_MINUTES", "15"))
+CACHE_FORMAT = "intervals-v1"
+EPOCH = datetime(1970, 1, 1)
+
+def synthetic_id(seed: int, kind: str, index: int) -> str:
+    """Stable UUID for the index-th row of a kind"""
+    return str(uuid.UUID(bytes=hashlib.md5(f"{seed}:{kind}:{index}".encode()).digest(), version=4))
+
+def synthetic_org(index: int) -> int:
+    return index // USERS_PER_ORG
+
+def synthetic_provider(index: int) -> str:
+    """Whole organisations share a provider: even ones Microsoft, odd ones Google"""
+    return "microsoft" if synthetic_org(index) % 2 == 0 else "google"
+
+def synthetic_email(seed: int, index: int) -> str:
+    rng = random.Random(f"{seed}:name:{index}")
+    return f"{rng.choice(FIRST_NAMES)}.{rng.choice(LAST_NAMES)}.{index}@org{synthetic_org(index)}.{SYNTHETIC_DOMAIN}"
+
+def synthetic_token(seed: int, index: int) -> str:
+    """Access token the fake provider can map back to its seed and mailbox"""
+    return f"{SYNTHETIC_TOKEN_PREFIX}-{seed}-{index}"
+
+def parse_synthetic_token(token: str) -> Optional[Tuple[int, int]]:
+    """(seed, user index) for a synthetic access token, else None"""
+    parts = (token or "").split("-")
+    if len(parts) != 3 or parts[0] != SYNTHETIC_TOKEN_PREFIX:
+        return None
+    try:
+        return int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+
+def synthetic_busy(seed: int, email: str, window_start: datetime, window_end: datetime) -> List[Dict[str, Any]]:
+    """
+    The synthetic calendar of `email` overlapping the window: a few 30-90
+    minute events per weekday between 08:00 and 18:00 UTC, fewer at weekends.
+    Each day is drawn from its own RNG, so any window sees the same events.
+    Returns [{"id", "start", "end", "status"}] in naive UTC, earliest first.
+    """
+    events = []
+    day = window_start.date() - timedelta(days=1)
+    while day <= window_end.date():
+        rng = random.Random(f"{seed}:{email.lower()}:{day.isoformat()}")
+        count = rng.randint(0, 5) if day.weekday() < 5 else rng.randint(0, 1)
+        for number in range(count):
+            start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(8 * 60, 18 * 60, 30))
+            end = start + timedelta(minutes=rng.choice((30, 30, 60, 60, 90)))
+            if start < window_end and end > window_start:
+                events.append({
+                    "id": f"{day.isoformat()}-{number}",
+                    "start": start,
+                    "end": end,
+                    "status": "tentative" if rng.random() < 0.1 else "busy",
+                })
+        day += timedelta(days=1)
+    return sorted(events, key=lambda event: event["start"])
+
+def _availability_window(now: datetime) -> Tuple[datetime, datetime]:
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=AVAILABILITY_WINDOW_DAYS)
+
+def _busy_cache_value(events: List[Dict[str, Any]]) -> Dict[str, str]:
+    """availability_data in the API's binary interval form"""
+    merged: List[List[int]] = []
+    for event in events:
+        start = int((event["start"] - EPOCH).total_seconds() // 60)
+        end = int((event["end"] - EPOCH).total_seconds() // 60)
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    starts, ends = array("q", (s for s, _ in merged)), array("q", (e for _, e in merged))
+    if sys.byteorder == "big":
+        starts.byteswap()
+        ends.byteswap()
+    return {"format": CACHE_FORMAT, "data": base64.b64encode(starts.tobytes() + ends.tobytes()).decode("ascii")}
+
+def _users(seed: int, scale: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    for index in range(scale):
+        email = synthetic_email(seed, index)
+        first, last = email.split("@")[0].split(".")[:2]
+        yield {
+            "id": synthetic_id(seed, "user", index), "email": email, "name": f"{first.title()} {last.title()}",
+            "avatar_url": None, "timezone": TIMEZONES[synthetic_org(index) % len(TIMEZONES)],
+            "is_active": True, "is_verified": True,
+            "created_at": now, "updated_at": now, "last_login": None,
+        }
+
+def _calendar_auths(seed: int, scale: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    for index in range(scale):
+        yield {
+            "id": synthetic_id(seed, "auth", index), "user_id": synthetic_id(seed, "user", index),
+            "provider": synthetic_provider(index),
+            "access_token": synthetic_token(seed, index), "refresh_token": synthetic_token(seed, index),
+            "token_expires_at": now + timedelta(days=365),
+            "provider_user_id": f"synthetic-user-{index}", "provider_email": synthetic_email(seed, index),
+            "is_active": True, "last_sync": None, "created_at": now, "updated_at": now,
+        }
+
+def _slot(start: datetime, duration: int, confidence: Optional[float] = None) -> Dict[str, Any]:
+    slot = {"start": start.isoformat() + "Z", "end": (start + timedelta(minutes=duration)).isoformat() + "Z"}
+    if confidence is not None:
+        slot["confidence"] = confidence
+    return slot
+
+def _meetings(seed: int, scale: int, meetings: int, now: datetime) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """(meeting row, participant rows, slot rows) per meeting"""
+    rng = random.Random(f"{seed}:meetings")
+    for index in range(meetings):
+        meeting_id = synthetic_id(seed, "meeting", index)
+        organizer = rng.randrange(scale)
+        # Most attendees come from the organiser's organisation
+        org_start = synthetic_org(organizer) * USERS_PER_ORG
+        org_end = min(scale, org_start + USERS_PER_ORG)
+        attendees = set()
+        for _ in range(rng.randint(1, MAX_PARTICIPANTS)):
+            attendee = rng.randrange(org_start, org_end) if rng.random() < 0.8 else rng.randrange(scale)
+            if attendee != organizer:
+                attendees.add(attendee)
+
+        roll = rng.random()
+        status = next(name for name, share in MEETING_STATUSES if roll <= share)
+        duration = rng.choice((15, 30, 30, 45, 60, 90))
+        created_at = now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+        base = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=rng.randrange(-60 * 24, 30 * 24))
+        proposed = selected = None
+        if status != "draft":
+            proposed = [_slot(base + timedelta(hours=2 * n), duration, round(1 - 0.1 * n, 2)) for n in range(3)]
+        if status in ("scheduled", "completed"):
+            selected = proposed[0]
+        words = rng.sample(TOPICS, 3)
+
+        meeting = {
+            "id": meeting_id, "organizer_id": synthetic_id(seed, "user", organizer),
+            "title": " ".join(words[:2]).title(),
+            "description": f"{words[0]} {words[2]} discussion with the {rng.choice(LAST_NAMES).title()} team",
+            "duration_minutes": duration, "meeting_type": "teams", "location": None, "meeting_url": None,
+            "proposed_times": proposed, "selected_time": selected, "timezone": "UTC", "status": status,
+            "outlook_event_id": None, "google_event_id": None,
+            "created_at": created_at, "updated_at": created_at,
+            "scheduled_at": base if selected else None,
+        }
+        participants = [
+            {
+                "meeting_id": meeting_id, "user_id": synthetic_id(seed, "user", attendee),
+                "status": rng.choice(("pending", "accepted", "accepted", "declined")),
+                "created_at": created_at, "updated_at": created_at,
+            }
+            for attendee in sorted(attendees)
+        ]
+        slots = [
+            {
+                "id": synthetic_id(seed, f"slot:{kind}:{position}", index), "meeting_id": meeting_id,
+                "kind": kind, "position": position,
+                "start_time": base + timedelta(hours=2 * position), "end_time": base + timedelta(hours=2 * position, minutes=duration),
+                "confidence": slot.get("confidence"),
+            }
+            for kind, slots_json in (("proposed", proposed or []), ("selected", [selected] if selected else []))
+            for position, slot in enumerate(slots_json)
+        ]
+        yield meeting, participants, slots
+
+def _cache_rows(seed: int, scale: int, fraction: float, now: datetime) -> Iterator[Dict[str, Any]]:
+    window_start, window_end = _availability_window(now)
+    cache_key = hashlib.sha256(f"busy:{window_start.isoformat()}:{window_end.isoformat()}".encode()).hexdigest()
+    expires_at = now + timedelta(minutes=AVAILABILITY_CACHE_TTL_MINUTES)
+    step = max(1, round(1 / fraction)) if fraction > 0 else 0
+    for index in range(0, scale, step) if step else ():
+        email = synthetic_email(seed, index)
+        yield {
+            "id": synthetic_id(seed, "cache", index), "user_id": synthetic_id(seed, "user", index),
+            "cache_key": cache_key,
+            "availability_data": _busy_cache_value(synthetic_busy(seed, email, window_start, window_end)),
+            "expires_at": expires_at, "created_at": now,
+        }
+
+def _chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+def _load(connection, table, rows: List[Dict[str, Any]]):
+    """Bulk-insert one chunk: COPY on PostgreSQL (psycopg2), executemany otherwise"""
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # Unquoted empty fields are NULL in COPY's CSV format
+            writer.writerow(["" if row[column] is None else _copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        return
+    connection.execute(insert(table), rows)
+
+def seed_synthetic(
+    engine: Engine,
+    scale: int,
+    seed: int = 42,
+    chunk_size: int = SEED_CHUNK_SIZE,
+    meetings_per_user: float = 1.0,
+    cache_fraction: float = 0.2
+) -> Dict[str, int]:
+    """
+    Load `scale` users (one calendar auth each), scale * meetings_per_user
+    meetings with participants and slots, and cache rows for cache_fraction
+    of users. Each chunk is its own transaction. Returns row counts.
+    """
+    now = datetime.utcnow().replace(microsecond=0)
+    with engine.connect() as connection:
+        existing = connection.scalar(select(func.count()).select_from(User).where(User.email.like(f"%.{SYNTHETIC_DOMAIN}")))
+    if existing:
+        raise ValueError(f"{existing} synthetic users already exist; reset the database before seeding again")
+
+    counts: Dict[str, int] = {}
+
+    def load(name: str, table, rows: Iterator[Dict[str, Any]]):
+        started = time.perf_counter()
+        total = 0
+        for chunk in _chunks(rows, chunk_size):
+            with engine.begin() as connection:
+                _load(connection, table, chunk)
+            total += len(chunk)
+        elapsed = time.perf_counter() - started
+        counts[name] = total
+        logger.info(f"🌱 {name}: {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+
+    load("users", User.__table__, _users(seed, scale, now))
+    load("calendar_auths", CalendarAuth.__table__, _calendar_auths(seed, scale, now))
+
+    # Meetings, participants and slots come from one pass; buffer the children per chunk
+    meeting_count = int(scale * meetings_per_user)
+    started = time.perf_counter()
+    counts.update({"meetings": 0, "meeting_participants": 0, "meeting_slots": 0})
+    generated = _meetings(seed, scale, meeting_count, now)
+    while True:
+        batch = [item for _, item in zip(range(chunk_size), generated)]
+        if not batch:
+            break
+        participants = [row for _, rows, _ in batch for row in rows]
+        slots = [row for _, _, rows in batch for row in rows]
+        with engine.begin() as connection:
+            _load(connection, Meeting.__table__, [meeting for meeting, _, _ in batch])
+            if participants:
+                _load(connection, meeting_participants, participants)
+            if slots:
+                _load(connection, MeetingSlot.__table__, slots)
+        counts["meetings"] += len(batch)
+        counts["meeting_participants"] += len(participants)
+        counts["meeting_slots"] += len(slots)
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"🌱 meetings: {counts['meetings']} rows, {counts['meeting_participants']} participants, "
+        f"{counts['meeting_slots']} slots in {elapsed:.1f}s"
+    )
+
+    load("availability_cache", AvailabilityCache.__table__, _cache_rows(seed, scale, cache_fraction, now))
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            for table in ("users", "calendar_auths", "meetings", "meeting_participants", "meeting_slots", "availability_cache"):
+                connection.exec_driver_sql(f"ANALYZE {table}")
+    return counts
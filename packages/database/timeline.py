@@ -0,0 +1,92 @@
+"""
+Per-user meeting timelines
+Meetings a user organizes or attends, by scheduled_at. One query: the user's
+meeting ids come from meeting_participants (ix_meeting_participants_user)
+and meetings (ix_meetings_organizer_scheduled), and the window is applied on
+meetings.scheduled_at. With live_only, both sides also filter on the live
+statuses, which lets Postgres use the partial ix_meetings_active index.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import literal, null, select, union_all
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+
+from .models import LIVE_MEETING_PREDICATE, Meeting, User, meeting_participants
+
+# Meetings that started this long before the window can still overlap it
+TIMELINE_LOOKBACK = timedelta(hours=24)
+TIMELINE_MAX_MEETINGS = 1000
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def meeting_end(meeting: Meeting) -> Optional[datetime]:
+    if meeting.scheduled_at is None:
+        return None
+    return meeting.scheduled_at + timedelta(minutes=meeting.duration_minutes or 30)
+
+def user_timeline(
+    db: Session,
+    user_id: str,
+    start: datetime,
+    end: datetime,
+    exclude_statuses: Iterable[str] = ("cancelled",),
+    limit: int = TIMELINE_MAX_MEETINGS,
+    live_only: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Scheduled meetings overlapping [start, end) that `user_id` organizes or
+    attends, earliest first, with organizer and participants loaded eagerly.
+    Each item is {"meeting", "role", "response"}; role is organizer when the
+    user is both. `live_only` drops completed (and cancelled) meetings.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    live = [LIVE_MEETING_PREDICATE] if live_only else []
+    memberships = union_all(
+        select(
+            meeting_participants.c.meeting_id.label("meeting_id"),
+            literal("participant").label("role"),
+            meeting_participants.c.status.label("response"),
+        ).where(meeting_participants.c.user_id == user_id),
+        select(
+            Meeting.id.label("meeting_id"),
+            literal("organizer").label("role"),
+            null().label("response"),
+        ).where(
+            Meeting.organizer_id == user_id,
+            Meeting.scheduled_at >= start - TIMELINE_LOOKBACK,
+            Meeting.scheduled_at < end,
+            *live,
+        ),
+    ).subquery()
+
+    query = (
+        select(Meeting, memberships.c.role, memberships.c.response)
+        .join(memberships, memberships.c.meeting_id == Meeting.id)
+        .where(Meeting.scheduled_at >= start - TIMELINE_LOOKBACK, Meeting.scheduled_at < end, *live)
+        .options(
+            load_only(Meeting.id, Meeting.organizer_id, Meeting.title, Meeting.status, Meeting.duration_minutes,
+                      Meeting.timezone, Meeting.meeting_type, Meeting.scheduled_at),
+            joinedload(Meeting.organizer).load_only(User.id, User.email, User.name),
+            selectinload(Meeting.participants).load_only(User.id, User.email, User.name),
+        )
+        .order_by(Meeting.scheduled_at, Meeting.id)
+        .limit(limit * 2)
+    )
+    excluded = set(exclude_statuses)
+
+    timeline: Dict[str, Dict[str, Any]] = {}
+    for meeting, role, response in db.execute(query):
+        if meeting.status in excluded or meeting_end(meeting) <= start:
+            continue
+        entry = timeline.get(meeting.id)
+        if entry is None:
+            timeline[meeting.id] = {"meeting": meeting, "role": role, "response": response}
+        elif role == "organizer":
+            entry["role"] = "organizer"
+        elif entry["response"] is None:
+            entry["response"] = response
+    return list(timeline.values())[:limit]
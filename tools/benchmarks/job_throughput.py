@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+SmartMeet Job Queue Throughput Benchmark
+Enqueues a batch of jobs and measures how fast one or more JobWorkers drain
+them for different batch sizes and concurrency limits.
+
+Usage:
+    python tools/benchmarks/job_throughput.py --jobs 5000 --workers 2 \\
+        --batch-sizes 1,10,50 --concurrency 32 --job-ms 5
+"""
+
+import sys
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "benchmark.noop"
+
+def enqueue_bulk(count: int):
+    """Insert count benchmark jobs with a single bulk insert"""
+    from packages.database import get_db_session, Job
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()), "job_type": JOB_TYPE, "payload": {}, "status": "queued",
+            "priority": 0, "run_at": now, "attempts": 0, "max_attempts": 1,
+        }
+        for _ in range(count)
+    ]
+    with get_db_session() as db:
+        db.bulk_insert_mappings(Job, rows)
+
+def cleanup():
+    """Remove all benchmark jobs"""
+    from packages.database import get_db_session, Job
+
+    with get_db_session() as db:
+        db.query(Job).filter(Job.job_type == JOB_TYPE).delete(synchronize_session=False)
+
+def remaining() -> int:
+    from packages.database import get_db_session, Job
+
+    with get_db_session() as db:
+        return db.query(Job).filter(Job.job_type == JOB_TYPE, Job.status.in_(["queued", "running"])).count()
+
+async def run_round(jobs: int, workers: int, batch_size: int, concurrency: int, job_ms: float) -> float:
+    """Drain jobs with the given settings and return jobs per second"""
+    from packages.database import JobWorker
+
+    enqueue_bulk(jobs)
+    pool = []
+    for _ in range(workers):
+        worker = JobWorker(batch_size=batch_size, poll_interval=0.05)
+
+        @worker.register(JOB_TYPE, concurrency=concurrency)
+        async def noop(payload):
+            if job_ms:
+                await asyncio.sleep(job_ms / 1000)
+
+        pool.append(worker)
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(worker.run()) for worker in pool]
+    while sum(worker.processed for worker in pool) < jobs:
+        await asyncio.sleep(0.05)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    left = remaining()
+    if left:
+        logger.warning(f"⚠️  {left} jobs not recorded as finished")
+    cleanup()
+    return jobs / elapsed
+
+def main():
+    """Run the benchmark matrix and print a summary"""
+    parser = argparse.ArgumentParser(description="SmartMeet job queue throughput benchmark")
+    parser.add_argument('--jobs', type=int, default=2000, help='Jobs per round')
+    parser.add_argument('--workers', type=int, default=1, help='Concurrent JobWorker instances')
+    parser.add_argument('--batch-sizes', default='1,10,50', help='Comma-separated claim batch sizes')
+    parser.add_argument('--concurrency', type=int, default=32, help='Per-worker concurrency limit for the job type')
+    parser.add_argument('--job-ms', type=float, default=0.0, help='Simulated work per job in milliseconds')
+    args = parser.parse_args()
+
+    from packages.database import create_tables
+    create_tables()
+    cleanup()
+
+    print()
+    print(f"{'batch':>8}{'workers':>10}{'concurrency':>13}{'jobs/s':>12}")
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        rate = asyncio.run(run_round(args.jobs, args.workers, batch_size, args.concurrency, args.job_ms))
+        print(f"{batch_size:>8}{args.workers:>10}{args.concurrency:>13}{rate:>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+SmartMeet Logging Overhead Benchmark
+Drives a minimal ASGI app that logs like the API does per request (an access
+line plus callback-style info/debug messages) and reports the time logging
+adds to each request:
+
+    none      logging disabled (baseline)
+    sync      previous setup: basicConfig stream handler, f-string messages
+    queue     logging_config: queue + listener thread, JSON, lazy messages
+    sampled   as queue, with uvicorn.access sampled at --access-rate
+
+Usage:
+    python tools/benchmarks/logging_overhead.py --requests 5000 --concurrency 20 \\
+        --sink-delay-ms 0.2
+"""
+
+import sys
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root and the API to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "apps" / "api-backend"))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from logging_config import configure_logging, stop_logging  # noqa: E402
+
+MODES = ["none", "sync", "queue", "sampled"]
+
+logger = logging.getLogger("benchmark.callback")
+access_logger = logging.getLogger("uvicorn.access")
+
+
+class SlowSink(io.TextIOBase):
+    """File sink whose writes take at least delay seconds (a busy pipe or log driver)"""
+
+    def __init__(self, target, delay: float):
+        self.target = target
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return self.target.write(text)
+
+    def flush(self):
+        self.target.flush()
+
+
+class AccessLog:
+    """Access line per request, with uvicorn's message and args"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        status = {}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if scope["type"] == "http":
+            access_logger.info('%s - "%s %s HTTP/%s" %d', "127.0.0.1:5000", scope["method"], scope["path"], "1.1", status.get("code", 0))
+
+
+def build_app(lazy: bool) -> FastAPI:
+    app = FastAPI()
+    token = {"access_token": "x" * 1200, "refresh_token": "y" * 400, "expires_in": 3600, "scope": "Calendars.Read offline_access"}
+
+    @app.get("/callback")
+    async def callback(code: str = "0.AAAAbc123def456ghi789jkl"):
+        email = "jane.doe@example.com"
+        if lazy:
+            logger.info("🔄 Processing OAuth callback for code: %.20s...", code)
+            logger.debug("Token response: %s", token)
+            logger.info("✅ Created new calendar auth for user: %s", email)
+        else:
+            logger.info(f"🔄 Processing OAuth callback for code: {code[:20]}...")
+            logger.debug(f"Token response: {token}")
+            logger.info(f"✅ Created new calendar auth for user: {email}")
+        return {"ok": True}
+
+    return AccessLog(app)
+
+
+def configure(mode: str, sink, access_rate: float):
+    root = logging.getLogger()
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "none":
+        root.setLevel(logging.CRITICAL)
+    elif mode == "sync":
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    else:
+        rates = {"uvicorn.access": access_rate} if mode == "sampled" else {}
+        configure_logging(level="info", fmt="json", sample_rates=rates, stream=sink)
+
+
+async def run_round(mode: str, requests: int, concurrency: int):
+    """Per-request latencies in microseconds"""
+    app = build_app(lazy=mode != "sync")
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(50):  # warm up
+            await client.get("/callback")
+
+        pending = iter(range(requests))
+
+        async def worker():
+            for _ in pending:
+                started = time.perf_counter()
+                await client.get("/callback")
+                latencies.append((time.perf_counter() - started) * 1_000_000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main():
+    """Run every mode and print per-request logging overhead"""
+    parser = argparse.ArgumentParser(description="SmartMeet logging overhead benchmark")
+    parser.add_argument('--requests', type=int, default=3000, help='Requests per mode')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent clients')
+    parser.add_argument('--sink-delay-ms', type=float, default=0.0, help='Simulated cost of each write to the log sink')
+    parser.add_argument('--access-rate', type=float, default=0.1, help='Share of access lines kept in sampled mode')
+    parser.add_argument('--rounds', type=int, default=3, help='Rounds per mode (best is reported)')
+    parser.add_argument('--modes', default=",".join(MODES), help='Comma-separated modes to run')
+    args = parser.parse_args()
+
+    # Modes are interleaved over several rounds and the best round kept, so
+    # machine noise does not land on one mode
+    results = {}
+    with tempfile.TemporaryFile("w+") as target:
+        sink = SlowSink(target, args.sink_delay_ms / 1000)
+        for _ in range(args.rounds):
+            for mode in args.modes.split(","):
+                configure(mode, sink, args.access_rate)
+                latencies, elapsed = asyncio.run(run_round(mode, args.requests, args.concurrency))
+                drain_started = time.perf_counter()
+                stop_logging()
+                result = {
+                    # Event loop time per request: what logging takes away from every other request
+                    "per_request": elapsed * 1_000_000 / args.requests,
+                    "p99": statistics.quantiles(latencies, n=100)[98],
+                    "rps": args.requests / elapsed,
+                    "drain_ms": (time.perf_counter() - drain_started) * 1000,
+                }
+                if mode not in results or result["per_request"] < results[mode]["per_request"]:
+                    results[mode] = result
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    baseline = results.get("none", {}).get("per_request", 0.0)
+    print()
+    print(f"{'mode':>10}{'us/req':>10}{'overhead us':>13}{'p99 latency us':>16}{'req/s':>10}{'drain ms':>10}")
+    for mode, result in results.items():
+        overhead = result["per_request"] - baseline if baseline else float("nan")
+        print(f"{mode:>10}{result['per_request']:>10.0f}{overhead:>13.0f}{result['p99']:>16.0f}{result['rps']:>10.0f}{result['drain_ms']:>10.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+SmartMeet Search Latency Benchmark
+Seeds synthetic users and meetings (one million of each by default), then
+measures search_meetings / search_users latency for exact, partial and
+misspelled queries. Run `python tools/database/manage.py migrate` first so the
+trigram indexes exist; compare against a database without them to see the
+difference.
+
+Usage:
+    python tools/benchmarks/search_latency.py --rows 1000000 --repeat 20
+    python tools/benchmarks/search_latency.py --skip-seed --repeat 50
+    python tools/benchmarks/search_latency.py --cleanup
+"""
+
+import sys
+import argparse
+import logging
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BENCH_DOMAIN = "search-bench.example"
+CHUNK_SIZE = 10000
+
+FIRST_NAMES = ["john", "jane", "alice", "bob", "charlie", "maria", "wei", "priya", "ahmed", "olga", "kenji", "fatima", "lucas", "sofia", "noah"]
+LAST_NAMES = ["smith", "doe", "brown", "wilson", "davis", "garcia", "chen", "patel", "khan", "ivanova", "tanaka", "silva", "muller", "rossi", "novak"]
+TOPICS = ["quarterly", "business", "review", "product", "demo", "standup", "planning", "retrospective", "budget", "roadmap", "hiring", "onboarding", "design", "security", "launch", "customer", "partner", "sync", "offsite", "training"]
+
+# (label, query)
+QUERIES = [
+    ("exact word", "roadmap"),
+    ("two words", "budget review"),
+    ("misspelled", "retrospectve"),
+    ("partial", "onboard"),
+    ("short prefix", "pa"),
+]
+USER_QUERIES = [
+    ("exact email", "priya.patel"),
+    ("misspelled name", "olga ivanva"),
+    ("partial", "tanak"),
+]
+
+def seed(rows: int, seed_value: int):
+    """Insert `rows` users and `rows` meetings in chunks"""
+    from sqlalchemy import insert
+    from packages.database import engine, User, Meeting
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    organizer_ids = []
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for offset in range(0, rows, CHUNK_SIZE):
+            batch = []
+            for i in range(offset, min(rows, offset + CHUNK_SIZE)):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                user_id = str(uuid.uuid4())
+                if len(organizer_ids) < 1000:
+                    organizer_ids.append(user_id)
+                batch.append({
+                    "id": user_id, "email": f"{first}.{last}.{i}@{BENCH_DOMAIN}", "name": f"{first.title()} {last.title()}",
+                    "timezone": "UTC", "is_active": True, "is_verified": False, "created_at": now, "updated_at": now,
+                })
+            connection.execute(insert(User.__table__), batch)
+        logger.info(f"👤 Inserted {rows} users")
+
+        for offset in range(0, rows, CHUNK_SIZE):
+            batch = []
+            for _ in range(min(CHUNK_SIZE, rows - offset)):
+                words = rng.sample(TOPICS, 3)
+                batch.append({
+                    "id": str(uuid.uuid4()), "organizer_id": rng.choice(organizer_ids),
+                    "title": " ".join(words[:2]).title(),
+                    "description": f"{words[0]} {words[2]} discussion with the {rng.choice(LAST_NAMES).title()} team",
+                    "duration_minutes": 30, "meeting_type": "teams", "timezone": "UTC", "status": "draft",
+                    "created_at": now, "updated_at": now,
+                })
+            connection.execute(insert(Meeting.__table__), batch)
+        logger.info(f"📅 Inserted {rows} meetings")
+
+        if connection.dialect.name == "postgresql":
+            from sqlalchemy import text
+            connection.execute(text("ANALYZE users"))
+            connection.execute(text("ANALYZE meetings"))
+    logger.info(f"🌱 Seeded in {time.perf_counter() - started:.1f}s")
+
+def cleanup():
+    """Remove benchmark users and their meetings"""
+    from packages.database import get_db_session, User, Meeting
+
+    with get_db_session() as db:
+        bench_users = db.query(User.id).filter(User.email.like(f"%@{BENCH_DOMAIN}"))
+        meetings = db.query(Meeting).filter(Meeting.organizer_id.in_(bench_users.scalar_subquery())).delete(synchronize_session=False)
+        users = db.query(User).filter(User.email.like(f"%@{BENCH_DOMAIN}")).delete(synchronize_session=False)
+    logger.info(f"🧹 Removed {users} users and {meetings} meetings")
+
+def measure(search, query: str, repeat: int, limit: int):
+    """Latencies (ms) of `repeat` searches and the result count"""
+    from packages.database import get_db_session
+
+    timings, found = [], 0
+    with get_db_session() as db:
+        search(db, query, limit)  # warm-up
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = len(search(db, query, limit))
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings, found
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+def main():
+    """Seed (optionally), run the query matrix and print a summary"""
+    parser = argparse.ArgumentParser(description="SmartMeet search latency benchmark")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Users and meetings to seed')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+    parser.add_argument('--limit', type=int, default=20, help='Result limit per search')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for generated data')
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse previously seeded rows')
+    parser.add_argument('--cleanup', action='store_true', help='Remove seeded rows and exit')
+    args = parser.parse_args()
+
+    from packages.database import create_tables, engine, search_meetings, search_users
+    create_tables()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if not args.skip_seed:
+        seed(args.rows, args.seed)
+
+    print()
+    print(f"Backend: {engine.dialect.name}")
+    print(f"{'search':<10}{'query':<18}{'results':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for kind, search, queries in (("meetings", search_meetings, QUERIES), ("users", search_users, USER_QUERIES)):
+        for label, query in queries:
+            timings, found = measure(search, query, args.repeat, args.limit)
+            print(f"{kind:<10}{label:<18}{found:>9}{statistics.median(timings):>10.1f}{percentile(timings, 0.95):>10.1f}{max(timings):>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,10 @@ Commands:
     rollback          - Rollback last migration
     generate:migration NAME - Generate new migration
     db:reset          - Reset database (drop and recreate tables)
-    db:seed           - Seed database with test data
+    db:seed           - Seed database with test data (--scale N for synthetic load-test data)
+    db:backfill-slots - Rebuild meeting_slots from proposed/selected times
+    db:archive        - Move old completed/cancelled meetings to the archive tables
+    db:export         - Export meetings, participants and availability to Parquet/Arrow (incremental)
     console           - Start interactive Python console with database context
 """
 
@@ -35,7 +38,8 @@ logger = logging.getLogger(__name__)
 
 def cmd_migrate(args):
     """Run database migrations"""
-    from packages.database import create_tables, check_database_connection
+    from packages.database import check_database_connection
+    from packages.database.migrate import run_migrations
     
     logger.info("🗄️  Running database migrations...")
     
@@ -44,7 +48,7 @@ def cmd_migrate(args):
         sys.exit(1)
     
     try:
-        create_tables()
+        run_migrations()
         logger.info("✅ Migrations completed successfully")
     except Exception as e:
         logger.error(f"❌ Migration failed: {e}")
@@ -53,6 +57,7 @@ def cmd_migrate(args):
 def cmd_migration_status(args):
     """Show migration status"""
     from packages.database import engine
+    from packages.database.migrate import current_revision, pending_migrations
     from sqlalchemy import inspect
     
     logger.info("🔍 Checking migration status...")
@@ -67,6 +72,15 @@ def cmd_migration_status(args):
             logger.info("✅ Database tables found:")
             for table in sorted(tables):
                 logger.info(f"  📋 {table}")
+        
+        logger.info(f"📌 Current revision: {current_revision() or 'none'}")
+        pending = pending_migrations()
+        if pending:
+            logger.info("⏳ Pending migrations:")
+            for revision in pending:
+                logger.info(f"  📝 {revision}")
+        else:
+            logger.info("✅ No pending migrations")
                 
     except Exception as e:
         logger.error(f"❌ Failed to check migration status: {e}")
@@ -74,18 +88,31 @@ def cmd_migration_status(args):
 
 def cmd_rollback(args):
     """Rollback last migration"""
-    logger.warning("🔄 Rollback functionality not implemented yet")
-    logger.info("💡 For now, use 'python tools/database/manage.py db:reset' to reset the database")
+    from packages.database.migrate import rollback_migration
+    
+    logger.info("🔄 Rolling back last migration...")
+    try:
+        rollback_migration()
+        logger.info("✅ Rollback completed")
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        sys.exit(1)
 
 def cmd_generate_migration(args):
     """Generate new migration"""
+    from packages.database.migrate import generate_migration
+    
     name = getattr(args, 'name', None)
     if not name:
         logger.error("❌ Migration name required. Usage: python tools/database/manage.py generate:migration --name 'migration_name'")
         sys.exit(1)
     
-    logger.warning("📝 Migration generation not implemented yet")
-    logger.info(f"💡 Would generate migration: {name}")
+    try:
+        generate_migration(name)
+        logger.info(f"✅ Generated migration: {name}")
+    except Exception as e:
+        logger.error(f"❌ Migration generation failed: {e}")
+        sys.exit(1)
 
 def cmd_db_reset(args):
     """Reset database"""
@@ -106,8 +133,27 @@ def cmd_db_reset(args):
         logger.error(f"❌ Database reset failed: {e}")
         sys.exit(1)
 
+def cmd_db_seed_synthetic(args):
+    """Bulk-load deterministic synthetic users, meetings and cache rows"""
+    from packages.database import engine, seed_synthetic
+    
+    logger.info(f"🌱 Seeding {args.scale} synthetic users (seed {args.seed})...")
+    try:
+        counts = seed_synthetic(
+            engine, args.scale, seed=args.seed, chunk_size=args.chunk_size,
+            meetings_per_user=args.meetings_per_user, cache_fraction=args.cache_fraction
+        )
+    except Exception as e:
+        logger.error(f"❌ Synthetic seeding failed: {e}")
+        sys.exit(1)
+    
+    logger.info("✅ Synthetic seeding completed: " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+    logger.info("💡 Set CALENDAR_PROVIDER_MODE=fake to serve these users' calendars without real providers")
+
 def cmd_db_seed(args):
     """Seed database with test data"""
+    if getattr(args, 'scale', None):
+        return cmd_db_seed_synthetic(args)
     from packages.database import (
         get_db_session, User, Meeting, CalendarAuth, 
         create_user, create_meeting, create_calendar_auth
@@ -226,6 +272,71 @@ def cmd_db_seed(args):
         logger.error(f"❌ Database seeding failed: {e}")
         sys.exit(1)
 
+def cmd_db_backfill_slots(args):
+    """Rebuild the normalized meeting_slots rows from the JSON columns"""
+    import time
+    from packages.database import get_db_session, backfill_meeting_slots
+    
+    logger.info("🗓️  Backfilling meeting slots...")
+    started = time.perf_counter()
+    try:
+        with get_db_session() as db:
+            totals = backfill_meeting_slots(db, batch_size=args.batch_size)
+        logger.info(
+            f"✅ Wrote {totals['slots']} slots for {totals['meetings']} meetings "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    except Exception as e:
+        logger.error(f"❌ Slot backfill failed: {e}")
+        sys.exit(1)
+
+def cmd_db_archive(args):
+    """Archive terminal meetings in bounded batches"""
+    from datetime import timedelta
+    from packages.database import get_db_session, archive_meetings
+    
+    older_than = timedelta(days=args.older_than_days) if args.older_than_days is not None else None
+    logger.info("📦 Archiving completed and cancelled meetings" + (" (dry run)" if args.dry_run else "") + "...")
+    try:
+        with get_db_session() as db:
+            result = archive_meetings(
+                db, older_than=older_than, batch_size=args.batch_size,
+                max_batches=args.max_batches, pause=args.pause, dry_run=args.dry_run
+            )
+    except Exception as e:
+        logger.error(f"❌ Archival failed: {e}")
+        sys.exit(1)
+    
+    if result['dry_run']:
+        logger.info(f"🔍 Would archive {result['meetings']} meetings and {result['participants']} participant rows")
+        return
+    rate = result['meetings'] / result['seconds'] if result['seconds'] else 0.0
+    logger.info(
+        f"✅ Archived {result['meetings']} meetings and {result['participants']} participant rows "
+        f"in {result['batches']} batches, {result['seconds']:.1f}s ({rate:.0f} meetings/s)"
+    )
+
+def cmd_db_export(args):
+    """Export changed rows to columnar files, reading from a replica when one is healthy"""
+    from packages.database import export_snapshot, replica_router
+    
+    datasets = args.datasets.split(",") if args.datasets else None
+    logger.info(f"📤 {'Full' if args.full else 'Incremental'} {args.format} export to {args.output}...")
+    try:
+        results = export_snapshot(
+            replica_router.get_engine(), args.output, datasets=datasets,
+            fmt=args.format, chunk_size=args.chunk_size, full=args.full
+        )
+    except Exception as e:
+        logger.error(f"❌ Export failed: {e}")
+        sys.exit(1)
+    
+    for name, result in results.items():
+        if result['file']:
+            logger.info(f"✅ {name}: {result['rows']} rows -> {result['file']}")
+        else:
+            logger.info(f"✅ {name}: no changes since the last export")
+
 def cmd_console(args):
     """Start interactive Python console with database context"""
     import code
@@ -273,7 +384,29 @@ def main():
     reset_parser = subparsers.add_parser('db:reset', help='Reset database (drop and recreate tables)')
     reset_parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt')
     
-    subparsers.add_parser('db:seed', help='Seed database with test data')
+    seed_parser = subparsers.add_parser('db:seed', help='Seed database with test data')
+    seed_parser.add_argument('--scale', type=int, default=None, help='Bulk-load this many synthetic users instead of the demo data')
+    seed_parser.add_argument('--seed', type=int, default=42, help='Random seed for synthetic data')
+    seed_parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per load transaction')
+    seed_parser.add_argument('--meetings-per-user', type=float, default=1.0, help='Synthetic meetings per user')
+    seed_parser.add_argument('--cache-fraction', type=float, default=0.2, help='Share of users with a warm availability cache row')
+    backfill_parser = subparsers.add_parser('db:backfill-slots', help='Rebuild meeting_slots from proposed/selected times')
+    backfill_parser.add_argument('--batch-size', type=int, default=1000, help='Meetings per transaction')
+    
+    archive_parser = subparsers.add_parser('db:archive', help='Move old completed/cancelled meetings to the archive tables')
+    archive_parser.add_argument('--older-than-days', type=int, default=None, help='Archive meetings untouched this long (default: MEETING_ARCHIVE_AFTER_DAYS)')
+    archive_parser.add_argument('--batch-size', type=int, default=500, help='Meetings per transaction')
+    archive_parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+    archive_parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+    archive_parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+    
+    export_parser = subparsers.add_parser('db:export', help='Export meetings, participants and availability to Parquet/Arrow')
+    export_parser.add_argument('--output', default=os.getenv('EXPORT_DIR', 'exports'), help='Directory for part files and watermarks (default: EXPORT_DIR)')
+    export_parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet', help='Parquet for storage, Arrow IPC for zero-copy memory-mapped reads')
+    export_parser.add_argument('--datasets', default=None, help='Comma-separated: meetings,meeting_participants,availability,meetings_archive,meeting_participants_archive (default: all)')
+    export_parser.add_argument('--chunk-size', type=int, default=int(os.getenv('EXPORT_CHUNK_SIZE', '10000')), help='Rows per read and per row group')
+    export_parser.add_argument('--full', action='store_true', help='Ignore the watermarks and export everything')
+    
     subparsers.add_parser('console', help='Start interactive Python console')
     
     args = parser.parse_args()
@@ -290,6 +423,9 @@ def main():
         'generate:migration': cmd_generate_migration,
         'db:reset': cmd_db_reset,
         'db:seed': cmd_db_seed,
+        'db:backfill-slots': cmd_db_backfill_slots,
+        'db:archive': cmd_db_archive,
+        'db:export': cmd_db_export,
         'console': cmd_console
     }
     